@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Audit Benchmark
+Toplu import hızı: audit kapalı, ifade başına audit (trg_audit_ifade,
+transition table) ve karşılaştırma için satır başına audit (her satır için
+bir audit_logs INSERT'ü yapan FOR EACH ROW trigger)
+
+Her mod için ölçülenler:
+- ogrenciler: --ogrenci satırlık tek unnest() INSERT'ü (async import yolu),
+  aynı verinin değişmiş adlarla tekrar upsert'ü (ON CONFLICT DO UPDATE)
+- ogrenciler: --tek kadar satır, satır başına bir INSERT
+  (create_ogrenci_batch yolu; ifade başına audit burada da satır başınadır)
+- oturma_planlari: --ogrenci satırlık INSERT ... SELECT (oturma yüklemesi)
+
+Kapasite/çakışma tetikleyicileri ölçümü etkilemesin diye kapatılır. Her mod
+kendi transaction'ında çalışır ve geri alınır; veritabanında kalıcı
+değişiklik yapılmaz. Superuser ile çalıştırılmalıdır.
+
+Kullanım:
+    python benchmarks/bench_audit.py [--ogrenci 20000] [--tek 2000]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.database import db
+from config import DATABASE
+
+TABLOLAR = (('ogrenciler', 'ogrenci_no'), ('oturma_planlari', 'oturma_id'))
+
+UPSERT = """
+    INSERT INTO ogrenciler (ogrenci_no, bolum_id, ad_soyad, sinif)
+    SELECT * FROM unnest(%s::varchar[], %s::int[], %s::varchar[], %s::int[])
+    ON CONFLICT (ogrenci_no) DO UPDATE
+    SET bolum_id = EXCLUDED.bolum_id,
+        ad_soyad = EXCLUDED.ad_soyad,
+        sinif = EXCLUDED.sinif,
+        aktif = TRUE
+"""
+
+# Karşılaştırma için: değişen her satıra bir audit_logs satırı
+SATIR_BASINA = """
+    CREATE FUNCTION pg_temp.trg_audit_satir() RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO audit_logs (user_id, action, table_name, old_values, new_values)
+        VALUES (NULLIF(NULLIF(current_setting('app.current_user_id', TRUE), ''), '0')::INT,
+                TG_OP::audit_action_enum, TG_TABLE_NAME,
+                CASE WHEN TG_OP <> 'INSERT' THEN to_jsonb(OLD) END,
+                CASE WHEN TG_OP <> 'DELETE' THEN to_jsonb(NEW) END);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+class _Rollback(Exception):
+    """Benchmark transaction'ını geri almak için"""
+
+
+def _create_fixture(cursor, ogrenci: int):
+    """Bölüm, derslik ve sınav; (bolum_id, derslik_id, sinav_id) döner"""
+    cursor.execute(
+        "INSERT INTO bolumler (bolum_adi, bolum_kodu) VALUES ('Bench Audit', 'BENCHAUD') RETURNING bolum_id"
+    )
+    bolum_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO derslikler (bolum_id, derslik_kodu, derslik_adi, kapasite,
+                                satir_sayisi, sutun_sayisi, sira_yapisi)
+        VALUES (%s, 'BENCH', 'Bench', %s, %s, 20, 2) RETURNING derslik_id
+        """, (bolum_id, ogrenci, (ogrenci + 19) // 20)
+    )
+    derslik_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO dersler (bolum_id, ders_kodu, ders_adi, ogretim_elemani, sinif, ders_yapisi)
+        VALUES (%s, 'BAD1', 'Bench', 'Bench', 1, 'Zorunlu') RETURNING ders_id
+        """, (bolum_id,)
+    )
+    ders_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO sinav_programi (bolum_id, program_adi, sinav_tipi, baslangic_tarihi, bitis_tarihi)
+        VALUES (%s, 'Bench Audit', 'Vize', CURRENT_DATE, CURRENT_DATE + 30) RETURNING program_id
+        """, (bolum_id,)
+    )
+    program_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO sinavlar (program_id, ders_id, tarih, baslangic_saati, bitis_saati)
+        VALUES (%s, %s, CURRENT_DATE + 1, '09:00', '10:00') RETURNING sinav_id
+        """, (program_id, ders_id)
+    )
+    sinav_id = cursor.fetchone()[0]
+
+    cursor.execute("ALTER TABLE oturma_planlari DISABLE TRIGGER trg_kapasite_kontrol")
+    cursor.execute("ALTER TABLE oturma_planlari DISABLE TRIGGER trg_ogrenci_cakisma")
+    cursor.execute("ALTER TABLE oturma_planlari DISABLE TRIGGER trg_yerlesim_sayaci_guncelle")
+    return bolum_id, derslik_id, sinav_id
+
+
+def _set_mode(cursor, mod: str):
+    for tablo, _ in TABLOLAR:
+        for olay in ('ins', 'upd', 'del'):
+            islem = 'ENABLE' if mod == 'ifade' else 'DISABLE'
+            cursor.execute(f"ALTER TABLE {tablo} {islem} TRIGGER trg_{tablo}_audit_{olay}")
+    if mod == 'satir':
+        cursor.execute(SATIR_BASINA)
+        for tablo, _ in TABLOLAR:
+            cursor.execute(
+                f"""
+                CREATE TRIGGER trg_{tablo}_audit_satir
+                AFTER INSERT OR UPDATE OR DELETE ON {tablo}
+                FOR EACH ROW EXECUTE FUNCTION pg_temp.trg_audit_satir()
+                """
+            )
+
+
+def _timed(cursor, sql: str, params=None) -> float:
+    started = time.perf_counter()
+    cursor.execute(sql, params)
+    return time.perf_counter() - started
+
+
+def measure(mod: str, ogrenci: int, tek: int):
+    """Bir modun adımları; (adım, satır, süre) listesi"""
+    sonuc = []
+    try:
+        with db.transaction() as conn:
+            with conn.cursor() as cursor:
+                bolum_id, derslik_id, sinav_id = _create_fixture(cursor, ogrenci)
+                _set_mode(cursor, mod)
+                cursor.execute("SELECT count(*) FROM audit_logs")
+                audit_once = cursor.fetchone()[0]
+
+                numaralar = [f"BA{i}" for i in range(ogrenci)]
+                bolumler = [bolum_id] * ogrenci
+                siniflar = [1] * ogrenci
+                sonuc.append(('import (unnest)', ogrenci, _timed(
+                    cursor, UPSERT, (numaralar, bolumler, [f"Bench {i}" for i in range(ogrenci)], siniflar))))
+                sonuc.append(('tekrar import (upsert)', ogrenci, _timed(
+                    cursor, UPSERT, (numaralar, bolumler, [f"Bench {i}*" for i in range(ogrenci)], siniflar))))
+
+                started = time.perf_counter()
+                for i in range(tek):
+                    cursor.execute(
+                        "INSERT INTO ogrenciler (ogrenci_no, bolum_id, ad_soyad, sinif) VALUES (%s, %s, %s, 1)",
+                        (f"BT{i}", bolum_id, f"Bench {i}")
+                    )
+                sonuc.append(('satır satır INSERT', tek, time.perf_counter() - started))
+
+                sonuc.append(('oturma yükleme', ogrenci, _timed(
+                    cursor,
+                    """
+                    INSERT INTO oturma_planlari (sinav_id, derslik_id, ogrenci_no, satir_no, sutun_no)
+                    SELECT %s, %s, 'BA' || g, g / 20 + 1, g %% 20 + 1
+                    FROM generate_series(0, %s - 1) g
+                    """, (sinav_id, derslik_id, ogrenci))))
+
+                cursor.execute("SELECT count(*) FROM audit_logs")
+                sonuc.append(('audit_logs satırı', cursor.fetchone()[0] - audit_once, None))
+            raise _Rollback()
+    except _Rollback:
+        pass
+    return sonuc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit benchmark")
+    parser.add_argument('--ogrenci', type=int, default=20000)
+    parser.add_argument('--tek', type=int, default=2000)
+    args = parser.parse_args()
+
+    db.initialize(DATABASE)
+
+    modlar = (('kapalı', 'kapali'), ('ifade başına', 'ifade'), ('satır başına', 'satir'))
+    sonuclar = {etiket: measure(mod, args.ogrenci, args.tek) for etiket, mod in modlar}
+
+    print(f"{'':<24}" + ''.join(f"{etiket:>16}" for etiket, _ in modlar))
+    for index, (adim, _, _) in enumerate(sonuclar[modlar[0][0]]):
+        hucreler = []
+        for etiket, _ in modlar:
+            _, satir, sure = sonuclar[etiket][index]
+            if sure is None:
+                hucreler.append(f"{satir:>16}")
+            else:
+                hucreler.append(f"{satir / sure:>10.0f} sat/s")
+        print(f"{adim:<24}" + ''.join(hucreler))
+
+    db.close_all()
+
+
+if __name__ == "__main__":
+    main()
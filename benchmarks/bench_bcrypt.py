@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+bcrypt Benchmark
+İki mod:
+
+--calibrate: bu makinede doğrulama süresi --target-ms'i aşmayan en yüksek
+bcrypt maliyetini (rounds) bulur; sonuç AppConfig.BCRYPT_ROUNDS olarak
+(BCRYPT_ROUNDS ortam değişkeni) kullanılır.
+
+varsayılan: --burst kadar eşzamanlı doğrulama, her biri kendi thread'inde
+(sınırsız) ve models.password_hasher havuzunda (--workers). Bu sırada ana
+thread 10 ms'lik tick'ler atar; tick gecikmesi GUI olay döngüsünün ne kadar
+takıldığını gösterir. Veritabanı gerekmez.
+
+Kullanım:
+    python benchmarks/bench_bcrypt.py --calibrate [--target-ms 250]
+    python benchmarks/bench_bcrypt.py [--burst 16] [--workers 2] [--rounds 12]
+"""
+
+import sys
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.password_hasher import PasswordHasher, calibrate, _hashpw, _checkpw
+
+PASSWORD = 'Bench.Bcrypt1'
+TICK = 0.010
+
+
+def _ticks(stop: threading.Event):
+    """Ana thread tick gecikmeleri (ms) - GUI olay döngüsü yerine"""
+    late = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        time.sleep(TICK)
+        late.append((time.perf_counter() - started - TICK) * 1000)
+    return late
+
+
+def _run_with_ticks(start_work):
+    """start_work(done) işi başlatır; iş bitince done.set() çağrılmalı"""
+    done = threading.Event()
+    started = time.perf_counter()
+    start_work(done)
+    late = _ticks(done)
+    elapsed = time.perf_counter() - started
+    late.sort()
+    return elapsed, late[len(late) // 2] if late else 0.0, late[-1] if late else 0.0
+
+
+def unbounded(hashed: str, burst: int):
+    def start(done):
+        threads = [threading.Thread(target=_checkpw, args=(PASSWORD, hashed)) for _ in range(burst)]
+        for thread in threads:
+            thread.start()
+
+        def wait():
+            for thread in threads:
+                thread.join()
+            done.set()
+        threading.Thread(target=wait).start()
+    return _run_with_ticks(start)
+
+
+def pooled(hasher: PasswordHasher, hashed: str, burst: int):
+    def start(done):
+        # Gönderim de ayrı thread'de: kuyruk doluysa bekleyen o olur, ana thread değil
+        def submit():
+            futures = [hasher.submit_verify(PASSWORD, hashed) for _ in range(burst)]
+            assert all(future.result() for future in futures)
+            done.set()
+        threading.Thread(target=submit).start()
+    return _run_with_ticks(start)
+
+
+def run_calibration(target_ms: float, min_rounds: int, max_rounds: int):
+    rounds, measured = calibrate(target_ms, min_rounds, max_rounds)
+    print(f"{'rounds':<10}{'doğrulama':>14}")
+    for r, ms in measured:
+        marker = '  <-' if r == rounds else ''
+        print(f"{r:<10}{ms:>11.1f} ms{marker}")
+    print(f"\nhedef {target_ms:.0f} ms -> BCRYPT_ROUNDS={rounds}")
+
+
+def run_burst(burst: int, workers: int, rounds: int):
+    hashed = _hashpw(PASSWORD, rounds)
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=burst)
+
+    print(f"{burst} doğrulama, rounds={rounds}, {os.cpu_count()} CPU\n")
+    print(f"{'':<24}{'toplam':>10}{'tick p50':>12}{'tick maks':>12}")
+    for label, run in (
+        ('thread başına (sınırsız)', lambda: unbounded(hashed, burst)),
+        (f'havuz ({workers} worker)', lambda: pooled(hasher, hashed, burst)),
+    ):
+        elapsed, p50, worst = run()
+        print(f"{label:<24}{elapsed * 1000:>7.0f} ms{p50:>9.1f} ms{worst:>9.1f} ms")
+
+    hasher.shutdown()
+    print(f"\n{hasher.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt benchmark")
+    parser.add_argument('--calibrate', action='store_true')
+    parser.add_argument('--target-ms', type=float, default=250.0)
+    parser.add_argument('--min-rounds', type=int, default=10)
+    parser.add_argument('--max-rounds', type=int, default=16)
+    parser.add_argument('--burst', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--rounds', type=int, default=12)
+    args = parser.parse_args()
+
+    if args.calibrate:
+        run_calibration(args.target_ms, args.min_rounds, args.max_rounds)
+    else:
+        run_burst(args.burst, args.workers, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+E-posta Kuyruğu Benchmark
+Yerel bir aiosmtpd sunucusuna --mesaj kadar e-posta:
+
+- mesaj başına bağlantı: eski EmailService._send_email gibi her mesajda
+  bağlan + EHLO (+ STARTTLS + login) + gönder + QUIT
+- email_queue: mesajlar tabloya yazılır, models.email_queue işleyicisi
+  --workers açık bağlantıyla FOR UPDATE SKIP LOCKED partileriyle gönderir
+
+Yerel sunucuda TLS ve kimlik doğrulama yoktur; gerçek bir sağlayıcıdaki
+STARTTLS + AUTH gidiş-dönüşleri yerine sunucu her EHLO'da --handshake-ms
+bekler. "red" ile başlayan alıcılar 550 ile, "gecici" ile başlayanlar 451 ile
+reddedilir; sonuçta kuyruk satırlarının durumları ve ilk gönderilenlerin
+öncelikleri yazdırılır. Benchmark satırları (email_type 'bench') sonunda
+silinir.
+
+Kullanım:
+    python benchmarks/bench_email_queue.py [--mesaj 500] [--workers 2] [--handshake-ms 150]
+"""
+
+import sys
+import argparse
+import asyncio
+import smtplib
+import time
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from aiosmtpd.controller import Controller
+
+from models.database import db
+from models.email_queue import EmailQueueWorker
+from utils.email_service import EmailService, SMTPConnectionPool
+from config import DATABASE
+
+HOST = '127.0.0.1'
+PORT = 8025
+
+
+class _Handler:
+    """Gelen mesajları sayan, bazı alıcıları reddeden SMTP sunucusu"""
+
+    def __init__(self, handshake: float):
+        self.handshake = handshake
+        self.konular = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake)
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith('red'):
+            return '550 5.1.1 Alıcı yok'
+        if address.startswith('gecici'):
+            return '451 4.3.0 Daha sonra deneyin'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        for line in envelope.content.decode('utf-8', 'replace').splitlines():
+            if line.startswith('Subject:'):
+                self.konular.append(line[len('Subject:'):].strip())
+                break
+        return '250 OK'
+
+
+def mesaj_basina_baglanti(service: EmailService, mesaj: int) -> float:
+    started = time.perf_counter()
+    for i in range(mesaj):
+        msg = service.build_message(f"ogrenci{i}@kocaeli.edu.tr", f"P5 Bench {i}", "<p>Bench</p>", "Bench")
+        with smtplib.SMTP(HOST, PORT) as server:
+            server.send_message(msg)
+    return time.perf_counter() - started
+
+
+def kuyruk(worker: EmailQueueWorker, mesaj: int) -> float:
+    # Karışık öncelik; birkaç kalıcı / geçici ret
+    rows = []
+    for i in range(mesaj):
+        priority = 10 if i % 10 == 0 else 5
+        alici = f"ogrenci{i}@kocaeli.edu.tr"
+        if i % 100 == 1:
+            alici = f"red{i}@kocaeli.edu.tr"
+        elif i % 100 == 2:
+            alici = f"gecici{i}@kocaeli.edu.tr"
+        rows.append((alici, f"P{priority} Bench {i}", "Bench", "<p>Bench</p>", 'bench', priority))
+
+    with db.transaction() as conn:
+        with conn.cursor() as cursor:
+            cursor.executemany(
+                """
+                INSERT INTO email_queue (to_email, subject, body_text, body_html, email_type, priority)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """, rows
+            )
+
+    started = time.perf_counter()
+    worker.start()
+    worker.wake()
+    while True:
+        bekleyen = db.execute_query(
+            """
+            SELECT count(*) AS n FROM email_queue
+            WHERE email_type = 'bench' AND status = 'pending' AND attempts = 0
+            """, fetch_one=True
+        )['n']
+        stats = worker.stats()
+        if not bekleyen and stats['claimed'] == stats['sent'] + stats['retried'] + stats['failed']:
+            break
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    worker.stop()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="E-posta kuyruğu benchmark")
+    parser.add_argument('--mesaj', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--handshake-ms', type=float, default=150.0)
+    args = parser.parse_args()
+
+    db.initialize(DATABASE)
+    handler = _Handler(args.handshake_ms / 1000)
+    controller = Controller(handler, hostname=HOST, port=PORT)
+    controller.start()
+
+    pool = SMTPConnectionPool(HOST, PORT, starttls=False, auth=False, size=args.workers)
+    service = EmailService(pool=pool)
+    worker = EmailQueueWorker(service=service, workers=args.workers, poll_interval=0.05,
+                              retry_base=3600)
+
+    try:
+        tek = mesaj_basina_baglanti(service, args.mesaj)
+        handler.konular.clear()
+        havuz = kuyruk(worker, args.mesaj)
+
+        print(f"{args.mesaj} mesaj, EHLO gecikmesi {args.handshake_ms:.0f} ms\n")
+        print(f"{'':<28}{'süre':>10}{'mesaj/s':>10}")
+        print(f"{'mesaj başına bağlantı':<28}{tek:>8.2f} s{args.mesaj / tek:>10.0f}")
+        print(f"{f'email_queue ({args.workers} bağlantı)':<28}{havuz:>8.2f} s{args.mesaj / havuz:>10.0f}")
+
+        durumlar = db.execute_query(
+            """
+            SELECT status::TEXT AS status, attempts, count(*) AS n FROM email_queue
+            WHERE email_type = 'bench' GROUP BY 1, 2 ORDER BY 1, 2
+            """
+        )
+        print("\nkuyruk: " + ", ".join(f"{r['status']} (deneme {r['attempts']}): {r['n']}" for r in durumlar))
+        ilk = [konu.split()[0] for konu in handler.konular[:args.mesaj // 10]]
+        print(f"ilk {len(ilk)} gönderimde P10 oranı: {ilk.count('P10') / max(1, len(ilk)):.0%}")
+        print(f"{worker.stats()}")
+    finally:
+        db.execute_update("DELETE FROM email_queue WHERE email_type = 'bench'")
+        controller.stop()
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
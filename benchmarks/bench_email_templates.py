@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+E-posta Şablonları Benchmark
+utils/email_templates.py kayıt defterinin maliyeti; veritabanı gerekmez:
+
+- açılış: resources/email_templates altındaki tüm şablonların yüklenmesi;
+  bytecode cache olmadan, boş cache ile (derle + yaz) ve dolu cache ile
+- mesaj başına: sifre_sifirlama (html + text) her mesajda kaynaktan
+  derlenerek ve kayıt defterindeki derlenmiş şablonla
+- toplu: TakvimSablonu ile --ogrenci x --sinav sentetik satırdan sınav
+  takvimi e-postası (models/bildirim_model.py mail-merge döngüsü)
+
+Kullanım:
+    python benchmarks/bench_email_templates.py [--mesaj 2000] [--ogrenci 20000] [--sinav 6]
+"""
+
+import sys
+import argparse
+import tempfile
+import time
+from datetime import date, time as saat
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.email_templates import EmailTemplates
+from models.bildirim_model import TakvimSablonu
+from config import EmailConfig
+
+SIFRE_SIFIRLAMA = dict(recipient_name='Ayşe Yılmaz', expires_minutes=15,
+                       reset_link='https://sinav.kocaeli.edu.tr/sifre?token=' + 'x' * 43)
+
+
+def acilis(cache_dir=None) -> float:
+    started = time.perf_counter()
+    sablonlar = EmailTemplates(EmailConfig.TEMPLATE_DIR, cache_dir)
+    for name in sablonlar.env.list_templates():
+        sablonlar.template(name)
+    return time.perf_counter() - started
+
+
+def her_mesajda_derle(sablonlar: EmailTemplates, mesaj: int) -> float:
+    loader = sablonlar.env.loader
+    started = time.perf_counter()
+    for _ in range(mesaj):
+        for name in ('sifre_sifirlama.html', 'sifre_sifirlama.txt'):
+            source, _, _ = loader.get_source(sablonlar.env, name)
+            sablonlar.env.from_string(source).render(SIFRE_SIFIRLAMA)
+    return time.perf_counter() - started
+
+
+def derlenmis(sablonlar: EmailTemplates, mesaj: int) -> float:
+    started = time.perf_counter()
+    for _ in range(mesaj):
+        sablonlar.render('sifre_sifirlama', **SIFRE_SIFIRLAMA)
+    return time.perf_counter() - started
+
+
+def toplu(sablonlar: EmailTemplates, ogrenci: int, sinav: int):
+    satirlar = [
+        {
+            'sinav_id': s, 'derslik_id': s % 3 + 1,
+            'ders_kodu': f'BLM{100 + s}', 'ders_adi': f'Ders {s} & Uygulama',
+            'tarih': date(2025, 11, 3 + s), 'baslangic_saati': saat(9), 'bitis_saati': saat(10, 15),
+            'derslik_kodu': f'D{s}', 'derslik_adi': 'Büyük Amfi',
+            'satir_no': 0, 'sutun_no': 0,
+        }
+        for s in range(1, sinav + 1)
+    ]
+    sablon = TakvimSablonu('Bench Vize Programı', sablonlar)
+    boyut = 0
+    started = time.perf_counter()
+    for i in range(ogrenci):
+        for satir in satirlar:
+            satir['satir_no'] = i // 20 + 1
+            satir['sutun_no'] = i % 20 + 1
+        _, text, html = sablon.render(f'Öğrenci {i}', satirlar)
+        boyut += len(text) + len(html)
+    return time.perf_counter() - started, boyut
+
+
+def main():
+    parser = argparse.ArgumentParser(description="E-posta şablonları benchmark")
+    parser.add_argument('--mesaj', type=int, default=2000)
+    parser.add_argument('--ogrenci', type=int, default=20000)
+    parser.add_argument('--sinav', type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        yok = acilis()
+        bos = acilis(cache_dir)
+        dolu = acilis(cache_dir)
+    print("açılış (tüm şablonlar)")
+    print(f"  bytecode cache yok   {yok * 1000:>8.1f} ms")
+    print(f"  boş cache            {bos * 1000:>8.1f} ms")
+    print(f"  dolu cache           {dolu * 1000:>8.1f} ms")
+
+    sablonlar = EmailTemplates(EmailConfig.TEMPLATE_DIR)
+    sablonlar.render('sifre_sifirlama', **SIFRE_SIFIRLAMA)
+    derle = her_mesajda_derle(sablonlar, args.mesaj)
+    hazir = derlenmis(sablonlar, args.mesaj)
+    print(f"\nsifre_sifirlama, {args.mesaj} mesaj (html + text)")
+    print(f"  her mesajda derle    {derle / args.mesaj * 1e6:>8.0f} µs/mesaj")
+    print(f"  derlenmiş şablon     {hazir / args.mesaj * 1e6:>8.0f} µs/mesaj")
+
+    sure, boyut = toplu(sablonlar, args.ogrenci, args.sinav)
+    print(f"\nsinav_takvimi, {args.ogrenci} öğrenci x {args.sinav} sınav")
+    print(f"  süre                 {sure:>8.2f} s")
+    print(f"  hız                  {args.ogrenci / sure:>8.0f} e-posta/s")
+    print(f"  ortalama gövde       {boyut / args.ogrenci:>8.0f} karakter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Login Benchmark
+Başarılı girişin uçtan uca süresi: eski akış (e-posta araması, kilit kontrolü,
+sayaç sıfırlama, son_giris, oturum kaydı, log_login_attempt - her biri ayrı
+checkout + commit; UserModel'den kaldırılan metotların sorguları burada) ile
+auth_begin + auth_complete
+
+--users kadar dolgu kullanıcısı eklenir, böylece LOWER(email) aramasının
+index'i (idx_users_email_lower) kullanıp kullanmadığı süreye yansır. bcrypt
+doğrulaması iki akışta da aynıdır ve ayrıca raporlanır. Eklenen kullanıcılar,
+oturumlar ve deneme kayıtları sonunda silinir.
+
+--attackers > 0 ise ayrıca saldırı altındaki giriş süresi ölçülür: her
+saldırgan thread kendi IP'sinden dolgu hesaplarına yanlış şifre dener, bu
+sırada başka bir IP'den gerçek giriş yapılır; rate limiter kapalı ve açık.
+
+Kullanım:
+    python benchmarks/bench_login.py [--users 20000] [--logins 200] [--bcrypt-rounds 12]
+                                     [--attackers 4]
+"""
+
+import sys
+import argparse
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import bcrypt
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.database import db
+from models import write_behind
+from models.user_model import UserModel
+from models.rate_limiter import login_limiter
+from controllers.login_controller import LoginController
+from config import DATABASE
+
+EMAIL = 'bench.login@kocaeli.edu.tr'
+PASSWORD = 'Bench.Login1'
+
+
+def _create_fixture(users: int, rounds: int):
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+    db.execute_update(
+        """
+        INSERT INTO users (email, password_hash, role, ad_soyad)
+        SELECT 'bench.login.' || g || '@kocaeli.edu.tr', %s, 'Admin', 'Bench ' || g
+        FROM generate_series(1, %s) g
+        """, (password_hash, users)
+    )
+    db.execute_update(
+        "INSERT INTO users (email, password_hash, role, ad_soyad) VALUES (%s, %s, 'Admin', 'Bench Login')",
+        (EMAIL, password_hash)
+    )
+    db.execute_update("ANALYZE users")
+
+
+def _drop_fixture():
+    db.execute_update("DELETE FROM login_attempts WHERE email LIKE 'bench.login%%'")
+    db.execute_update(
+        "DELETE FROM active_sessions WHERE user_id IN "
+        "(SELECT user_id FROM users WHERE email LIKE 'bench.login%%')"
+    )
+    db.execute_update("DELETE FROM users WHERE email LIKE 'bench.login%%'")
+
+
+def eski_akis(user_model: UserModel):
+    """Önceki LoginController.login'in veritabanı çağrıları (başarılı giriş)"""
+    user = user_model.find_by_email(EMAIL)
+    db.execute_query(
+        "SELECT account_locked_until > CURRENT_TIMESTAMP AS is_locked FROM users WHERE user_id = %s",
+        (user['user_id'],), fetch_one=True
+    )
+    db.execute_update(
+        "UPDATE users SET failed_login_attempts = 0, account_locked_until = NULL WHERE user_id = %s",
+        (user['user_id'],)
+    )
+    db.execute_update("UPDATE users SET son_giris = CURRENT_TIMESTAMP WHERE user_id = %s", (user['user_id'],))
+    db.execute_update(
+        """
+        INSERT INTO active_sessions (session_id, user_id, expires_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP + INTERVAL '480 minutes')
+        """, (str(uuid.uuid4()), user['user_id'])
+    )
+    db.execute_procedure('log_login_attempt', [EMAIL, True, None, None, None])
+    return user
+
+
+def yeni_akis(user_model: UserModel):
+    """auth_begin + auth_complete"""
+    user = user_model.auth_begin(EMAIL)
+    user_model.auth_complete(user['user_id'], EMAIL, True, session_id=str(uuid.uuid4()))
+    return user
+
+
+def measure(label: str, run, logins: int):
+    started = time.perf_counter()
+    for _ in range(logins):
+        run()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28}{elapsed / logins * 1000:>12.3f} ms")
+
+
+def saldiri_altinda(controller: LoginController, attackers: int, users: int,
+                    logins: int, limiter: bool):
+    """Saldırgan thread'ler dolgu hesaplarına denerken gerçek girişin süresi"""
+    login_limiter.enabled = limiter
+    stop = threading.Event()
+    attempts = [0] * attackers
+
+    def attacker(n: int):
+        while not stop.is_set():
+            attempts[n] += 1
+            email = f"bench.login.{(n * 7919 + attempts[n]) % users + 1}@kocaeli.edu.tr"
+            controller.login(email, 'Yanlis.Sifre1', ip_address=f'10.0.0.{n + 1}')
+            time.sleep(0.002)  # ağ gecikmesi yerine; aynı süreçte GIL'i tek başına tutmasın
+
+    threads = [threading.Thread(target=attacker, args=(n,), daemon=True) for n in range(attackers)]
+    for thread in threads:
+        thread.start()
+    # Limiter açıkken ölçüm, saldırganların IP burst'ü tükendikten sonra başlar
+    rejected = login_limiter.ip.stats()['rejected']
+    deadline = time.monotonic() + 60
+    while limiter and login_limiter.ip.stats()['rejected'] < rejected + attackers \
+            and time.monotonic() < deadline:
+        time.sleep(0.1)
+    time.sleep(0.5)
+
+    def login():
+        result = controller.login(EMAIL, PASSWORD, ip_address='192.168.1.10')
+        assert result['success'], result['message']
+
+    started = time.perf_counter()
+    measure(f"limiter {'açık' if limiter else 'kapalı'}", login, logins)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+    print(f"{'':<28}{sum(attempts) / elapsed:>9.0f} saldırı/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login benchmark")
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--attackers', type=int, default=0)
+    args = parser.parse_args()
+
+    db.initialize(DATABASE)
+    user_model = UserModel(db)
+    controller = LoginController()
+
+    _drop_fixture()
+    _create_fixture(args.users, args.bcrypt_rounds)
+    try:
+        plan = db.execute_query(
+            "EXPLAIN SELECT user_id FROM users WHERE LOWER(email) = LOWER(%s)", (EMAIL,)
+        )
+        print(f"e-posta araması: {plan[0]['QUERY PLAN'].strip()}\n")
+
+        print(f"{'giriş başına':<28}{'süre':>15}")
+        measure('eski akış (6 çağrı)', lambda: eski_akis(user_model), args.logins)
+        measure('auth_begin + auth_complete', lambda: yeni_akis(user_model), args.logins)
+
+        user = user_model.auth_begin(EMAIL)
+        measure(f'bcrypt (rounds={args.bcrypt_rounds})',
+                lambda: user_model.verify_password(PASSWORD, user['password_hash']),
+                max(1, args.logins // 20))
+
+        def login():
+            result = controller.login(EMAIL, PASSWORD)
+            assert result['success'], result['message']
+        measure('LoginController.login', login, max(1, args.logins // 20))
+
+        if args.attackers:
+            print(f"\n{args.attackers} saldırgan altında LoginController.login")
+            enabled = login_limiter.enabled
+            saldiri_altinda(controller, args.attackers, args.users, max(1, args.logins // 20), False)
+            saldiri_altinda(controller, args.attackers, args.users, max(1, args.logins // 20), True)
+            login_limiter.enabled = enabled
+    finally:
+        db.set_session_user(None)
+        write_behind.stop_all()
+        _drop_fixture()
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
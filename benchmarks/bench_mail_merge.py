@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Mail-Merge Benchmark
+--ogrenci öğrenci x --sinav sınavlık bir program için sınav takvimi
+e-postalarının email_queue'ya yazılması (BildirimModel.sinav_takvimi_kuyrukla):
+süre, saniyedeki e-posta ve Python tarafındaki en yüksek bellek kullanımı
+(tracemalloc). Bellek öğrenci sayısıyla büyümemelidir.
+
+Fixture ve kuyruğa yazılan e-postalar tek transaction içinde oluşturulur
+ve sonunda geri alınır; veritabanında kalıcı değişiklik yapılmaz.
+
+Kullanım:
+    python benchmarks/bench_mail_merge.py [--ogrenci 20000] [--sinav 6] [--batch 1000]
+"""
+
+import sys
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.database import db
+from models.bildirim_model import BildirimModel
+from config import DATABASE
+
+
+class _Rollback(Exception):
+    """Benchmark transaction'ını geri almak için"""
+
+
+def _create_fixture(cursor, ogrenci: int, sinav: int) -> int:
+    """Bölüm, öğrenciler, dersler, sınavlar ve oturma planı; program_id döner"""
+    cursor.execute(
+        "INSERT INTO bolumler (bolum_adi, bolum_kodu) VALUES ('Bench Mail', 'BENCHMM') RETURNING bolum_id"
+    )
+    bolum_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO derslikler (bolum_id, derslik_kodu, derslik_adi, kapasite,
+                                satir_sayisi, sutun_sayisi, sira_yapisi)
+        VALUES (%s, 'BENCHMM', 'Bench Amfi', %s, %s, 20, 2) RETURNING derslik_id
+        """, (bolum_id, ogrenci, (ogrenci + 19) // 20)
+    )
+    derslik_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO ogrenciler (ogrenci_no, bolum_id, ad_soyad, sinif)
+        SELECT 'MM' || lpad(g::TEXT, 6, '0'), %s, 'Bench Öğrenci ' || g, 1
+        FROM generate_series(1, %s) g
+        """, (bolum_id, ogrenci)
+    )
+    cursor.execute(
+        """
+        INSERT INTO dersler (bolum_id, ders_kodu, ders_adi, ogretim_elemani, sinif, ders_yapisi)
+        SELECT %s, 'MMD' || g, 'Bench Ders ' || g, 'Bench', 1, 'Zorunlu' FROM generate_series(1, %s) g
+        """, (bolum_id, sinav)
+    )
+    cursor.execute(
+        """
+        INSERT INTO sinav_programi (bolum_id, program_adi, sinav_tipi, baslangic_tarihi, bitis_tarihi)
+        VALUES (%s, 'Bench Vize Programı', 'Vize', CURRENT_DATE, CURRENT_DATE + 30) RETURNING program_id
+        """, (bolum_id,)
+    )
+    program_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO sinavlar (program_id, ders_id, tarih, baslangic_saati, bitis_saati)
+        SELECT %s, ders_id, CURRENT_DATE + (row_number() OVER ())::INT, '09:00', '10:00'
+        FROM dersler WHERE bolum_id = %s
+        """, (program_id, bolum_id)
+    )
+
+    # Kapasite/çakışma tetikleyicileri bu transaction için kapalı
+    cursor.execute("ALTER TABLE oturma_planlari DISABLE TRIGGER USER")
+    cursor.execute(
+        """
+        INSERT INTO oturma_planlari (sinav_id, derslik_id, ogrenci_no, satir_no, sutun_no)
+        SELECT s.sinav_id, %s, 'MM' || lpad(g::TEXT, 6, '0'), (g - 1) / 20 + 1, (g - 1) %% 20 + 1
+        FROM sinavlar s, generate_series(1, %s) g
+        WHERE s.program_id = %s
+        """, (derslik_id, ogrenci, program_id)
+    )
+    cursor.execute("ANALYZE ogrenciler, sinavlar, oturma_planlari")
+    return program_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mail-merge benchmark")
+    parser.add_argument('--ogrenci', type=int, default=20000)
+    parser.add_argument('--sinav', type=int, default=6)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    db.initialize(DATABASE)
+    model = BildirimModel(db, batch_size=args.batch)
+
+    try:
+        with db.transaction() as conn:
+            with conn.cursor() as cursor:
+                program_id = _create_fixture(cursor, args.ogrenci, args.sinav)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            sayi = model.sinav_takvimi_kuyrukla(program_id)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            boyut = db.execute_query(
+                """
+                SELECT pg_size_pretty(sum(octet_length(body_html) + octet_length(body_text))) AS boyut
+                FROM email_queue WHERE email_type = 'exam_schedule'
+                """, fetch_one=True
+            )['boyut']
+
+            print(f"{sayi} e-posta ({args.sinav} sınav, {boyut} gövde), parti {args.batch}")
+            print(f"süre          {elapsed:>8.2f} s")
+            print(f"hız           {sayi / elapsed:>8.0f} e-posta/s")
+            print(f"bellek (tepe) {peak / 1024 / 1024:>8.1f} MB")
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+    db.close_all()
+
+
+if __name__ == "__main__":
+    main()
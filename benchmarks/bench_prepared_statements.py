@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Prepared Statement Benchmark
+Oturma ve ders kaydı insert yollarının PREPARE ile/olmadan karşılaştırması
+
+Tüm veri tek transaction içinde üretilir ve sonunda geri alınır;
+veritabanında kalıcı değişiklik yapılmaz.
+
+Kullanım:
+    python benchmarks/bench_prepared_statements.py [--rows 2000] [--repeat 3]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.database import db
+from models.ogrenci_model import OgrenciModel
+from models.oturma_model import OturmaModel
+from config import DATABASE
+
+
+class _Rollback(Exception):
+    """Benchmark transaction'ını geri almak için"""
+
+
+def _create_fixture(rows: int):
+    """Geçici bölüm/ders/derslik/sınav oluştur (transaction içinde)"""
+    bolum = db.execute_query(
+        "INSERT INTO bolumler (bolum_adi, bolum_kodu) VALUES ('Bench', 'BENCH') RETURNING bolum_id",
+        fetch_one=True
+    )['bolum_id']
+    ders = db.execute_query(
+        """
+        INSERT INTO dersler (bolum_id, ders_kodu, ders_adi, ogretim_elemani, sinif, ders_yapisi)
+        VALUES (%s, 'BENCH101', 'Bench', 'Bench', 1, 'Zorunlu') RETURNING ders_id
+        """,
+        (bolum,), fetch_one=True
+    )['ders_id']
+    side = int(rows ** 0.5) + 1
+    derslik = db.execute_query(
+        """
+        INSERT INTO derslikler (bolum_id, derslik_kodu, derslik_adi, kapasite,
+                                satir_sayisi, sutun_sayisi, sira_yapisi)
+        VALUES (%s, 'BENCH', 'Bench', %s, %s, %s, 2) RETURNING derslik_id
+        """,
+        (bolum, side * side, side, side), fetch_one=True
+    )['derslik_id']
+    program = db.execute_query(
+        """
+        INSERT INTO sinav_programi (bolum_id, program_adi, sinav_tipi, baslangic_tarihi, bitis_tarihi)
+        VALUES (%s, 'Bench', 'Vize', DATE '2030-01-07', DATE '2030-01-11') RETURNING program_id
+        """,
+        (bolum,), fetch_one=True
+    )['program_id']
+    sinav = db.execute_query(
+        """
+        INSERT INTO sinavlar (program_id, ders_id, tarih, baslangic_saati, bitis_saati)
+        VALUES (%s, %s, DATE '2030-01-07', '09:00', '10:15') RETURNING sinav_id
+        """,
+        (program, ders), fetch_one=True
+    )['sinav_id']
+    db.execute_update("INSERT INTO sinav_derslikleri (sinav_id, derslik_id) VALUES (%s, %s)", (sinav, derslik))
+    return bolum, derslik, sinav, side
+
+
+def run(rows: int, prepared: bool) -> dict:
+    """Tek tur: rows öğrenci + ders kaydı + oturma insert"""
+    db.use_prepared = prepared
+    ogrenci_model = OgrenciModel(db)
+    oturma_model = OturmaModel(db)
+    timings = {}
+
+    try:
+        with db.transaction():
+            bolum, derslik, sinav, side = _create_fixture(rows)
+            numbers = [f"BENCH{i:06d}" for i in range(rows)]
+
+            started = time.perf_counter()
+            for no in numbers:
+                ogrenci_model.create_ogrenci(no, bolum, 'Bench', 1)
+                ogrenci_model.add_ders_kayit_by_code(no, 'BENCH101')
+            timings['enrollment'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for i, no in enumerate(numbers):
+                oturma_model.create_oturma(sinav, derslik, no, i // side + 1, i % side + 1)
+            timings['seating'] = time.perf_counter() - started
+
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepared statement benchmark")
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    db.initialize(DATABASE)
+
+    # Isınma turu (bağlantı ve katalog cache'leri)
+    run(min(args.rows, 100), prepared=True)
+
+    results = {False: [], True: []}
+    for _ in range(args.repeat):
+        for prepared in (False, True):
+            results[prepared].append(run(args.rows, prepared))
+
+    print(f"{'yol':<12}{'mod':<12}{'en iyi (s)':>12}{'µs/satır':>12}")
+    for path in ('enrollment', 'seating'):
+        best = {}
+        for prepared in (False, True):
+            best[prepared] = min(r[path] for r in results[prepared])
+            per_row = best[prepared] / args.rows * 1e6
+            mode = 'prepared' if prepared else 'plain'
+            print(f"{path:<12}{mode:<12}{best[prepared]:>12.3f}{per_row:>12.1f}")
+        print(f"{'':<12}{'kazanç':<12}{(1 - best[True] / best[False]) * 100:>11.1f}%")
+
+    print(db.pool_stats())
+    db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+RLS Benchmark
+Bölüm koordinatörü olarak 100k satırlık oturma planı taraması:
+satır başına EXISTS (users JOIN sinavlar JOIN sinav_programi) yapan eski
+policy'ler ile oturum bağlamını (app.current_user_id) sorgu başına bir kez
+çözen yenileri
+
+Superuser RLS'e tabi olmadığından tarama geçici bir NOLOGIN rolü ile
+(SET LOCAL ROLE) yapılır. Fixture, rol ve eski policy'ler tek transaction
+içinde oluşturulur ve sonunda geri alınır; veritabanında kalıcı değişiklik
+yapılmaz. Superuser ile çalıştırılmalıdır.
+
+Kullanım:
+    python benchmarks/bench_rls.py [--ogrenci 1000] [--sinav 100] [--repeat 5]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.database import db
+from config import DATABASE
+
+ROLE = 'bench_rls_reader'
+
+SCAN = "SELECT sinav_id, derslik_id, ogrenci_no, satir_no, sutun_no FROM oturma_planlari"
+
+# sinav_takvimi_final.sql'deki önceki policy tanımları
+OLD_POLICIES = """
+    DROP POLICY pol_program_erisim ON sinav_programi;
+    DROP POLICY pol_sinavlar_erisim ON sinavlar;
+    DROP POLICY pol_oturma_erisim ON oturma_planlari;
+
+    CREATE POLICY pol_program_erisim ON sinav_programi FOR ALL USING (
+        EXISTS (
+            SELECT 1 FROM users u
+            WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
+            AND u.aktif = TRUE
+            AND (u.role = 'Admin' OR u.bolum_id = sinav_programi.bolum_id)
+        )
+    );
+
+    CREATE POLICY pol_sinavlar_erisim ON sinavlar FOR ALL USING (
+        EXISTS (
+            SELECT 1 FROM users u
+            JOIN sinav_programi sp ON sp.program_id = sinavlar.program_id
+            WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
+            AND u.aktif = TRUE
+            AND (u.role = 'Admin' OR u.bolum_id = sp.bolum_id)
+        )
+    );
+
+    CREATE POLICY pol_oturma_erisim ON oturma_planlari FOR ALL USING (
+        EXISTS (
+            SELECT 1 FROM users u
+            JOIN sinavlar s ON s.sinav_id = oturma_planlari.sinav_id
+            JOIN sinav_programi sp ON sp.program_id = s.program_id
+            WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
+            AND u.aktif = TRUE
+            AND (u.role = 'Admin' OR u.bolum_id = sp.bolum_id)
+        )
+    );
+"""
+
+
+class _Rollback(Exception):
+    """Benchmark transaction'ını geri almak için"""
+
+
+def _create_fixture(cursor, ogrenci: int, sinav: int) -> int:
+    """Bölüm, koordinatör, öğrenciler, sınavlar ve ogrenci*sinav oturma kaydı; koordinatör id'si döner"""
+    cursor.execute(
+        "INSERT INTO bolumler (bolum_adi, bolum_kodu) VALUES ('Bench RLS', 'BENCHRLS') RETURNING bolum_id"
+    )
+    bolum_id = cursor.fetchone()[0]
+
+    cursor.execute(
+        """
+        INSERT INTO users (email, password_hash, role, bolum_id, ad_soyad)
+        VALUES ('bench.rls@kocaeli.edu.tr', '-', 'Bölüm Koordinatörü', %s, 'Bench RLS')
+        RETURNING user_id
+        """, (bolum_id,)
+    )
+    user_id = cursor.fetchone()[0]
+
+    cursor.execute(
+        """
+        INSERT INTO derslikler (bolum_id, derslik_kodu, derslik_adi, kapasite,
+                                satir_sayisi, sutun_sayisi, sira_yapisi)
+        VALUES (%s, 'BENCH', 'Bench', %s, %s, 20, 2) RETURNING derslik_id
+        """, (bolum_id, ogrenci, (ogrenci + 19) // 20)
+    )
+    derslik_id = cursor.fetchone()[0]
+
+    cursor.execute(
+        """
+        INSERT INTO ogrenciler (ogrenci_no, bolum_id, ad_soyad, sinif)
+        SELECT 'BR' || g, %s, 'Bench ' || g, 1 FROM generate_series(1, %s) g
+        """, (bolum_id, ogrenci)
+    )
+    cursor.execute(
+        """
+        INSERT INTO dersler (bolum_id, ders_kodu, ders_adi, ogretim_elemani, sinif, ders_yapisi)
+        SELECT %s, 'BRD' || g, 'Bench ' || g, 'Bench', 1, 'Zorunlu' FROM generate_series(1, %s) g
+        """, (bolum_id, sinav)
+    )
+    cursor.execute(
+        """
+        INSERT INTO sinav_programi (bolum_id, program_adi, sinav_tipi, baslangic_tarihi, bitis_tarihi)
+        VALUES (%s, 'Bench RLS', 'Vize', CURRENT_DATE, CURRENT_DATE + 30) RETURNING program_id
+        """, (bolum_id,)
+    )
+    program_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO sinavlar (program_id, ders_id, tarih, baslangic_saati, bitis_saati)
+        SELECT %s, ders_id, CURRENT_DATE + (row_number() OVER () %% 30)::INT, '09:00', '10:00'
+        FROM dersler WHERE bolum_id = %s
+        """, (program_id, bolum_id)
+    )
+
+    # Kapasite/çakışma tetikleyicileri bu transaction için kapalı
+    cursor.execute("ALTER TABLE oturma_planlari DISABLE TRIGGER USER")
+    cursor.execute(
+        """
+        INSERT INTO oturma_planlari (sinav_id, derslik_id, ogrenci_no, satir_no, sutun_no)
+        SELECT s.sinav_id, %s, 'BR' || g, (g - 1) / 20 + 1, (g - 1) %% 20 + 1
+        FROM sinavlar s, generate_series(1, %s) g
+        WHERE s.program_id = %s
+        """, (derslik_id, ogrenci, program_id)
+    )
+    cursor.execute("ANALYZE users, sinav_programi, sinavlar, oturma_planlari")
+
+    cursor.execute(f"CREATE ROLE {ROLE} NOLOGIN")
+    cursor.execute(
+        f"GRANT SELECT ON users, sinav_programi, sinavlar, oturma_planlari TO {ROLE}"
+    )
+    return user_id
+
+
+def measure(cursor, label: str, user_id: int, repeat: int):
+    cursor.execute(f"SET LOCAL ROLE {ROLE}")
+    cursor.execute("SELECT set_app_context(%s)", (user_id,))
+
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(SCAN)
+        rows = len(cursor.fetchall())
+        best = min(best, time.perf_counter() - started)
+
+    cursor.execute("RESET ROLE")
+    print(f"{label:<26}{rows:>10}{best * 1000:>12.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RLS benchmark")
+    parser.add_argument('--ogrenci', type=int, default=1000)
+    parser.add_argument('--sinav', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db.initialize(DATABASE)
+
+    print(f"{'policy':<26}{'satır':>10}{'süre':>15}")
+    try:
+        with db.transaction() as conn:
+            with conn.cursor() as cursor:
+                user_id = _create_fixture(cursor, args.ogrenci, args.sinav)
+                measure(cursor, 'oturum bağlamı (yeni)', user_id, args.repeat)
+                cursor.execute(OLD_POLICIES)
+                measure(cursor, 'EXISTS / users (eski)', user_id, args.repeat)
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+    db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Row Factory Benchmark
+dict(zip(columns, row)) / RealDictRow / Record / columnar karşılaştırması
+
+Öğrenci listesi biçiminde sentetik satırlar generate_series ile üretilir;
+tablo verisine ihtiyaç yoktur.
+
+Kullanım:
+    python benchmarks/bench_row_factory.py [--rows 15000] [--repeat 5]
+"""
+
+import sys
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+# Proje root dizinini path'e ekle
+sys.path.append(str(Path(__file__).parent.parent))
+
+from psycopg2 import extras
+
+from models.database import db
+from models.rows import RecordCursor
+from config import DATABASE
+
+QUERY = """
+    SELECT 'O' || g AS ogrenci_no, 1 AS bolum_id, 'Ogrenci ' || g AS ad_soyad,
+           (g %% 5) + 1 AS sinif, TRUE AS aktif
+    FROM generate_series(1, %s) g
+"""
+
+
+def _dict_zip(cursor):
+    columns = [desc[0] for desc in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def measure(label, fetch, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fetch(rows)
+        best = min(best, time.perf_counter() - started)
+        del result
+
+    tracemalloc.start()
+    result = fetch(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f"{label:<22}{best * 1000:>10.1f} ms{current / 1024 / 1024:>10.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row factory benchmark")
+    parser.add_argument('--rows', type=int, default=15000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db.initialize(DATABASE)
+
+    def with_cursor(factory, convert):
+        def fetch(rows):
+            with db.get_connection() as conn:
+                with conn.cursor(cursor_factory=factory) as cursor:
+                    cursor.execute(QUERY, (rows,))
+                    return convert(cursor)
+        return fetch
+
+    print(f"{'mod':<22}{'süre':>13}{'bellek':>13}")
+    measure('dict(zip())', with_cursor(None, _dict_zip), args.rows, args.repeat)
+    measure('RealDictCursor', with_cursor(extras.RealDictCursor, lambda c: c.fetchall()),
+            args.rows, args.repeat)
+    measure('Record', with_cursor(RecordCursor, lambda c: c.fetchall()), args.rows, args.repeat)
+    measure('columnar (numpy)', lambda rows: db.fetch_columns(QUERY, (rows,)), args.rows, args.repeat)
+
+    db.close_all()
+
+
+if __name__ == "__main__":
+    main()
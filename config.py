@@ -46,6 +46,45 @@ class DatabaseConfig:
     POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
     POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
 
+    # Hazırlanmış (PREPARE) sorgular; PgBouncer transaction modunda kapatılmalı
+    USE_PREPARED = os.getenv("DB_USE_PREPARED", "1") == "1"
+    PREPARED_CACHE_SIZE = int(os.getenv("DB_PREPARED_CACHE_SIZE", "256"))
+
+    # Asenkron (asyncpg) havuz: arka plan işçileri (import, e-posta, export)
+    ASYNC_POOL_MIN = int(os.getenv("DB_ASYNC_POOL_MIN", "2"))
+    ASYNC_POOL_MAX = int(os.getenv("DB_ASYNC_POOL_MAX", "8"))
+
+    # db.stream() server-side cursor'ının her turda çektiği satır sayısı
+    STREAM_BATCH_SIZE = int(os.getenv("DB_STREAM_BATCH_SIZE", "2000"))
+
+    # Sorgu istatistikleri (fingerprint başına gecikme histogramı) ve
+    # bu süreyi (ms) aşan sorgular için slow-query log
+    QUERY_STATS = os.getenv("DB_QUERY_STATS", "1") == "1"
+    SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+    QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv("DB_QUERY_STATS_MAX_FINGERPRINTS", "1000"))
+
+    # Okuma replikaları: virgülle ayrılmış host[:port] listesi (boşsa her şey primary'de).
+    # Yazmadan sonraki REPLICA_STICKY_SECONDS boyunca okumalar primary'den yapılır;
+    # REPLICA_MAX_LAG'den fazla geride kalan replika atlanır (bu yüzden sticky >= max lag)
+    REPLICA_HOSTS = os.getenv("DB_REPLICA_HOSTS", "")
+    REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "2"))
+    REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "2"))
+
+    # Diğer istemcilerin değişikliklerini LISTEN/NOTIFY ile al (models/change_feed.py);
+    # kapalıysa ekranlar her CRUD işleminden sonra tabloyu baştan yükler
+    CHANGE_FEED = os.getenv("DB_CHANGE_FEED", "1") == "1"
+
+    # login_attempts / audit_logs satırları kuyrukta toplanıp arka planda toplu
+    # INSERT edilir (models/write_behind.py): BATCH_SIZE satır ya da ilk satırdan
+    # INTERVAL saniye sonra. Kuyruk MAX_ROWS'ta dolunca ekleyen en fazla
+    # PUT_TIMEOUT saniye bekler, sonra satır atılır. Kapalıysa satırlar anında yazılır
+    WRITE_BEHIND = os.getenv("DB_WRITE_BEHIND", "1") == "1"
+    WRITE_BEHIND_MAX_ROWS = int(os.getenv("DB_WRITE_BEHIND_MAX_ROWS", "10000"))
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("DB_WRITE_BEHIND_BATCH_SIZE", "500"))
+    WRITE_BEHIND_INTERVAL = float(os.getenv("DB_WRITE_BEHIND_INTERVAL", "2"))
+    WRITE_BEHIND_PUT_TIMEOUT = float(os.getenv("DB_WRITE_BEHIND_PUT_TIMEOUT", "1"))
+
     # SQLAlchemy connection string
     @classmethod
     def get_connection_string(cls):
@@ -59,9 +98,24 @@ class DatabaseConfig:
             'port': cls.PORT,
             'database': cls.DATABASE,
             'user': cls.USER,
-            'password': cls.PASSWORD
+            'password': cls.PASSWORD,
+            'replicas': cls.get_replica_params()
         }
 
+    # Replika host/port listesi (veritabanı adı ve kullanıcı primary ile aynı)
+    @classmethod
+    def get_replica_params(cls):
+        replicas = []
+        for entry in cls.REPLICA_HOSTS.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            host, _, port = entry.rpartition(":")
+            if not port.isdigit():
+                host, port = entry, cls.PORT
+            replicas.append({'host': host, 'port': int(port)})
+        return replicas
+
 
 # ============================================================
 # Uygulama Ayarları
@@ -79,6 +133,9 @@ class AppConfig:
 
     # Session ayarları
     SESSION_TIMEOUT = 3600  # 1 saat
+    # Doğrulanmış oturumların cache süresi ve last_activity toplu yazma aralığı (saniye)
+    SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "60"))
+    SESSION_ACTIVITY_FLUSH = int(os.getenv("SESSION_ACTIVITY_FLUSH", "30"))
     REMEMBER_ME_DAYS = 30
 
     # Güvenlik
@@ -87,10 +144,26 @@ class AppConfig:
     PASSWORD_REQUIRE_SPECIAL = True
     PASSWORD_REQUIRE_NUMBER = True
 
+    # bcrypt maliyeti (benchmarks/bench_bcrypt.py --calibrate ile ayarlanır) ve
+    # aynı anda çalışan / sırada bekleyebilen hash işlemi sayısı
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+    BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", "16"))
+
     # Rate limiting
     LOGIN_MAX_ATTEMPTS = 5
     LOGIN_LOCKOUT_DURATION = 300  # 5 dakika
 
+    # Login token-bucket limiti (models/rate_limiter.py): veritabanı ve bcrypt'ten
+    # önce e-posta ve IP başına; CacheConfig.BACKEND 'redis' ise istemciler arası.
+    # IP, LoginView'in verdiği makine adresidir (views/login_view.client_address);
+    # adres vermeyen çağıranlarda sadece e-posta limiti uygulanır
+    LOGIN_RATE_LIMIT = os.getenv("LOGIN_RATE_LIMIT", "1") == "1"
+    LOGIN_RATE_EMAIL_PER_MINUTE = float(os.getenv("LOGIN_RATE_EMAIL_PER_MINUTE", "5"))
+    LOGIN_RATE_EMAIL_BURST = int(os.getenv("LOGIN_RATE_EMAIL_BURST", "5"))
+    LOGIN_RATE_IP_PER_MINUTE = float(os.getenv("LOGIN_RATE_IP_PER_MINUTE", "30"))
+    LOGIN_RATE_IP_BURST = int(os.getenv("LOGIN_RATE_IP_BURST", "30"))
+
 
 # ============================================================
 # Excel Import Ayarları
@@ -215,9 +288,22 @@ class LogConfig:
 class CacheConfig:
     """Cache ayarları"""
 
-    ENABLED = True
+    ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
     TTL = 3600  # 1 saat
 
+    # 'local' (process-içi LRU) veya 'redis' (birden fazla istemci aynı cache'i paylaşır)
+    BACKEND = os.getenv("CACHE_BACKEND", "local")
+
+    # Bölüm/derslik/ders referans verisi (yazma işlemleri cache'i boşaltır)
+    REFERENCE_TTL = int(os.getenv("REFERENCE_CACHE_TTL", "600"))
+    REFERENCE_MAXSIZE = int(os.getenv("REFERENCE_CACHE_MAXSIZE", "2048"))
+
+    # Öğrenci oturma takvimi LRU boyutu (öğrenci x program) ve ömrü; bu
+    # istemcinin yazmaları cache'i commit sonrası boşaltır, TTL diğer
+    # istemcilerin değişiklikleri için üst sınırdır
+    SEAT_LOOKUP_MAXSIZE = int(os.getenv("SEAT_LOOKUP_MAXSIZE", "20000"))
+    SEAT_LOOKUP_TTL = int(os.getenv("SEAT_LOOKUP_TTL", "300"))
+
     # Redis (opsiyonel)
     REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
@@ -225,6 +311,57 @@ class CacheConfig:
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
 
 
+# ============================================================
+# E-posta Ayarları
+# ============================================================
+class EmailConfig:
+    """SMTP ve e-posta kuyruğu ayarları"""
+
+    SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_USER = os.getenv("SMTP_USER", "")
+    SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+    FROM_EMAIL = os.getenv("FROM_EMAIL", SMTP_USER)
+    FROM_NAME = os.getenv("FROM_NAME", "Kocaeli Üniversitesi")
+
+    # Öğrenci e-postası: <ogrenci_no>@STUDENT_EMAIL_DOMAIN (toplu bildirimler)
+    STUDENT_EMAIL_DOMAIN = os.getenv("STUDENT_EMAIL_DOMAIN", "ogr.kocaeli.edu.tr")
+
+    SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+
+    # Jinja2 e-posta şablonları (utils/email_templates.py); derlenmiş şablon
+    # bytecode'u açılışlar arasında TEMPLATE_CACHE_DIR'de saklanır
+    TEMPLATE_DIR = RESOURCES_DIR / "email_templates"
+    TEMPLATE_CACHE_DIR = TEMP_DIR / "email_template_cache"
+
+    # Yerel test sunucusu için ikisi de kapatılır:
+    # python -m aiosmtpd -n -l localhost:8025  ->  SMTP_STARTTLS=0 SMTP_AUTH=0
+    SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+    SMTP_AUTH = os.getenv("SMTP_AUTH", "1") == "1"
+
+    # Açık tutulan SMTP bağlantıları (utils/email_service.py): her mesajda
+    # bağlan + STARTTLS + login yerine. Bağlantı MAX_MESSAGES mesajdan sonra ya
+    # da IDLE_TIMEOUT saniye boşta kaldıysa yenilenir
+    SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+    SMTP_MAX_MESSAGES = int(os.getenv("SMTP_MAX_MESSAGES", "100"))
+    SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+
+    # email_queue işleyicisi (models/email_queue.py): SMTP_POOL_SIZE worker,
+    # her biri BATCH_SIZE satırı FOR UPDATE SKIP LOCKED ile alır; kuyruk boşsa
+    # POLL_INTERVAL saniye bekler. Alınan satır LEASE saniye diğer istemcilere
+    # görünmez. Başarısız gönderim RETRY_BASE * 2^(deneme-1) saniye (en fazla
+    # RETRY_MAX) sonra, max_attempts'e kadar tekrar denenir
+    QUEUE_WORKER = os.getenv("EMAIL_QUEUE_WORKER", "1") == "1"
+    QUEUE_BATCH_SIZE = int(os.getenv("EMAIL_QUEUE_BATCH_SIZE", "50"))
+    QUEUE_POLL_INTERVAL = float(os.getenv("EMAIL_QUEUE_POLL_INTERVAL", "10"))
+    QUEUE_LEASE = int(os.getenv("EMAIL_QUEUE_LEASE", "300"))
+    RETRY_BASE = float(os.getenv("EMAIL_RETRY_BASE", "60"))
+    RETRY_MAX = float(os.getenv("EMAIL_RETRY_MAX", "3600"))
+
+    # Kimlik doğrulama istenmiyorsa sunucu adresi yeterli
+    ENABLED = bool(SMTP_HOST) and (not SMTP_AUTH or bool(SMTP_USER and SMTP_PASSWORD))
+
+
 # ============================================================
 # UI Tema Ayarları
 # ============================================================
@@ -322,7 +459,11 @@ SECURITY = {
     'password_require_special': AppConfig.PASSWORD_REQUIRE_SPECIAL,
     'password_require_number': AppConfig.PASSWORD_REQUIRE_NUMBER,
     'login_max_attempts': AppConfig.LOGIN_MAX_ATTEMPTS,
-    'login_lockout_duration': AppConfig.LOGIN_LOCKOUT_DURATION
+    'login_lockout_duration': AppConfig.LOGIN_LOCKOUT_DURATION,
+    # LoginController (dakika cinsinden)
+    'max_login_attempts': AppConfig.LOGIN_MAX_ATTEMPTS,
+    'account_lock_duration': AppConfig.LOGIN_LOCKOUT_DURATION // 60,
+    'session_timeout': AppConfig.SESSION_TIMEOUT // 60
 }
 MESSAGES = {
     'login_success': 'Başarıyla giriş yaptınız',
@@ -369,6 +510,7 @@ __all__ = [
     'PDFConfig',
     'LogConfig',
     'CacheConfig',
+    'EmailConfig',
     'ThemeConfig',
     'DepartmentConfig',
     'BASE_DIR',
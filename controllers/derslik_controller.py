@@ -3,7 +3,7 @@ Derslik Controller
 Derslik i_lemleri iin business logic
 """
 
-from models.database import db
+from models.database import db, CancellationToken
 from models.derslik_model import DerslikModel
 from typing import List, Dict, Optional
 import logging
@@ -63,10 +63,26 @@ class DerslikController:
             logger.error(f"Derslik listesi hatas1: {e}")
             return []
 
-    def search_derslik(self, search_term: str, bolum_id: int = None) -> List[Dict]:
-        """Derslik ara"""
+    def get_derslikler_by_ids(self, derslik_ids: List[int]) -> Optional[List[Dict]]:
+        """Bildirimi gelen derslikleri gncel haliyle getir (hata: None)"""
         try:
-            return self.model.search_derslik(search_term, bolum_id)
+            return self.model.get_derslikler_by_ids(derslik_ids)
+        except Exception as e:
+            logger.error(f"Derslik listesi hatas1: {e}")
+            return None
+
+    def search_derslik(self, search_term: str, bolum_id: int = None,
+                       timeout_ms: int = None, cancel_token: CancellationToken = None) -> List[Dict]:
+        """
+        Derslik ara
+
+        Eski aramay1 durdurmak iin cancel_token.cancel() ar1labilir;
+        iptal edilen veya timeout_ms'i a_an arama bo_ liste dner.
+        """
+        try:
+            with db.query_options(timeout_ms, cancel_token) as opts:
+                sonuc = self.model.search_derslik(search_term, bolum_id)
+            return [] if opts.interrupted else sonuc
         except Exception as e:
             logger.error(f"Derslik arama hatas1: {e}")
             return []
@@ -8,9 +8,10 @@ import pandas as pd
 from typing import List, Dict, Tuple, Optional
 import logging
 from pathlib import Path
-from models.database import db
+from models.database import db, CancellationToken
 from models.ders_model import DersModel
 from models.ogrenci_model import OgrenciModel
+from models.oturma_model import OturmaModel
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class ExcelController:
     def __init__(self):
         self.ders_model = DersModel(db)
         self.ogrenci_model = OgrenciModel(db)
+        self.oturma_model = OturmaModel(db)
 
     def parse_ders_listesi(self, file_path: str, bolum_id: int) -> Tuple[bool, str, List[Dict]]:
         """
@@ -192,14 +194,18 @@ class ExcelController:
             if not success:
                 return False, message, 0, 0
 
-            # nce rencileri ekle
-            basarili_ogr, hatali_ogr = self.ogrenci_model.create_ogrenci_batch(ogrenciler)
+            # renciler ve ders kay1tlar1 tek transaction'da; hatal1 kay1t sadece
+            # kendi savepoint'ini geri al1r
+            with db.transaction():
+                # nce rencileri ekle
+                basarili_ogr, hatali_ogr = self.ogrenci_model.create_ogrenci_batch(ogrenciler)
 
-            # Sonra ders kay1tlar1n1 ekle
-            basarili_ders = 0
-            for kayit in ders_kayitlari:
-                if self.ogrenci_model.add_ders_kayit_by_code(kayit['ogrenci_no'], kayit['ders_kodu']):
-                    basarili_ders += 1
+                # Sonra ders kay1tlar1n1 ekle
+                basarili_ders = 0
+                for kayit in ders_kayitlari:
+                    with db.savepoint():
+                        if self.ogrenci_model.add_ders_kayit_by_code(kayit['ogrenci_no'], kayit['ders_kodu']):
+                            basarili_ders += 1
 
             return True, f"{basarili_ogr} renci, {basarili_ders} ders kayd1 eklendi", basarili_ogr, basarili_ders
 
@@ -207,6 +213,82 @@ class ExcelController:
             logger.error(f"renci import hatas1: {e}")
             return False, f"Hata: {str(e)}", 0, 0
 
+    def export_oturma_plani(self, program_id: int, file_path: str, timeout_ms: int = None,
+                            cancel_token: CancellationToken = None) -> Tuple[bool, str, int]:
+        """
+        Programdaki tm oturma planlar1n1 Excel'e aktar
+
+        cancel_token.cancel() aktar1m1 bir sonraki batch'te durdurur; dosya
+        yaz1lmaz.
+
+        Sat1rlar server-side cursor'dan write-only al1_ma sayfas1na ak1t1l1r;
+        bellek kullan1m1 program byklnden ba1ms1zd1r.
+
+        Returns:
+            (ba_ar1l1_m1, mesaj, sat1r_say1s1)
+        """
+        opts = None
+        try:
+            wb = openpyxl.Workbook(write_only=True)
+            # Ba_l1klar dosyan1n kodlamas1ndan ba1ms1z olsun diye escape ile yaz1ld1
+            ws = wb.create_sheet("Oturma Plan\u0131")
+            ws.append(['Tarih', 'Saat', 'Ders Kodu', 'Ders Ad\u0131', 'Derslik',
+                       'S\u0131ra', 'S\u00fctun', '\u00d6\u011frenci No', 'Ad Soyad'])
+
+            satir = 0
+            with db.replica_reads(), db.query_options(timeout_ms, cancel_token) as opts:
+                for row in self.oturma_model.iter_oturma_by_program(program_id):
+                    ws.append([
+                        row['tarih'], row['baslangic_saati'], row['ders_kodu'], row['ders_adi'],
+                        row['derslik_adi'], row['satir_no'], row['sutun_no'],
+                        row['ogrenci_no'], row['ad_soyad']
+                    ])
+                    satir += 1
+
+            wb.save(file_path)
+            return True, f"{satir} oturma kayd1 aktar1ld1", satir
+
+        except Exception as e:
+            if opts is not None and opts.interrupted:
+                return False, self._kesinti_mesaji(opts), 0
+            logger.error(f"Oturma plan1 export hatas1: {e}")
+            return False, f"Hata: {str(e)}", 0
+
+    def export_ogrenci_listesi(self, bolum_id: int, file_path: str, timeout_ms: int = None,
+                               cancel_token: CancellationToken = None) -> Tuple[bool, str, int]:
+        """
+        Blmn renci listesini Excel'e aktar (server-side cursor ile)
+
+        Returns:
+            (ba_ar1l1_m1, mesaj, sat1r_say1s1)
+        """
+        opts = None
+        try:
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("\u00d6\u011frenciler")
+            ws.append(['\u00d6\u011frenci No', 'Ad Soyad', 'S\u0131n\u0131f'])
+
+            satir = 0
+            with db.replica_reads(), db.query_options(timeout_ms, cancel_token) as opts:
+                for row in self.ogrenci_model.iter_ogrenciler_by_bolum(bolum_id):
+                    ws.append([row['ogrenci_no'], row['ad_soyad'], row['sinif']])
+                    satir += 1
+
+            wb.save(file_path)
+            return True, f"{satir} renci aktar1ld1", satir
+
+        except Exception as e:
+            if opts is not None and opts.interrupted:
+                return False, self._kesinti_mesaji(opts), 0
+            logger.error(f"renci listesi export hatas1: {e}")
+            return False, f"Hata: {str(e)}", 0
+
+    def _kesinti_mesaji(self, opts) -> str:
+        """0ptal/zaman a_1m1 ile durdurulan aktar1m iin mesaj"""
+        if opts.cancelled:
+            return "Aktar1m iptal edildi"
+        return "Aktar1m zaman a_1m1 nedeniyle durduruldu"
+
     def _find_column(self, df: pd.DataFrame, possible_names: List[str]) -> Optional[str]:
         """DataFrame'de kolon ad1n1 bul"""
         for col in df.columns:
@@ -7,7 +7,9 @@ import uuid
 import logging
 from typing import Dict, Any
 
+from models.database import db
 from models.user_model import UserModel
+from models.rate_limiter import login_limiter
 from utils.validators import EmailValidator, PasswordValidator
 from config import SECURITY, MESSAGES
 
@@ -18,7 +20,7 @@ class LoginController:
     """Login business logic controller"""
 
     def __init__(self):
-        self.user_model = UserModel()
+        self.user_model = UserModel(db)
         self.email_validator = EmailValidator()
         self.password_validator = PasswordValidator()
 
@@ -53,68 +55,58 @@ class LoginController:
         # Normalize email
         email = email.strip().lower()
 
-        # Find user
-        user = self.user_model.find_by_email(email)
+        # Token bucket per email/IP: bursts stop here, before the database and bcrypt
+        wait_seconds = login_limiter.check(email, ip_address)
+        if wait_seconds:
+            self.user_model.log_rate_limited(email, ip_address, user_agent)
+            return {
+                'success': False,
+                'message': f'Çok fazla giriş denemesi. {wait_seconds} saniye sonra tekrar deneyin'
+            }
 
-        if not user:
-            # User not found
-            self.user_model.log_login_attempt(
-                email, False, ip_address, user_agent, 'user_not_found'
-            )
+        # Lookup + account state; unusable accounts are logged by the function
+        user = self.user_model.auth_begin(email, ip_address, user_agent)
+        durum = user['durum']
+
+        if durum == 'user_not_found':
             logger.warning(f"Login attempt for non-existent user: {email}")
             return {
                 'success': False,
                 'message': 'E-posta veya şifre hatalı'
             }
 
-        # Check if account is active
-        if not user['aktif']:
-            self.user_model.log_login_attempt(
-                email, False, ip_address, user_agent, 'account_inactive'
-            )
+        if durum == 'account_inactive':
             logger.warning(f"Login attempt for inactive account: {email}")
             return {
                 'success': False,
                 'message': 'Hesabınız devre dışı bırakılmış. Lütfen sistem yöneticisi ile iletişime geçin'
             }
 
-        # Check if account is locked
-        if self.user_model.is_account_locked(user['user_id']):
-            remaining_minutes = self.user_model.get_remaining_lock_time(user['user_id'])
-            self.user_model.log_login_attempt(
-                email, False, ip_address, user_agent, 'account_locked'
-            )
+        if durum == 'account_locked':
             logger.warning(f"Login attempt for locked account: {email}")
             return {
                 'success': False,
-                'message': f'Hesabınız kilitlendi. {remaining_minutes} dakika sonra tekrar deneyin'
+                'message': f'Hesabınız kilitlendi. {user["kalan_dakika"]} dakika sonra tekrar deneyin'
             }
 
-        # Verify password
+        # Verify password (client-side bcrypt; the plain password never leaves the client)
         if not self.user_model.verify_password(password, user['password_hash']):
-            # Wrong password
-            failed_count = self.user_model.increment_failed_attempts(user['user_id'])
-
-            # Lock account after max attempts
-            if failed_count >= SECURITY['max_login_attempts']:
-                self.user_model.lock_account(
-                    user['user_id'],
-                    SECURITY['account_lock_duration']
-                )
-                self.user_model.log_login_attempt(
-                    email, False, ip_address, user_agent, 'account_locked_max_attempts'
-                )
+            result = self.user_model.auth_complete(
+                user['user_id'], email, False,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                max_attempts=SECURITY['max_login_attempts'],
+                lock_minutes=SECURITY['account_lock_duration']
+            )
+
+            if result['locked']:
                 logger.warning(f"Account locked due to max failed attempts: {email}")
                 return {
                     'success': False,
                     'message': f'Çok fazla başarısız deneme. Hesabınız {SECURITY["account_lock_duration"]} dakika kilitlendi'
                 }
 
-            self.user_model.log_login_attempt(
-                email, False, ip_address, user_agent, 'invalid_password'
-            )
-
-            remaining_attempts = SECURITY['max_login_attempts'] - failed_count
+            remaining_attempts = SECURITY['max_login_attempts'] - result['failed_attempts']
             return {
                 'success': False,
                 'message': f'Şifre hatalı. Kalan deneme hakkı: {remaining_attempts}'
@@ -122,26 +114,29 @@ class LoginController:
 
         # ✅ LOGIN SUCCESS
 
-        # Reset failed attempts
-        self.user_model.reset_failed_attempts(user['user_id'])
+        # Counter/lock reset, son_giris, session and login log in one call
+        session_id = str(uuid.uuid4())
+        try:
+            self.user_model.auth_complete(
+                user['user_id'], email, True,
+                session_id=session_id,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                session_minutes=SECURITY['session_timeout']
+            )
+        except Exception as e:
+            logger.error(f"Login session could not be created for {email}: {e}")
+            return {
+                'success': False,
+                'message': 'Oturum başlatılamadı. Lütfen tekrar deneyin'
+            }
 
-        # Update last login
-        self.user_model.update_last_login(user['user_id'])
+        login_limiter.success(email)
 
-        # Create session
-        session_id = str(uuid.uuid4())
-        self.user_model.create_session(
-            user['user_id'],
-            session_id,
-            ip_address,
-            user_agent,
-            SECURITY['session_timeout']
-        )
-
-        # Log successful login
-        self.user_model.log_login_attempt(
-            email, True, ip_address, user_agent
-        )
+        # Row-level security context for this user's connections
+        db.set_session_user(user['user_id'])
+        self.user_model.log_audit('LOGIN', user['user_id'], ip_address=ip_address,
+                                  user_agent=user_agent)
 
         logger.info(f"Successful login: {email} (Role: {user['role']}, User ID: {user['user_id']})")
 
@@ -175,6 +170,9 @@ class LoginController:
         """
         try:
             self.user_model.delete_session(session_id)
+            if db.session_user is not None:
+                self.user_model.log_audit('LOGOUT', db.session_user)
+            db.set_session_user(None)
             logger.info(f"User logged out: session={session_id[:8]}...")
             return {
                 'success': True,
@@ -270,6 +268,7 @@ class LoginController:
             # Hash and update
             new_hash = self.user_model.hash_password(new_password)
             self.user_model.update_password(user_id, new_hash)
+            self.user_model.log_audit('PASSWORD_CHANGE', user_id, 'users', user_id)
 
             logger.info(f"Password changed for user: {user['email']}")
 
@@ -3,8 +3,9 @@ Oturma Controller
 Oturma plan1 i_lemleri iin business logic
 """
 
-from models.database import db
+from models.database import db, CancellationToken
 from models.oturma_model import OturmaModel
+from models.bildirim_model import BildirimModel
 from models.sinav_model import SinavModel
 from typing import List, Dict, Optional, Tuple
 import logging
@@ -18,6 +19,7 @@ class OturmaController:
     def __init__(self):
         self.oturma_model = OturmaModel(db)
         self.sinav_model = SinavModel(db)
+        self.bildirim_model = BildirimModel(db)
 
     def generate_oturma_plan(self, sinav_id: int) -> Tuple[bool, str]:
         """
@@ -30,11 +32,13 @@ class OturmaController:
             (ba_ar1l1_m1, mesaj)
         """
         try:
-            # nce mevcut plan1 sil
-            self.oturma_model.delete_oturma_by_sinav(sinav_id)
+            # Silme ve yeniden olu_turma tek transaction: hata olursa eski plan kal1r
+            with db.transaction():
+                # nce mevcut plan1 sil
+                self.oturma_model.delete_oturma_by_sinav(sinav_id)
 
-            # Yeni plan olu_tur
-            success = self.oturma_model.generate_oturma_plan(sinav_id)
+                # Yeni plan olu_tur
+                success = self.oturma_model.generate_oturma_plan(sinav_id)
 
             if success:
                 return True, "Oturma plan1 ba_ar1yla olu_turuldu"
@@ -69,6 +73,42 @@ class OturmaController:
             logger.error(f"renci oturma yeri getirme hatas1: {e}")
             return None
 
+    def get_ogrenci_takvimi(self, program_id: int, ogrenci_no: str,
+                            timeout_ms: int = None, cancel_token: CancellationToken = None) -> List[Dict]:
+        """rencinin programdaki tm s1nav ve oturma yerlerini getir"""
+        try:
+            with db.query_options(timeout_ms, cancel_token) as opts:
+                takvim = self.oturma_model.get_ogrenci_takvimi(program_id, ogrenci_no.strip())
+            return [] if opts.interrupted else takvim
+        except Exception as e:
+            logger.error(f"renci takvimi getirme hatas1: {e}")
+            return []
+
+    def get_program_takvimleri(self, program_id: int, timeout_ms: int = None,
+                               cancel_token: CancellationToken = None) -> Dict[str, List[Dict]]:
+        """Programdaki tm rencilerin takvimlerini getir (export iin)"""
+        try:
+            with db.query_options(timeout_ms, cancel_token) as opts:
+                takvimler = self.oturma_model.get_program_takvimleri(program_id)
+            return {} if opts.interrupted else takvimler
+        except Exception as e:
+            logger.error(f"Program takvimleri getirme hatas1: {e}")
+            return {}
+
+    def sinav_takvimi_bildir(self, program_id: int) -> Tuple[bool, str]:
+        """Programdaki tm rencilere s1nav takvimi e-postas1 kuyrukla"""
+        try:
+            sayi = self.bildirim_model.sinav_takvimi_kuyrukla(program_id)
+
+            if sayi:
+                return True, f"{sayi} renciye s1nav takvimi e-postas1 kuyrua eklendi"
+            else:
+                return False, "Programda oturma plan1 olan renci yok"
+
+        except Exception as e:
+            logger.error(f"S1nav takvimi bildirimi hatas1: {e}")
+            return False, f"Hata: {str(e)}"
+
     def delete_oturma_by_sinav(self, sinav_id: int) -> Tuple[bool, str]:
         """S1nava ait oturma plan1n1 sil"""
         try:
@@ -3,7 +3,7 @@ S1nav Controller
 S1nav program1 i_lemleri iin business logic
 """
 
-from models.database import db
+from models.database import db, CancellationToken
 from models.sinav_model import SinavModel
 from models.ders_model import DersModel
 from models.derslik_model import DerslikModel
@@ -98,67 +98,78 @@ class SinavController:
             if not available_dates:
                 return False, "Uygun tarih bulunamad1"
 
-            # Her ders iin s1nav planla
-            date_index = 0
-            slot_index = 0
-            basarili = 0
-            hatali = 0
-
-            for ders_id in ders_ids:
-                try:
-                    # Ders bilgilerini al
-                    ders = self.ders_model.get_ders_by_id(ders_id)
-                    if not ders:
+            # Temizleme ve yeni s1navlar tek transaction: yar1m kalan program olu_maz,
+            # hatal1 ders sadece kendi savepoint'ini geri al1r
+            with db.transaction():
+                # nceki srm toplu sil (program kayd1 korunur)
+                silinen = self.sinav_model.purge_program(program_id, keep_program=True)
+                if silinen is None or silinen < 0:
+                    return False, "nceki s1nav program1 temizlenemedi"
+
+                # Her ders iin s1nav planla
+                date_index = 0
+                slot_index = 0
+                basarili = 0
+                hatali = 0
+
+                for ders_id in ders_ids:
+                    try:
+                        with db.savepoint():
+                            # Ders bilgilerini al
+                            ders = self.ders_model.get_ders_by_id(ders_id)
+                            if not ders:
+                                hatali += 1
+                                continue
+
+                            # renci say1s1n1 al
+                            ogrenci_sayisi = self.ogrenci_model.get_ogrenci_count_by_ders(ders_id)
+
+                            # Tarih ve saat belirle
+                            if date_index >= len(available_dates):
+                                hatali += 1
+                                logger.warning(f"Ders {ders_id} iin tarih bulunamad1")
+                                continue
+
+                            tarih = available_dates[date_index]
+                            saat_tuple = exam_slots[slot_index]
+                            baslangic_saati = time(saat_tuple[0], saat_tuple[1])
+
+                            # S1nav sresi
+                            sinav_suresi = program['varsayilan_sinav_suresi']
+                            bitis_saati = (datetime.combine(date.today(), baslangic_saati) +
+                                           timedelta(minutes=sinav_suresi)).time()
+
+                            # S1nav olu_tur
+                            sinav_id = self.sinav_model.create_sinav(
+                                program_id, ders_id, tarih, baslangic_saati, bitis_saati
+                            )
+
+                            if sinav_id:
+                                # renci say1s1n1 gncelle
+                                # Derslik seimi nceden; gncelleme ve atama tek round trip
+                                derslikler = self.derslik_model.get_suitable_derslikler(bolum_id, ogrenci_sayisi)
+
+                                with db.pipeline() as pipe:
+                                    self.sinav_model.update_ogrenci_sayisi(sinav_id, pipe=pipe)
+                                    if derslikler:
+                                        # 0lk uygun derslii ata
+                                        self.sinav_model.assign_derslik_to_sinav(
+                                            sinav_id, derslikler[0]['derslik_id'], pipe=pipe
+                                        )
+
+                                basarili += 1
+                            else:
+                                hatali += 1
+
+                            # Sonraki slot'a ge
+                            slot_index += 1
+                            if slot_index >= len(exam_slots):
+                                slot_index = 0
+                                date_index += 1
+
+                    except Exception as e:
+                        logger.error(f"Ders {ders_id} iin s1nav olu_turma hatas1: {e}")
                         hatali += 1
-                        continue
-
-                    # renci say1s1n1 al
-                    ogrenci_sayisi = self.ogrenci_model.get_ogrenci_count_by_ders(ders_id)
-
-                    # Tarih ve saat belirle
-                    if date_index >= len(available_dates):
-                        hatali += 1
-                        logger.warning(f"Ders {ders_id} iin tarih bulunamad1")
-                        continue
-
-                    tarih = available_dates[date_index]
-                    saat_tuple = exam_slots[slot_index]
-                    baslangic_saati = time(saat_tuple[0], saat_tuple[1])
-
-                    # S1nav sresi
-                    sinav_suresi = program['varsayilan_sinav_suresi']
-                    bitis_saati = (datetime.combine(date.today(), baslangic_saati) +
-                                   timedelta(minutes=sinav_suresi)).time()
-
-                    # S1nav olu_tur
-                    sinav_id = self.sinav_model.create_sinav(
-                        program_id, ders_id, tarih, baslangic_saati, bitis_saati
-                    )
-
-                    if sinav_id:
-                        # renci say1s1n1 gncelle
-                        self.sinav_model.update_ogrenci_sayisi(sinav_id)
-
-                        # Uygun derslikleri bul ve ata
-                        derslikler = self.derslik_model.get_suitable_derslikler(bolum_id, ogrenci_sayisi)
-
-                        if derslikler:
-                            # 0lk uygun derslii ata
-                            self.sinav_model.assign_derslik_to_sinav(sinav_id, derslikler[0]['derslik_id'])
-
-                        basarili += 1
-                    else:
-                        hatali += 1
-
-                    # Sonraki slot'a ge
-                    slot_index += 1
-                    if slot_index >= len(exam_slots):
-                        slot_index = 0
-                        date_index += 1
-
-                except Exception as e:
-                    logger.error(f"Ders {ders_id} iin s1nav olu_turma hatas1: {e}")
-                    hatali += 1
 
             if basarili > 0:
                 return True, f"{basarili} s1nav olu_turuldu, {hatali} hatal1"
@@ -169,18 +180,28 @@ class SinavController:
             logger.error(f"S1nav program1 olu_turma hatas1: {e}")
             return False, f"Hata: {str(e)}"
 
-    def get_sinavlar_by_program(self, program_id: int) -> List[Dict]:
-        """Programa ait s1navlar1 getir"""
+    def get_sinavlar_by_program(self, program_id: int, timeout_ms: int = None,
+                                cancel_token: CancellationToken = None) -> List[Dict]:
+        """
+        Programa ait s1navlar1 getir (raporlar)
+
+        Sorgu iptal edilirse veya timeout_ms'i a_arsa bo_ liste dner.
+        """
         try:
-            return self.sinav_model.get_sinavlar_by_program(program_id)
+            with db.query_options(timeout_ms, cancel_token) as opts:
+                sinavlar = self.sinav_model.get_sinavlar_by_program(program_id)
+            return [] if opts.interrupted else sinavlar
         except Exception as e:
             logger.error(f"S1nav listesi hatas1: {e}")
             return []
 
-    def get_program_by_id(self, program_id: int) -> Optional[Dict]:
-        """Program bilgilerini getir"""
+    def get_program_by_id(self, program_id: int, timeout_ms: int = None,
+                          cancel_token: CancellationToken = None) -> Optional[Dict]:
+        """Program bilgilerini getir (iptal/timeout: None)"""
         try:
-            return self.sinav_model.get_program_by_id(program_id)
+            with db.query_options(timeout_ms, cancel_token) as opts:
+                program = self.sinav_model.get_program_by_id(program_id)
+            return None if opts.interrupted else program
         except Exception as e:
             logger.error(f"Program getirme hatas1: {e}")
             return None
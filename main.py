@@ -14,8 +14,13 @@ from PySide6.QtGui import QPixmap, QFont, QColor
 # Proje kökünü path'e ekle
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config import DATABASE, LOGGING, APP, UI
+from config import DATABASE, LOGGING, APP, UI, DatabaseConfig, EmailConfig
 from models.database import db
+from models.change_feed import change_feed
+from models.email_queue import email_queue_worker
+from models.password_hasher import password_hasher
+from models.session_cache import session_cache
+from models import write_behind
 from controllers.login_controller import LoginController
 from views.login_view import LoginView
 from views.main_window import MainWindow
@@ -108,6 +113,10 @@ class MainApplication(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            # Oturumu sil (session cache'ten de düşer)
+            if self.current_user and self.current_user.get('session_id'):
+                self.login_controller.logout(self.current_user['session_id'])
+
             # Clear data
             self.current_user = None
             
@@ -179,6 +188,10 @@ def initialize_database():
         # Test connection
         if db.test_connection():
             logger.info("Database connection successful")
+            if DatabaseConfig.CHANGE_FEED:
+                change_feed.start(DATABASE)
+            if EmailConfig.QUEUE_WORKER and EmailConfig.ENABLED:
+                email_queue_worker.start()
             return True
         else:
             logger.error("Database connection test failed")
@@ -277,6 +290,11 @@ def main():
         # Cleanup
         logger.info("Application closing...")
         logger.info("Closing database connections...")
+        change_feed.stop()
+        email_queue_worker.stop()
+        password_hasher.shutdown()
+        session_cache.stop()
+        write_behind.stop_all()
         db.close_all()
         
         if exit_code == 0:
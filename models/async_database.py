@@ -0,0 +1,235 @@
+"""
+Async Database Manager
+asyncpg pool for headless workloads (imports, e-mail, exports)
+
+Many coroutines share a handful of connections: each query holds a
+connection only while it runs, so hundreds of concurrent lookups can be
+multiplexed without a thread (and a pooled connection) per task.
+
+    from models.async_database import async_db
+
+    async def main():
+        await async_db.initialize(DATABASE)
+        rows = await async_db.fetch("SELECT ... WHERE bolum_id = %s", bolum_id)
+        await async_db.close()
+
+Queries use the same %s placeholders as DatabaseManager; they are rewritten
+to $n once per query text. Rows are asyncpg Records (row['col'], get(),
+dict(row)).
+
+Row-level security sees the user given to set_session_user() (no user:
+no department rows), applied with set_app_context() when a connection is
+opened and again in the reset that runs on every release, since asyncpg's
+RESET ALL would otherwise clear it.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from config import DatabaseConfig
+from .database import _to_positional
+from .rows import Record, record_class
+
+logger = logging.getLogger(__name__)
+
+# Connection bound by async_db.transaction() for the current task
+_current_conn: ContextVar[Optional[asyncpg.Connection]] = ContextVar('async_db_connection', default=None)
+
+
+@lru_cache(maxsize=512)
+def _sql(query: str) -> str:
+    return _to_positional(query)[0]
+
+
+class AsyncDatabaseManager:
+    """Singleton asyncpg pool with the DatabaseManager query surface"""
+
+    _instance = None
+    _pool: Optional[asyncpg.Pool] = None
+    _session_user: Optional[int] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    async def initialize(self, config: Dict[str, Any]):
+        """Create the pool (call once from the worker's event loop)"""
+        if self._pool is None:
+            try:
+                self._pool = await asyncpg.create_pool(
+                    host=config['host'],
+                    port=config['port'],
+                    database=config['database'],
+                    user=config['user'],
+                    password=config['password'],
+                    min_size=config.get('async_min_size', DatabaseConfig.ASYNC_POOL_MIN),
+                    max_size=config.get('async_max_size', DatabaseConfig.ASYNC_POOL_MAX),
+                    # asyncpg prepares every statement; this is its per-connection cache
+                    statement_cache_size=config.get('prepared_cache_size', DatabaseConfig.PREPARED_CACHE_SIZE),
+                    init=self._init_connection,
+                    reset=self._reset_connection
+                )
+                logger.info("[OK] Async database pool initialized")
+            except Exception as e:
+                logger.error(f"[ERROR] Async database initialization failed: {e}")
+                raise
+
+    async def set_session_user(self, user_id: Optional[int]):
+        """
+        User for row-level security (None: no user)
+
+        Open connections are replaced so none keeps the previous user's
+        context; a worker normally sets this once, before its first query.
+        """
+        if user_id == self._session_user:
+            return
+        self._session_user = user_id
+        if self._pool is not None:
+            await self._pool.expire_connections()
+
+    @property
+    def session_user(self) -> Optional[int]:
+        """User id set by set_session_user()"""
+        return self._session_user
+
+    def _context_query(self) -> str:
+        user_id = self._session_user
+        return f"SELECT set_app_context({'NULL' if user_id is None else int(user_id)})"
+
+    async def _init_connection(self, conn: asyncpg.Connection):
+        await conn.execute(self._context_query())
+
+    async def _reset_connection(self, conn: asyncpg.Connection):
+        # Default reset (ends with RESET ALL) and the context in one round trip
+        await conn.execute(conn.get_reset_query() + self._context_query())
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Connection for the current task (the transaction's one, if any)"""
+        conn = _current_conn.get()
+        if conn is not None:
+            yield conn
+            return
+
+        async with self._pool.acquire() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Unit of work for the current task
+
+        Queries awaited inside the block run on one connection and commit
+        together; nested blocks become savepoints.
+        """
+        conn = _current_conn.get()
+        if conn is not None:
+            async with conn.transaction():
+                yield conn
+            return
+
+        async with self._pool.acquire() as conn:
+            token = _current_conn.set(conn)
+            try:
+                async with conn.transaction():
+                    yield conn
+            finally:
+                _current_conn.reset(token)
+
+    def in_transaction(self) -> bool:
+        """True inside a transaction() block of the current task"""
+        return _current_conn.get() is not None
+
+    async def gather(self, *aws: Awaitable) -> List[Any]:
+        """
+        Await queries concurrently over the pool
+
+        Inside a transaction() block they all share one connection, which
+        runs one query at a time ("another operation is in progress"), so
+        they are awaited one after another there instead.
+        """
+        if not self.in_transaction():
+            return list(await asyncio.gather(*aws))
+
+        results = []
+        try:
+            for aw in aws:
+                results.append(await aw)
+        finally:
+            # Not started after a failure: close to avoid "never awaited"
+            for aw in aws[len(results) + 1:]:
+                if asyncio.iscoroutine(aw):
+                    aw.close()
+        return results
+
+    async def fetch(self, query: str, *args) -> List[asyncpg.Record]:
+        """Execute SELECT query and return all rows"""
+        async with self.acquire() as conn:
+            return await conn.fetch(_sql(query), *args)
+
+    async def fetchrow(self, query: str, *args) -> Optional[asyncpg.Record]:
+        """Execute query and return the first row"""
+        async with self.acquire() as conn:
+            return await conn.fetchrow(_sql(query), *args)
+
+    async def fetchval(self, query: str, *args) -> Any:
+        """Execute query and return the first column of the first row"""
+        async with self.acquire() as conn:
+            return await conn.fetchval(_sql(query), *args)
+
+    async def execute(self, query: str, *args) -> int:
+        """Execute INSERT/UPDATE/DELETE query and return affected rows"""
+        async with self.acquire() as conn:
+            status = await conn.execute(_sql(query), *args)
+        return _rowcount(status)
+
+    async def executemany(self, query: str, args: Iterable[Sequence]):
+        """Run one statement for many parameter tuples (pipelined)"""
+        async with self.acquire() as conn:
+            await conn.executemany(_sql(query), args)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Pool size and idle connections"""
+        if self._pool is None:
+            return {}
+        return {
+            'size': self._pool.get_size(),
+            'idle': self._pool.get_idle_size(),
+            'min_size': self._pool.get_min_size(),
+            'max_size': self._pool.get_max_size()
+        }
+
+    async def close(self):
+        """Close the pool"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+            logger.info("[OK] Async database pool closed")
+
+
+def to_records(rows: Iterable[asyncpg.Record]) -> Tuple[Record, ...]:
+    """asyncpg rows as DatabaseManager's Record type (for caches both share)"""
+    rows = list(rows)
+    if not rows:
+        return ()
+    make = record_class(tuple(rows[0].keys()))
+    return tuple(make(tuple(row.values())) for row in rows)
+
+
+def _rowcount(status: str) -> int:
+    """'INSERT 0 5' / 'UPDATE 3' / 'COPY 10' -> row count"""
+    try:
+        return int(status.rsplit(' ', 1)[-1])
+    except (ValueError, AttributeError, IndexError):
+        return 0
+
+
+# Global async database instance
+async_db = AsyncDatabaseManager()
@@ -0,0 +1,199 @@
+"""
+Async Models
+asyncpg versions of the hot model operations for headless workers:
+program snapshot load, bulk seat write, seat lookup and import merge
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .async_database import AsyncDatabaseManager, to_records
+from .cache import read_through_async
+from .oturma_model import OturmaModel
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOturmaModel:
+    """Seat plan operations (shares the itinerary LRU with OturmaModel)"""
+
+    def __init__(self, db_connection: AsyncDatabaseManager):
+        self.db = db_connection
+
+    async def get_ogrenci_takvimi(self, program_id: int, ogrenci_no: str) -> Tuple:
+        """
+        Student's exams and seats in a program (cached per student)
+
+        Rows are the sync Record type, since the cache is shared with
+        OturmaModel (keyed by session user, bypassed inside a transaction).
+        """
+        query = OturmaModel.TAKVIM_QUERY + """
+            WHERE op.ogrenci_no = %s AND s.program_id = %s
+            ORDER BY s.tarih, s.baslangic_saati
+        """
+
+        async def load():
+            return to_records(await self.db.fetch(query, ogrenci_no, program_id))
+
+        return await read_through_async(OturmaModel._takvim_cache, self.db,
+                                        (program_id, ogrenci_no), load)
+
+    async def get_ogrenci_takvimleri(self, program_id: int, ogrenci_nolar: Iterable[str]) -> Dict[str, Tuple]:
+        """
+        Many itinerary lookups multiplexed over the async pool (sequential
+        inside a transaction, see AsyncDatabaseManager.gather)
+        """
+        ogrenci_nolar = list(ogrenci_nolar)
+        takvimler = await self.db.gather(
+            *(self.get_ogrenci_takvimi(program_id, no) for no in ogrenci_nolar)
+        )
+        return dict(zip(ogrenci_nolar, takvimler))
+
+    async def get_ogrenci_oturma(self, sinav_id: int, ogrenci_no: str):
+        """Seat of one student in one exam"""
+        query = """
+            SELECT op.oturma_id, op.derslik_id, dr.derslik_kodu,
+                   dr.derslik_adi, op.satir_no, op.sutun_no
+            FROM oturma_planlari op
+            JOIN derslikler dr ON op.derslik_id = dr.derslik_id
+            WHERE op.sinav_id = %s AND op.ogrenci_no = %s
+        """
+        return await self.db.fetchrow(query, sinav_id, ogrenci_no)
+
+    async def create_oturma_batch(self, oturmalar: List[Dict]) -> int:
+        """
+        Write seats with one INSERT ... SELECT FROM unnest() (capacity/conflict
+        triggers still fire)
+
+        Not COPY: PostgreSQL refuses COPY FROM into a table with row-level
+        security for roles it applies to. All-or-nothing: a rejected row
+        aborts the whole batch.
+        """
+        if not oturmalar:
+            return 0
+
+        async with self.db.transaction():
+            count = await self.db.execute("""
+                INSERT INTO oturma_planlari (sinav_id, derslik_id, ogrenci_no, satir_no, sutun_no)
+                SELECT * FROM unnest(%s::int[], %s::int[], %s::varchar[], %s::int[], %s::int[])
+            """,
+                [o['sinav_id'] for o in oturmalar],
+                [o['derslik_id'] for o in oturmalar],
+                [o['ogrenci_no'] for o in oturmalar],
+                [o['satir_no'] for o in oturmalar],
+                [o['sutun_no'] for o in oturmalar]
+            )
+
+        OturmaModel.invalidate_takvim_cache()
+        return count
+
+
+class AsyncSinavModel:
+    """Program snapshot for schedulers and exports"""
+
+    def __init__(self, db_connection: AsyncDatabaseManager):
+        self.db = db_connection
+
+    async def load_program_snapshot(self, program_id: int) -> Optional[Dict]:
+        """
+        Program, its exams with rooms, the department's rooms and the
+        enrollment count per course - fetched concurrently (one after
+        another inside a transaction, which has a single connection)
+
+        Returns:
+            {'program', 'sinavlar', 'derslikler', 'kayit_sayilari'} or None
+        """
+        program = await self.db.fetchrow(
+            "SELECT * FROM sinav_programi WHERE program_id = %s", program_id
+        )
+        if program is None:
+            return None
+
+        sinavlar, derslikler, kayitlar = await self.db.gather(
+            self.db.fetch("""
+                SELECT s.sinav_id, s.ders_id, d.ders_kodu, d.ders_adi,
+                       s.tarih, s.baslangic_saati, s.bitis_saati, s.ogrenci_sayisi,
+                       COALESCE(array_agg(sd.derslik_id) FILTER (WHERE sd.derslik_id IS NOT NULL),
+                                '{}') AS derslik_idleri
+                FROM sinavlar s
+                JOIN dersler d ON s.ders_id = d.ders_id
+                LEFT JOIN sinav_derslikleri sd ON sd.sinav_id = s.sinav_id
+                WHERE s.program_id = %s
+                GROUP BY s.sinav_id, d.ders_id
+                ORDER BY s.tarih, s.baslangic_saati
+            """, program_id),
+            self.db.fetch("""
+                SELECT derslik_id, derslik_kodu, derslik_adi, kapasite,
+                       satir_sayisi, sutun_sayisi, sira_yapisi
+                FROM derslikler
+                WHERE bolum_id = %s AND aktif = TRUE
+                ORDER BY kapasite DESC
+            """, program['bolum_id']),
+            self.db.fetch("""
+                SELECT dk.ders_id, COUNT(*) AS adet
+                FROM ders_kayitlari dk
+                JOIN dersler d ON dk.ders_id = d.ders_id
+                JOIN ogrenciler o ON dk.ogrenci_no = o.ogrenci_no
+                WHERE d.bolum_id = %s AND o.aktif = TRUE
+                GROUP BY dk.ders_id
+            """, program['bolum_id'])
+        )
+
+        return {
+            'program': program,
+            'sinavlar': sinavlar,
+            'derslikler': derslikler,
+            'kayit_sayilari': {row['ders_id']: row['adet'] for row in kayitlar}
+        }
+
+
+class AsyncOgrenciModel:
+    """Set-based student import merge"""
+
+    def __init__(self, db_connection: AsyncDatabaseManager):
+        self.db = db_connection
+
+    async def merge_ogrenciler(self, ogrenciler: List[Dict],
+                               ders_kayitlari: List[Dict]) -> Tuple[int, int]:
+        """
+        Upsert students and add enrollments by course code in one transaction
+
+        Each side is a single unnest() statement instead of one round trip
+        per row. Duplicate student numbers keep the last occurrence.
+
+        Returns:
+            (merged students, inserted enrollments)
+        """
+        son_kayit = {o['ogrenci_no']: o for o in ogrenciler}
+        kayitlar = {(k['ogrenci_no'], k['ders_kodu']) for k in ders_kayitlari}
+
+        async with self.db.transaction():
+            ogrenci_sayisi = await self.db.execute("""
+                INSERT INTO ogrenciler (ogrenci_no, bolum_id, ad_soyad, sinif)
+                SELECT * FROM unnest(%s::varchar[], %s::int[], %s::varchar[], %s::int[])
+                ON CONFLICT (ogrenci_no) DO UPDATE
+                SET bolum_id = EXCLUDED.bolum_id,
+                    ad_soyad = EXCLUDED.ad_soyad,
+                    sinif = EXCLUDED.sinif,
+                    aktif = TRUE
+            """,
+                [o['ogrenci_no'] for o in son_kayit.values()],
+                [o['bolum_id'] for o in son_kayit.values()],
+                [o['ad_soyad'] for o in son_kayit.values()],
+                [o.get('sinif', 1) for o in son_kayit.values()]
+            )
+
+            kayit_sayisi = await self.db.execute("""
+                INSERT INTO ders_kayitlari (ogrenci_no, ders_id)
+                SELECT k.ogrenci_no, d.ders_id
+                FROM unnest(%s::varchar[], %s::varchar[]) AS k(ogrenci_no, ders_kodu)
+                JOIN ogrenciler o ON o.ogrenci_no = k.ogrenci_no
+                JOIN dersler d ON d.ders_kodu = k.ders_kodu
+                ON CONFLICT (ogrenci_no, ders_id) DO NOTHING
+            """,
+                [no for no, _ in kayitlar],
+                [kod for _, kod in kayitlar]
+            )
+
+        logger.info(f"Async import merge: {ogrenci_sayisi} ogrenci, {kayit_sayisi} ders kaydi")
+        return ogrenci_sayisi, kayit_sayisi
@@ -0,0 +1,159 @@
+"""
+Bildirim Modeli
+Sınav takvimi e-postalarının toplu hazırlanması (mail-merge)
+
+Programdaki öğrencilerin sınav ve oturma yerleri tek sorguyla, öğrenci
+sırasıyla server-side cursor üzerinden okunur (db.stream); bellekte aynı
+anda sadece bir batch, bir öğrencinin satırları ve bir INSERT partisi
+bulunur. Mesajlar derlenmiş Jinja2 şablonlarından üretilir
+(utils/email_templates.py, 'sinav_takvimi'); sabit üst/alt bilgi bir kez
+render edilir, sınav satırlarının alanları sınav başına bir kez
+biçimlendirilir. Satırlar email_queue'ya execute_values ile partiler
+halinde tek transaction içinde yazılır; gönderim models/email_queue.py
+işleyicisindedir.
+"""
+
+import logging
+import time
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Optional, Sequence
+
+from psycopg2.extras import execute_values
+
+from config import EmailConfig
+from utils.email_templates import EmailTemplates, email_templates
+
+from .email_queue import email_queue_worker
+
+logger = logging.getLogger(__name__)
+
+_INSERT = """
+    INSERT INTO email_queue (to_email, subject, body_text, body_html, email_type,
+                             priority, scheduled_for)
+    VALUES %s
+"""
+_SATIR = "(%s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))"
+
+
+def ogrenci_eposta(ogrenci_no: str) -> str:
+    """Öğrenci numarasından kurumsal e-posta adresi"""
+    return f"{ogrenci_no}@{EmailConfig.STUDENT_EMAIL_DOMAIN}"
+
+
+class TakvimSablonu:
+    """
+    Bir programın sınav takvimi e-postası (email_templates 'sinav_takvimi')
+
+    Bir sınav/derslik satırının ders, tarih, saat ve derslik hücreleri
+    (_sinav_satiri.html/.txt) ilk kullanıldığında bir kez render edilip
+    saklanır; öğrenci başına şablona sadece ad ve sıra/sütun numaraları
+    eklenir.
+    """
+
+    def __init__(self, program_adi: str, sablonlar: EmailTemplates = email_templates):
+        self.program_adi = program_adi
+        self.konu = f"Sınav Takviminiz - {program_adi}"
+        self._sablonlar = sablonlar
+        self._satirlar: Dict[tuple, tuple] = {}
+
+    def _satir(self, satir: Dict) -> tuple:
+        """(text, html) sınav satırı parçası"""
+        anahtar = (satir['sinav_id'], satir['derslik_id'])
+        parca = self._satirlar.get(anahtar)
+        if parca is None:
+            parca = self._satirlar[anahtar] = self._sablonlar.fragment(
+                '_sinav_satiri',
+                ders_kodu=satir['ders_kodu'],
+                ders_adi=satir['ders_adi'],
+                tarih=satir['tarih'].strftime('%d.%m.%Y'),
+                saat=f"{satir['baslangic_saati']:%H:%M}-{satir['bitis_saati']:%H:%M}",
+                derslik=satir['derslik_adi'] or satir['derslik_kodu']
+            )
+        return parca
+
+    def render(self, ad_soyad: str, satirlar: Sequence[Dict]):
+        """(konu, text, html)"""
+        text, html = self._sablonlar.render(
+            'sinav_takvimi',
+            ad_soyad=ad_soyad,
+            program_adi=self.program_adi,
+            sinavlar=[self._satir(s) + (s['satir_no'], s['sutun_no']) for s in satirlar]
+        )
+        return self.konu, text, html
+
+
+class BildirimModel:
+    """Toplu öğrenci bildirimleri (email_queue'ya yazar)"""
+
+    TAKVIM_QUERY = """
+        SELECT op.ogrenci_no, o.ad_soyad, s.sinav_id, d.ders_kodu, d.ders_adi,
+               s.tarih, s.baslangic_saati, s.bitis_saati,
+               op.derslik_id, dr.derslik_kodu, dr.derslik_adi, op.satir_no, op.sutun_no
+        FROM oturma_planlari op
+        JOIN sinavlar s ON op.sinav_id = s.sinav_id
+        JOIN dersler d ON s.ders_id = d.ders_id
+        JOIN derslikler dr ON op.derslik_id = dr.derslik_id
+        JOIN ogrenciler o ON op.ogrenci_no = o.ogrenci_no
+        WHERE s.program_id = %s AND o.aktif = TRUE
+        ORDER BY op.ogrenci_no, s.tarih, s.baslangic_saati
+    """
+
+    def __init__(self, db_connection, batch_size: int = 1000):
+        self.db = db_connection
+        self.batch_size = batch_size
+
+    def _yaz(self, cursor, parti):
+        started = time.perf_counter()
+        execute_values(cursor, _INSERT, parti, template=_SATIR, page_size=self.batch_size)
+        self.db._observe(cursor.connection, _INSERT, None, len(parti), time.perf_counter() - started)
+
+    def sinav_takvimi_kuyrukla(self, program_id: int, priority: int = 3,
+                               scheduled_for: Optional[datetime] = None) -> int:
+        """
+        Programdaki her öğrenciye sınav takvimi e-postası kuyrukla
+
+        Tek transaction: hata olursa hiçbir mesaj kuyruğa girmez, yarıda
+        kalan bir çalıştırma tekrarlandığında kimse iki e-posta almaz.
+        Öncelik varsayılanı (3) şifre sıfırlama gibi tekil mesajların (5)
+        arkasında kalır.
+
+        Args:
+            program_id: Sınav programı ID
+            priority: email_queue önceliği (1-10, büyük önce)
+            scheduled_for: Gönderimin başlayacağı zaman (None: hemen)
+
+        Returns:
+            Kuyruğa eklenen e-posta sayısı
+        """
+        program = self.db.execute_query(
+            "SELECT program_adi FROM sinav_programi WHERE program_id = %s",
+            (program_id,), fetch_one=True
+        )
+        if not program:
+            return 0
+
+        sablon = TakvimSablonu(program['program_adi'])
+        toplam = 0
+        parti = []
+
+        with self.db.transaction() as conn:
+            with conn.cursor() as cursor:
+                for ogrenci_no, satirlar in groupby(self.db.stream(self.TAKVIM_QUERY, (program_id,)),
+                                                    key=itemgetter('ogrenci_no')):
+                    satirlar = tuple(satirlar)
+                    konu, text, html_govde = sablon.render(satirlar[0]['ad_soyad'], satirlar)
+                    parti.append((ogrenci_eposta(ogrenci_no), konu, text, html_govde,
+                                  'exam_schedule', priority, scheduled_for))
+                    if len(parti) >= self.batch_size:
+                        self._yaz(cursor, parti)
+                        toplam += len(parti)
+                        parti = []
+                if parti:
+                    self._yaz(cursor, parti)
+                    toplam += len(parti)
+
+        logger.info(f"Sınav takvimi bildirimi: program {program_id}, {toplam} e-posta kuyruğa eklendi")
+        email_queue_worker.wake()
+        return toplam
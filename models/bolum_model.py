@@ -7,12 +7,19 @@ import psycopg2
 from typing import List, Dict, Optional
 import logging
 
+from config import CacheConfig
+from .cache import make_cache, read_through, invalidate_caches
+
 logger = logging.getLogger(__name__)
 
 
 class BolumModel:
     """Blm veritaban1 i_lemleri"""
 
+    # (kullan1c1, sorgu, parametreler) -> blm kay1tlar1; yazma i_lemleri bo_alt1r
+    _cache = make_cache('bolum', maxsize=CacheConfig.REFERENCE_MAXSIZE,
+                        ttl=CacheConfig.REFERENCE_TTL)
+
     def __init__(self, db_connection):
         """
         Args:
@@ -41,16 +48,8 @@ class BolumModel:
 
             query += " ORDER BY bolum_adi"
 
-            cursor = self.db.execute_query(query)
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return list(read_through(self._cache, self.db, ('all', only_active),
+                                     lambda: tuple(self.db.execute_query(query))))
 
         except Exception as e:
             logger.error(f"Blmler getirilirken hata: {e}")
@@ -73,15 +72,8 @@ class BolumModel:
                 WHERE bolum_id = %s
             """
 
-            cursor = self.db.execute_query(query, (bolum_id,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return read_through(self._cache, self.db, ('id', bolum_id),
+                                lambda: self.db.execute_query(query, (bolum_id,), fetch_one=True))
 
         except Exception as e:
             logger.error(f"Blm getirilirken hata (ID: {bolum_id}): {e}")
@@ -104,15 +96,8 @@ class BolumModel:
                 WHERE bolum_kodu = %s
             """
 
-            cursor = self.db.execute_query(query, (bolum_kodu,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return read_through(self._cache, self.db, ('kod', bolum_kodu),
+                                lambda: self.db.execute_query(query, (bolum_kodu,), fetch_one=True))
 
         except Exception as e:
             logger.error(f"Blm getirilirken hata (Kod: {bolum_kodu}): {e}")
@@ -136,24 +121,20 @@ class BolumModel:
                 RETURNING bolum_id
             """
 
-            cursor = self.db.execute_query(query, (bolum_adi, bolum_kodu))
+            row = self.db.execute_query(query, (bolum_adi, bolum_kodu), fetch_one=True)
 
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    bolum_id = row[0]
-                    self.db.commit()
-                    logger.info(f"Yeni blm olu_turuldu: {bolum_adi} (ID: {bolum_id})")
-                    return bolum_id
+            if row:
+                bolum_id = row['bolum_id']
+                self.db.after_commit(self.invalidate_cache)
+                logger.info(f"Yeni blm olu_turuldu: {bolum_adi} (ID: {bolum_id})")
+                return bolum_id
 
             return None
 
         except psycopg2.IntegrityError as e:
-            self.db.rollback()
             logger.error(f"Blm olu_turulurken hata (duplicate): {e}")
             return None
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Blm olu_turulurken hata: {e}")
             return None
 
@@ -199,17 +180,14 @@ class BolumModel:
                 WHERE bolum_id = %s
             """
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor and cursor.rowcount > 0:
-                self.db.commit()
+            if self.db.execute_update(query, tuple(params)) > 0:
+                self.db.after_commit(self.invalidate_cache)
                 logger.info(f"Blm gncellendi (ID: {bolum_id})")
                 return True
 
             return False
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Blm gncellenirken hata: {e}")
             return False
 
@@ -254,16 +232,13 @@ class BolumModel:
                 GROUP BY b.bolum_id, b.bolum_adi, b.bolum_kodu
             """
 
-            cursor = self.db.execute_query(query, (bolum_id,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return self.db.execute_query(query, (bolum_id,), fetch_one=True)
 
         except Exception as e:
             logger.error(f"Blm istatistikleri getirilirken hata: {e}")
             return None
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Blm dei_ikliklerinden sonra cache'leri bo_alt (derslik/ders sat1rlar1 bolum_adi ta_1r)"""
+        invalidate_caches('bolum', 'derslik', 'ders')
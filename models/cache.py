@@ -0,0 +1,313 @@
+"""
+Cache Layer
+Thread-safe caches for read-heavy model lookups
+
+LocalCache is an in-process LRU (optionally with a TTL); RedisCache keeps
+the same interface on a shared Redis so several app instances see each
+other's invalidations. make_cache() picks the backend from CacheConfig and
+registers the cache by name for cache_stats()/invalidate_caches().
+"""
+
+import logging
+import pickle
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from cachetools import LRUCache, TTLCache
+
+from config import CacheConfig
+
+from .rows import Record
+
+try:
+    import redis
+except ImportError:  # Redis backend is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_REDIS_ERRORS = redis.RedisError if redis is not None else ()
+
+# name -> cache created by make_cache()
+_registry: Dict[str, Any] = {}
+
+
+class LocalCache:
+    """Thread-safe LRU cache with hit/miss counters; entries expire after ttl seconds if given"""
+
+    backend = 'local'
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None):
+        self._data = TTLCache(maxsize=maxsize, ttl=ttl) if ttl else LRUCache(maxsize=maxsize)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value or default"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store value under key"""
+        with self._lock:
+            self._data[key] = value
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return cached value, calling loader (outside the lock) on a miss"""
+        with self._lock:
+            try:
+                value = self._data[key]
+                self.hits += 1
+                return value
+            except KeyError:
+                self.misses += 1
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self._data.maxsize
+            }
+
+
+class RedisCache:
+    """
+    LocalCache interface on Redis: pickled values under "<prefix>:<name>:<key>"
+
+    Entries expire after ttl seconds. A Redis error never fails the read:
+    it is counted, logged once per outage and the loader result is
+    returned uncached.
+    """
+
+    backend = 'redis'
+
+    def __init__(self, name: str, ttl: Optional[float] = None, client=None,
+                 prefix: str = 'sinav_takvimi'):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("Redis cache backend requires the redis package")
+            # redis-py connects lazily, so creating the client never blocks start-up
+            client = redis.Redis(
+                host=CacheConfig.REDIS_HOST,
+                port=CacheConfig.REDIS_PORT,
+                db=CacheConfig.REDIS_DB,
+                password=CacheConfig.REDIS_PASSWORD,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        self._client = client
+        self._prefix = f"{prefix}:{name}:"
+        self._ttl = int(ttl) if ttl else None
+        self._lock = threading.Lock()
+        self._failing = False
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: Hashable) -> str:
+        return self._prefix + repr(key)
+
+    def _error(self, action: str, error: Exception):
+        with self._lock:
+            self.errors += 1
+            first = not self._failing
+            self._failing = True
+        if first:
+            logger.warning(f"Redis cache {action} failed, reading from the database: {error}")
+
+    def _ok(self):
+        if self._failing:
+            self._failing = False
+            logger.info("Redis cache reachable again")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value or default (also on Redis errors)"""
+        try:
+            data = self._client.get(self._key(key))
+        except _REDIS_ERRORS as e:
+            self._error('get', e)
+            return default
+        self._ok()
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return pickle.loads(data)
+
+    def set(self, key: Hashable, value: Any):
+        """Store value under key (ignored on Redis errors)"""
+        try:
+            self._client.set(self._key(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ex=self._ttl)
+        except _REDIS_ERRORS as e:
+            self._error('set', e)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return cached value, calling loader on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or every key of this cache when key is None"""
+        try:
+            if key is not None:
+                self._client.delete(self._key(key))
+                return
+            # Writes to reference data are rare; a prefix scan keeps reads to one GET
+            batch = []
+            for redis_key in self._client.scan_iter(match=self._prefix + '*', count=500):
+                batch.append(redis_key)
+                if len(batch) >= 500:
+                    self._client.delete(*batch)
+                    batch = []
+            if batch:
+                self._client.delete(*batch)
+        except _REDIS_ERRORS as e:
+            # Entries written before the outage may be served until their TTL
+            self._error('invalidate', e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/error counters (size is not tracked on Redis)"""
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'ttl': self._ttl
+            }
+
+
+class NullCache:
+    """Pass-through used when CacheConfig.ENABLED is False"""
+
+    backend = 'none'
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        pass
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        self.misses += 1
+        return loader()
+
+    def invalidate(self, key: Hashable = None):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'hits': 0, 'misses': self.misses}
+
+
+def make_cache(name: str, maxsize: int = 4096, ttl: Optional[float] = None):
+    """
+    Cache for one kind of lookup, backed as configured in CacheConfig
+    (BACKEND 'local' or 'redis'; NullCache when disabled)
+
+    Registered under name; creating a name again replaces the old cache.
+    """
+    if not CacheConfig.ENABLED:
+        cache = NullCache()
+    elif CacheConfig.BACKEND == 'redis' and redis is not None:
+        cache = RedisCache(name, ttl=ttl)
+    else:
+        if CacheConfig.BACKEND == 'redis':
+            logger.warning(f"redis package not installed, '{name}' cache is in-process")
+        cache = LocalCache(maxsize=maxsize, ttl=ttl)
+
+    _registry[name] = cache
+    return cache
+
+
+def _copy_rows(value: Any) -> Any:
+    """Copy of a cached row / row list, so callers cannot edit the cached one"""
+    if isinstance(value, Record):
+        return value.copy()
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy_rows(item) for item in value)
+    return value
+
+
+def read_through(cache, db, key: tuple, loader: Callable[[], Any]) -> Any:
+    """
+    cache.get_or_load() for model reads under row-level security
+
+    The key is scoped to db's session user, since RLS policies make the
+    same query return different rows per user. Inside db.transaction() the
+    cache is bypassed: the transaction may see its own uncommitted writes.
+    Rows are returned as copies; writers invalidate with db.after_commit()
+    so a concurrent reader cannot cache pre-commit rows after the drop.
+    """
+    if db.in_transaction():
+        return loader()
+    return _copy_rows(cache.get_or_load((db.session_user,) + key, loader))
+
+
+def warm(cache, db, key: tuple, value: Any):
+    """
+    cache.set() counterpart of read_through() for rows read in bulk: same
+    per-user key, skipped inside db.transaction(), stores a copy
+    """
+    if db.in_transaction():
+        return
+    cache.set((db.session_user,) + key, _copy_rows(value))
+
+
+async def read_through_async(cache, db, key: tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """read_through() for AsyncDatabaseManager; loader is a coroutine function"""
+    if db.in_transaction():
+        return await loader()
+    scoped = (db.session_user,) + key
+    value = cache.get(scoped)
+    if value is None:
+        value = await loader()
+        cache.set(scoped, value)
+    return _copy_rows(value)
+
+
+def invalidate_caches(*names: str):
+    """Empty the named caches (all registered caches when no name is given)"""
+    for name in names or tuple(_registry):
+        cache = _registry.get(name)
+        if cache is not None:
+            cache.invalidate()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss metrics of every cache created with make_cache()"""
+    return {name: cache.stats() for name, cache in _registry.items()}
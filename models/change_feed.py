@@ -0,0 +1,193 @@
+"""
+Change Feed
+LISTEN/NOTIFY listener that keeps reference-data caches and open views in
+step with edits made by other clients
+
+The trg_notify_degisiklik triggers (sinav_takvimi_final.sql) send one
+notification per statement on the "veri_degisikligi" channel:
+
+    {"t": "derslikler", "op": "U", "ids": [3, 4], "b": [1]}
+
+A daemon thread holds one dedicated autocommit connection (not from the
+pool), drops the caches built from the changed table and passes a Change
+to the callbacks subscribed for that table. Callbacks run on the listener
+thread; Qt views receive them through views/components/change_feed_bridge.
+
+Notifications sent while the listener is disconnected are lost, so after
+a reconnect every cache is dropped and subscribers get a RESYNC change
+(ids None) telling them to reload.
+"""
+
+import json
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+
+from .cache import invalidate_caches
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'veri_degisikligi'
+
+# Table -> caches (models/cache.py names) holding its rows; derslik/ders
+# rows carry bolum_adi, so bolumler changes drop those too
+TABLE_CACHES = {
+    'bolumler': ('bolum', 'derslik', 'ders'),
+    'derslikler': ('derslik',),
+    'dersler': ('ders',),
+}
+
+RESYNC = 'R'
+
+# Seconds between stop checks while idle, and the reconnect backoff cap
+POLL_INTERVAL = 1.0
+MAX_BACKOFF = 30.0
+
+
+class Change(NamedTuple):
+    """One notified statement"""
+
+    table: str
+    op: str                             # 'I', 'U', 'D', or RESYNC
+    ids: Optional[Tuple[int, ...]]      # None: too many rows or missed changes, reload
+    bolum_ids: Tuple[int, ...]
+
+    def affects(self, bolum_id: Optional[int]) -> bool:
+        """Whether a view scoped to bolum_id (None: all departments) must react"""
+        return self.op == RESYNC or bolum_id is None or bolum_id in self.bolum_ids
+
+
+def parse(payload: str) -> Change:
+    data = json.loads(payload)
+    ids = data.get('ids')
+    return Change(
+        table=data['t'],
+        op=data['op'],
+        ids=tuple(ids) if ids is not None else None,
+        bolum_ids=tuple(b for b in data.get('b') or () if b is not None)
+    )
+
+
+class ChangeFeed:
+    """Background LISTEN connection dispatching Change objects per table"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[Change], Any]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connected = False
+        self.received = 0
+        self.reconnects = 0
+
+    @property
+    def running(self) -> bool:
+        """True while the listener is connected and receiving notifications"""
+        return self._connected and self._thread is not None and self._thread.is_alive()
+
+    def start(self, config: Dict[str, Any]):
+        """Start listening with the connection settings used for db.initialize()"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        params = {key: config[key] for key in ('host', 'port', 'database', 'user', 'password')}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(params,),
+                                        name='change-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def subscribe(self, table: str, callback: Callable[[Change], Any]):
+        """Call callback(change) on the listener thread for every change of table"""
+        with self._lock:
+            self._subscribers.setdefault(table, []).append(callback)
+
+    def unsubscribe(self, table: str, callback: Callable[[Change], Any]):
+        with self._lock:
+            callbacks = self._subscribers.get(table, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def _run(self, params: Dict[str, Any]):
+        attempt = 0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**params)
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                self._connected = True
+                if attempt:
+                    self.reconnects += 1
+                    logger.info("Change feed reconnected, resyncing caches and views")
+                    self._resync()
+                else:
+                    logger.info(f"Change feed listening on '{CHANNEL}'")
+                attempt = 0
+                self._listen(conn)
+            except psycopg2.Error as e:
+                attempt += 1
+                if attempt == 1:
+                    logger.warning(f"Change feed connection lost: {e}")
+            finally:
+                self._connected = False
+                if conn is not None:
+                    conn.close()
+
+            if attempt:
+                self._stop.wait(min(MAX_BACKOFF, 2 ** (attempt - 1)))
+
+    def _listen(self, conn):
+        while not self._stop.is_set():
+            if not select.select([conn], [], [], POLL_INTERVAL)[0]:
+                continue
+            conn.poll()
+            if not conn.notifies:
+                continue
+
+            notifies = list(conn.notifies)
+            conn.notifies.clear()
+            changes = []
+            for notify in notifies:
+                try:
+                    changes.append(parse(notify.payload))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring malformed change notification {notify.payload!r}: {e}")
+            self.received += len(changes)
+            self._dispatch(changes)
+
+    def _dispatch(self, changes: List[Change]):
+        # One invalidation per cache for the whole burst
+        caches = {name for change in changes for name in TABLE_CACHES.get(change.table, ())}
+        if caches:
+            invalidate_caches(*caches)
+
+        for change in changes:
+            with self._lock:
+                callbacks = list(self._subscribers.get(change.table, ()))
+            for callback in callbacks:
+                try:
+                    callback(change)
+                except Exception as e:
+                    logger.error(f"Change feed subscriber failed for {change.table}: {e}")
+
+    def _resync(self):
+        with self._lock:
+            tables = list(self._subscribers)
+        self._dispatch([Change(table, RESYNC, None, ()) for table in set(tables) | set(TABLE_CACHES)])
+
+    def stats(self) -> Dict[str, Any]:
+        return {'running': self.running, 'received': self.received, 'reconnects': self.reconnects}
+
+
+# Global change feed instance (started from main.py)
+change_feed = ChangeFeed()
@@ -4,19 +4,172 @@ Thread-safe connection pooling with psycopg2
 """
 
 import psycopg2
-from psycopg2 import pool, extras
+from psycopg2 import extensions, errors
 from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import itertools
 import logging
-from typing import Optional, Dict, Any, List, Tuple
+import re
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+
+from config import DatabaseConfig
+from .pool import BlockingConnectionPool
+from .rows import RecordCursor, to_columns
+from .pipeline import Pipeline
+from .instrumentation import QueryStats
+from .replica import ReplicaSet
 
 logger = logging.getLogger(__name__)
 
 
+class _Transaction:
+    """Connection bound to the current thread/task by db.transaction()"""
+
+    __slots__ = ('conn', 'savepoints', 'on_commit')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.savepoints = 0
+        self.on_commit: List[Callable[[], Any]] = []
+
+
+# Active unit of work for the current thread or asyncio task
+_current_tx: ContextVar[Optional[_Transaction]] = ContextVar('db_transaction', default=None)
+
+_PLACEHOLDER = re.compile(r'%s|%%')
+
+# Unique names for server-side (named) cursors
+_cursor_ids = itertools.count(1)
+
+
+class QueryCancelled(Exception):
+    """Query was cancelled through its CancellationToken"""
+
+
+class CancellationToken:
+    """
+    Stop the query of another thread (e.g. a Cancel button for a worker's search)
+
+    cancel() sends a cancel request for the statement currently running on
+    the connection the token is attached to; later queries under the same
+    token fail immediately. Use a new token per operation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.cancelled = False
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None and not self._conn.closed:
+                self._conn.cancel()
+
+    def _attach(self, conn):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("query cancelled before it started")
+            self._conn = conn
+
+    def _detach(self):
+        with self._lock:
+            self._conn = None
+
+
+class QueryOptions:
+    """Limits of one db.query_options() block and how its queries ended"""
+
+    __slots__ = ('timeout_ms', 'cancel_token', 'cancelled', 'timed_out')
+
+    def __init__(self, timeout_ms: Optional[int], cancel_token: Optional[CancellationToken]):
+        self.timeout_ms = timeout_ms
+        self.cancel_token = cancel_token
+        self.cancelled = False
+        self.timed_out = False
+
+    @property
+    def interrupted(self) -> bool:
+        """True if a query was cancelled or hit statement_timeout"""
+        return self.cancelled or self.timed_out
+
+
+# True inside db.replica_reads() / @replica_read for the current thread/task
+_replica_reads: ContextVar[bool] = ContextVar('db_replica_reads', default=False)
+
+
+def replica_read(method):
+    """
+    Mark a read-only model method: it may run on a read replica
+
+    Only takes effect when replicas are configured; inside db.transaction()
+    the transaction's primary connection is used as usual.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+# Options of the innermost db.query_options() block for the current thread/task
+_query_options: ContextVar[Optional[QueryOptions]] = ContextVar('db_query_options', default=None)
+
+
+def _is_broken(error: Exception) -> bool:
+    """Connection-level failure (cancelled/timed out statements leave it usable)"""
+    return (isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            and not isinstance(error, extensions.QueryCanceledError))
+
+
+def _check_cancelled() -> None:
+    """Stop a multi-batch read between fetches once its token is cancelled"""
+    options = _query_options.get()
+    if options is not None and options.cancel_token is not None and options.cancel_token.cancelled:
+        options.cancelled = True
+        raise QueryCancelled("query cancelled")
+
+
+def _set_timeout(conn, timeout_ms) -> None:
+    """statement_timeout until the end of the current transaction"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT set_config('statement_timeout', %s, true)", (str(timeout_ms),))
+
+
+def _to_positional(query: str) -> Tuple[str, int]:
+    """Rewrite psycopg2 %s placeholders to $1..$n for PREPARE"""
+    count = 0
+
+    def repl(match):
+        nonlocal count
+        if match.group() == '%%':
+            return '%'
+        count += 1
+        return f'${count}'
+
+    return _PLACEHOLDER.sub(repl, query), count
+
+
 class DatabaseManager:
     """Singleton database connection manager with pooling"""
 
     _instance = None
     _pool = None
+    use_prepared = DatabaseConfig.USE_PREPARED
+    _prepared_cache_size = DatabaseConfig.PREPARED_CACHE_SIZE
+    _prepared_hits = 0
+    _prepared_misses = 0
+    _replicas: Optional[ReplicaSet] = None
+    _session_user: Optional[int] = None
+    _query_stats = QueryStats(DatabaseConfig.SLOW_QUERY_MS,
+                              DatabaseConfig.QUERY_STATS_MAX_FINGERPRINTS,
+                              DatabaseConfig.QUERY_STATS)
 
     def __new__(cls):
         if cls._instance is None:
@@ -26,10 +179,16 @@ class DatabaseManager:
     def initialize(self, config: Dict[str, Any]):
         """Initialize connection pool"""
         if self._pool is None:
+            self.use_prepared = config.get('use_prepared', DatabaseConfig.USE_PREPARED)
+            self._prepared_cache_size = config.get('prepared_cache_size', DatabaseConfig.PREPARED_CACHE_SIZE)
+            self._query_stats.enabled = config.get('query_stats', DatabaseConfig.QUERY_STATS)
+            self._query_stats.slow_ms = config.get('slow_query_ms', DatabaseConfig.SLOW_QUERY_MS)
             try:
-                self._pool = psycopg2.pool.ThreadedConnectionPool(
-                    minconn=1,
-                    maxconn=config.get('pool_size', 10),
+                self._pool = BlockingConnectionPool(
+                    pool_size=config.get('pool_size', DatabaseConfig.POOL_SIZE),
+                    max_overflow=config.get('max_overflow', DatabaseConfig.MAX_OVERFLOW),
+                    timeout=config.get('pool_timeout', DatabaseConfig.POOL_TIMEOUT),
+                    recycle=config.get('pool_recycle', DatabaseConfig.POOL_RECYCLE),
                     host=config['host'],
                     port=config['port'],
                     database=config['database'],
@@ -41,44 +200,460 @@ class DatabaseManager:
                 logger.error(f"[ERROR] Database initialization failed: {e}")
                 raise
 
+            replicas = config.get('replicas') or []
+            if replicas:
+                self._replicas = ReplicaSet(
+                    replicas,
+                    max_lag=config.get('replica_max_lag', DatabaseConfig.REPLICA_MAX_LAG),
+                    sticky_seconds=config.get('replica_sticky_seconds', DatabaseConfig.REPLICA_STICKY_SECONDS),
+                    check_interval=config.get('replica_check_interval', DatabaseConfig.REPLICA_CHECK_INTERVAL),
+                    pool_size=config.get('pool_size', DatabaseConfig.POOL_SIZE),
+                    max_overflow=config.get('max_overflow', DatabaseConfig.MAX_OVERFLOW),
+                    recycle=config.get('pool_recycle', DatabaseConfig.POOL_RECYCLE),
+                    database=config['database'],
+                    user=config['user'],
+                    password=config['password']
+                )
+                logger.info(f"[OK] {len(self._replicas)} read replica(s) configured")
+
     @contextmanager
     def get_connection(self):
         """Get connection from pool (context manager)"""
+        tx = _current_tx.get()
+        if tx is not None:
+            # Inside db.transaction(): reuse the bound connection, commit happens at scope exit
+            with self._query_scope(tx.conn, set_timeout=False):
+                yield tx.conn
+            return
+
         conn = None
+        replica = None
+        broken = False
         try:
-            conn = self._pool.getconn()
-            yield conn
+            routed = None
+            if self._replicas is not None and _replica_reads.get():
+                routed = self._replicas.checkout()
+            if routed is not None:
+                replica, conn = routed
+            else:
+                conn = self._pool.getconn()
+            self._apply_session_user(conn)
+            with self._query_scope(conn):
+                yield conn
             conn.commit()
         except Exception as e:
-            if conn:
-                conn.rollback()
+            if conn and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            broken = broken or _is_broken(e)
             logger.error(f"Database error: {e}")
             raise
         finally:
-            if conn:
-                self._pool.putconn(conn)
+            if replica is not None:
+                self._replicas.release(replica, conn, broken)
+            elif conn:
+                self._pool.putconn(conn, close=broken)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: bind one connection to the current thread/task
+
+        Every execute_* call (and so every model call) inside the block
+        reuses this connection; the work is committed once when the block
+        exits and rolled back if it raises. Nested transaction() blocks
+        become savepoints.
+
+            with db.transaction():
+                sinav_id = sinav_model.create_sinav(...)
+                sinav_model.assign_derslik_to_sinav(sinav_id, derslik_id)
+        """
+        if _current_tx.get() is not None:
+            with self.savepoint() as conn:
+                yield conn
+            return
+
+        conn = self._pool.getconn()
+        tx = _Transaction(conn)
+        token = _current_tx.set(tx)
+        broken = False
+        try:
+            self._apply_session_user(conn)
+            options = _query_options.get()
+            if options is not None and options.timeout_ms is not None:
+                _set_timeout(conn, options.timeout_ms)
+            yield conn
+            conn.commit()
+            self._mark_write()
+        except Exception as e:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            broken = broken or _is_broken(e)
+            logger.error(f"Transaction rolled back: {e}")
+            raise
+        finally:
+            _current_tx.reset(token)
+            self._pool.putconn(conn, close=broken)
+
+        for callback in tx.on_commit:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"after_commit callback failed: {e}")
+
+    def after_commit(self, callback: Callable[[], Any]):
+        """
+        Run callback once the current db.transaction() has committed
+
+        Outside a transaction the statement has already been committed, so
+        callback runs now. On rollback it is dropped. Used for cache
+        invalidation: dropping a cache before commit would let a concurrent
+        reader refill it with the pre-commit rows. The same callback is
+        queued once per transaction.
+        """
+        tx = _current_tx.get()
+        if tx is None:
+            callback()
+        elif callback not in tx.on_commit:
+            tx.on_commit.append(callback)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Isolate part of a transaction (e.g. one imported row)
+
+        Rolled back to the savepoint if the block raises, or if a model
+        method inside swallowed a database error and left the transaction
+        aborted; the surrounding transaction stays usable either way.
+        """
+        tx = _current_tx.get()
+        if tx is None:
+            raise RuntimeError("savepoint() requires an active db.transaction()")
+
+        tx.savepoints += 1
+        name = f"sp_{tx.savepoints}"
+        conn = tx.conn
+
+        with conn.cursor() as cursor:
+            cursor.execute(f"SAVEPOINT {name}")
+
+        try:
+            yield conn
+        except Exception:
+            with conn.cursor() as cursor:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        else:
+            with conn.cursor() as cursor:
+                if conn.get_transaction_status() == extensions.TRANSACTION_STATUS_INERROR:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                else:
+                    cursor.execute(f"RELEASE SAVEPOINT {name}")
+
+    @contextmanager
+    def query_options(self, timeout_ms: Optional[int] = None,
+                      cancel_token: Optional[CancellationToken] = None):
+        """
+        statement_timeout and/or cancellation for the queries of this block
+
+        Applies to every query the current thread runs inside the block, so
+        controllers can wrap plain model calls. Models usually swallow
+        database errors, so check the yielded QueryOptions afterwards:
+
+            token = CancellationToken()      # GUI thread keeps it for cancel()
+            with db.query_options(timeout_ms=5000, cancel_token=token) as opts:
+                rows = model.search_derslik(term)
+            if opts.interrupted:
+                ...
+
+        A cancelled or timed-out statement rolls back its transaction; the
+        connection goes back to the pool in a usable state.
+        """
+        options = QueryOptions(timeout_ms, cancel_token)
+        tx = _current_tx.get()
+        previous = None
+        if tx is not None and timeout_ms is not None:
+            # Already inside a transaction: set now, restore the old value at exit
+            with tx.conn.cursor() as cursor:
+                cursor.execute("SELECT current_setting('statement_timeout')")
+                previous = cursor.fetchone()[0]
+            _set_timeout(tx.conn, timeout_ms)
+
+        token = _query_options.set(options)
+        try:
+            yield options
+        finally:
+            _query_options.reset(token)
+            if (previous is not None and not tx.conn.closed
+                    and tx.conn.get_transaction_status() != extensions.TRANSACTION_STATUS_INERROR):
+                _set_timeout(tx.conn, previous)
+
+    @contextmanager
+    def _query_scope(self, conn, set_timeout: bool = True):
+        """Apply the active query_options() to one connection checkout"""
+        options = _query_options.get()
+        if options is None:
+            yield
+            return
 
-    def execute_query(self, query: str, params: Tuple = None, fetch_one: bool = False) -> Optional[Any]:
-        """Execute SELECT query and return results"""
+        cancel_token = options.cancel_token
+        if cancel_token is not None:
+            try:
+                cancel_token._attach(conn)
+            except QueryCancelled:
+                options.cancelled = True
+                raise
+        try:
+            if set_timeout and options.timeout_ms is not None:
+                _set_timeout(conn, options.timeout_ms)
+            yield
+        except extensions.QueryCanceledError:
+            if cancel_token is not None and cancel_token.cancelled:
+                options.cancelled = True
+            else:
+                options.timed_out = True
+            raise
+        finally:
+            if cancel_token is not None:
+                cancel_token._detach()
+
+    @contextmanager
+    def pipeline(self):
+        """
+        Batch independent statements into one round trip (see models/pipeline.py)
+
+        Queued statements are sent when the block exits without an error;
+        results are read from the returned PipelineResult objects.
+        """
+        pipe = Pipeline(self)
+        yield pipe
+        pipe.flush()
+
+    @contextmanager
+    def replica_reads(self):
+        """
+        Let the reads of this block go to a read replica (see models/replica.py)
+
+        For reports and exports that are not single @replica_read model
+        methods, e.g. iterating a db.stream() generator:
+
+            with db.replica_reads():
+                for row in oturma_model.iter_oturma_by_program(program_id):
+                    ...
+        """
+        token = _replica_reads.set(True)
+        try:
+            yield
+        finally:
+            _replica_reads.reset(token)
+
+    def set_session_user(self, user_id: Optional[int]):
+        """
+        Logged-in user for row-level security (None after logout)
+
+        Each pooled connection runs set_app_context() once for the current
+        user - on the first checkout after login or a user change. It stores
+        only the validated user id (app.current_user_id); the policies look
+        up that user's role and department once per query, not per row.
+        The desktop app has one user per process.
+        """
+        self._session_user = user_id
+
+    @property
+    def session_user(self) -> Optional[int]:
+        """User id set by set_session_user() (None when logged out)"""
+        return self._session_user
+
+    def _apply_session_user(self, conn):
+        """Bring the connection's RLS context up to date (no round trip when it is)"""
+        user_id = self._session_user
+        if conn.app_user == user_id:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT set_app_context(%s)", (user_id,))
+        # Session-level settings survive only if this transaction commits
+        conn.commit()
+        conn.app_user = user_id
+
+    def _mark_write(self):
+        """Start read-your-writes stickiness after a write on the primary"""
+        if self._replicas is not None:
+            self._replicas.mark_write()
+
+    def in_transaction(self) -> bool:
+        """True inside a db.transaction() block"""
+        return _current_tx.get() is not None
+
+    def _execute(self, cursor, query: str, params: Tuple, prepared: bool):
+        """Run query directly or through the connection's prepared statement"""
+        started = time.perf_counter()
+        if not (prepared and self.use_prepared):
+            cursor.execute(query, params)
+        else:
+            name, param_count = self._prepare(cursor.connection, cursor, query)
+            try:
+                if param_count:
+                    cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * param_count)})", params)
+                else:
+                    cursor.execute(f"EXECUTE {name}")
+            except errors.InvalidSqlStatementName:
+                # Session was reset behind our back (DISCARD ALL etc.)
+                cursor.connection.prepared.clear()
+                raise
+        self._observe(cursor.connection, query, params, cursor.rowcount,
+                      time.perf_counter() - started)
+        if self._replicas is not None and not cursor.statusmessage.startswith('SELECT'):
+            self._mark_write()
+
+    def _observe(self, conn, query: str, params: Any, rows: int, elapsed: float):
+        """Record one statement; the checkout wait is charged to the first one"""
+        wait = conn.last_wait
+        conn.last_wait = 0.0
+        self._query_stats.record(query, params, rows, wait * 1000, elapsed * 1000)
+
+    def _prepare(self, conn, cursor, query: str) -> Tuple[str, int]:
+        """PREPARE query once per connection; least recently used ones are deallocated"""
+        registry = conn.prepared
+        entry = registry.get(query)
+        if entry is not None:
+            registry.move_to_end(query)
+            self._prepared_hits += 1
+            return entry
+
+        sql, param_count = _to_positional(query)
+        conn.prepared_seq += 1
+        name = f"ps_{conn.prepared_seq}"
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        registry[query] = (name, param_count)
+        self._prepared_misses += 1
+
+        if len(registry) > self._prepared_cache_size:
+            _, (old_name, _) = registry.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {old_name}")
+
+        return name, param_count
+
+    def execute_query(self, query: str, params: Tuple = None, fetch_one: bool = False,
+                      prepared: bool = False, write: bool = False) -> Optional[Any]:
+        """
+        Execute SELECT query and return results
+
+        Rows are dict-compatible Records (models/rows.py): one __slots__
+        class per column shape instead of a dict per row.
+
+        prepared=True runs the query as a server-side prepared statement that
+        is parsed/planned once per pooled connection (for hot, fixed SQL).
+
+        write=True marks a SELECT that writes (SELECT * FROM auth_complete(...))
+        for read-your-writes stickiness; INSERT/UPDATE/DELETE ... RETURNING
+        are detected from the command status.
+        """
         with self.get_connection() as conn:
-            with conn.cursor(cursor_factory=extras.RealDictCursor) as cursor:
-                cursor.execute(query, params)
+            with conn.cursor(cursor_factory=RecordCursor) as cursor:
+                self._execute(cursor, query, params, prepared)
+                if write:
+                    self._mark_write()
                 if fetch_one:
                     return cursor.fetchone()
                 return cursor.fetchall()
 
-    def execute_update(self, query: str, params: Tuple = None) -> int:
+    def stream(self, query: str, params: Tuple = None, batch_size: int = None,
+               batches: bool = False) -> Iterator[Any]:
+        """
+        Iterate over a large result with a named server-side cursor
+
+        Only batch_size rows are held client-side at a time, so exports and
+        reports keep flat memory however many rows match. Yields Records,
+        or lists of Records when batches=True. A cancelled query_options()
+        token also stops the stream between batches. The connection stays
+        checked out until the generator is exhausted or closed, so consume
+        it promptly:
+
+            for row in db.stream(query, (program_id,)):
+                writer.append(row)
+        """
+        batch_size = batch_size or DatabaseConfig.STREAM_BATCH_SIZE
+
+        with self.get_connection() as conn:
+            name = f"stream_{next(_cursor_ids)}"
+            with conn.cursor(name=name, cursor_factory=RecordCursor) as cursor:
+                cursor.itersize = batch_size
+                started = time.perf_counter()
+                cursor.execute(query, params)
+                # Only time spent in the database counts, not the consumer's work
+                elapsed = time.perf_counter() - started
+                total = 0
+                try:
+                    while True:
+                        _check_cancelled()
+                        started = time.perf_counter()
+                        rows = cursor.fetchmany(batch_size)
+                        elapsed += time.perf_counter() - started
+                        if not rows:
+                            break
+                        total += len(rows)
+                        if batches:
+                            yield rows
+                        else:
+                            yield from rows
+                finally:
+                    self._observe(conn, query, params, total, elapsed)
+
+    def fetch_columns(self, query: str, params: Tuple = None, batch_size: int = None) -> Dict[str, Any]:
+        """
+        Columnar result for bulk consumers: {column: numpy array}
+
+        Read through a server-side cursor in batches; no per-row objects
+        are kept.
+        """
+        batch_size = batch_size or DatabaseConfig.STREAM_BATCH_SIZE
+
+        with self.get_connection() as conn:
+            name = f"columns_{next(_cursor_ids)}"
+            with conn.cursor(name=name) as cursor:
+                cursor.itersize = batch_size
+                started = time.perf_counter()
+                cursor.execute(query, params)
+
+                def batches():
+                    while True:
+                        _check_cancelled()
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            return
+                        yield rows
+
+                first = cursor.fetchmany(batch_size)
+                fields = [d.name for d in cursor.description]
+                columns = to_columns(fields, itertools.chain([first], batches()))
+                rows = len(next(iter(columns.values()))) if columns else 0
+                self._observe(conn, query, params, rows, time.perf_counter() - started)
+                return columns
+
+    def execute_update(self, query: str, params: Tuple = None, prepared: bool = False) -> int:
         """Execute INSERT/UPDATE/DELETE query and return affected rows"""
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(query, params)
+                self._execute(cursor, query, params, prepared)
                 return cursor.rowcount
 
     def execute_procedure(self, procedure_name: str, params: List = None) -> Any:
         """Execute stored procedure/function"""
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
+                started = time.perf_counter()
                 cursor.callproc(procedure_name, params or [])
+                self._observe(
+                    conn, f"SELECT * FROM {procedure_name}({', '.join(['%s'] * len(params or []))})",
+                    params, cursor.rowcount, time.perf_counter() - started
+                )
+                # Functions may write (log_login_attempt does)
+                self._mark_write()
                 try:
                     return cursor.fetchall()
                 except:
@@ -95,10 +670,69 @@ class DatabaseManager:
             logger.error(f"Connection test failed: {e}")
             return False
 
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool metrics (wait time, in-use/idle, overflow events)"""
+        if not self._pool:
+            return {}
+        stats = self._pool.stats()
+        stats['prepared_hits'] = self._prepared_hits
+        stats['prepared_misses'] = self._prepared_misses
+        if self._replicas is not None:
+            stats['replicas'] = self._replicas.stats()
+        return stats
+
+    def query_stats(self, order_by: str = 'total_ms', limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Per-fingerprint latency summary (models/instrumentation.py)
+
+        order_by: total_ms, avg_ms, p95_ms, max_ms, calls, rows, slow, ...
+        """
+        return self._query_stats.snapshot(order_by, limit)
+
+    def reset_query_stats(self):
+        """Forget collected statement statistics and plans"""
+        self._query_stats.reset()
+
+    def explain_slowest(self, limit: int = 3, order_by: str = 'max_ms') -> List[Dict[str, Any]]:
+        """
+        EXPLAIN (ANALYZE, BUFFERS) the slowest fingerprints with their slowest parameters
+
+        ANALYZE really executes the statement, so only plain reads are
+        replayed (instrumentation.replayable(): no writes, row locks,
+        function calls or sensitive tables) and every run is rolled back.
+        Plans are also stored in query_stats() under 'plan'. Meant for
+        diagnostics, not the hot path.
+        """
+        if self.in_transaction():
+            raise RuntimeError("explain_slowest() cannot run inside db.transaction()")
+
+        results = []
+        for stats in self._query_stats.slowest(limit, order_by):
+            query, params = stats.sample
+            with self.get_connection() as conn:
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+                        plan = "\n".join(row[0] for row in cursor.fetchall())
+                except psycopg2.Error as e:
+                    logger.warning(f"EXPLAIN failed for {stats.fingerprint}: {e}")
+                    continue
+                finally:
+                    conn.rollback()
+            stats.plan = plan
+            results.append({
+                'fingerprint': stats.fingerprint,
+                'max_ms': round(stats.execution.max, 3),
+                'plan': plan
+            })
+        return results
+
     def close_all(self):
         """Close all connections in pool"""
         if self._pool:
             self._pool.closeall()
+            if self._replicas is not None:
+                self._replicas.closeall()
             logger.info("[OK] All database connections closed")
 
 
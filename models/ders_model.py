@@ -7,12 +7,19 @@ import psycopg2
 from typing import List, Dict, Optional, Tuple
 import logging
 
+from config import CacheConfig
+from .cache import make_cache, read_through, invalidate_caches
+
 logger = logging.getLogger(__name__)
 
 
 class DersModel:
     """Ders veritaban1 i_lemleri"""
 
+    # (kullan1c1, sorgu, parametreler) -> ders kay1tlar1; yazma i_lemleri bo_alt1r
+    _cache = make_cache('ders', maxsize=CacheConfig.REFERENCE_MAXSIZE,
+                        ttl=CacheConfig.REFERENCE_TTL)
+
     def __init__(self, db_connection):
         """
         Args:
@@ -44,27 +51,24 @@ class DersModel:
                 RETURNING ders_id
             """
 
-            cursor = self.db.execute_query(
+            row = self.db.execute_query(
                 query,
-                (bolum_id, ders_kodu, ders_adi, ogretim_elemani, sinif, ders_yapisi)
+                (bolum_id, ders_kodu, ders_adi, ogretim_elemani, sinif, ders_yapisi),
+                fetch_one=True
             )
 
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    ders_id = row[0]
-                    self.db.commit()
-                    logger.info(f"Yeni ders olu_turuldu: {ders_adi} (ID: {ders_id})")
-                    return ders_id
+            if row:
+                ders_id = row['ders_id']
+                self.db.after_commit(self.invalidate_cache)
+                logger.info(f"Yeni ders olu_turuldu: {ders_adi} (ID: {ders_id})")
+                return ders_id
 
             return None
 
         except psycopg2.IntegrityError as e:
-            self.db.rollback()
             logger.error(f"Ders olu_turulurken hata (duplicate): {e}")
             return None
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Ders olu_turulurken hata: {e}")
             return None
 
@@ -81,25 +85,28 @@ class DersModel:
         basarili = 0
         hatali = 0
 
-        for ders in dersler:
-            try:
-                result = self.create_ders(
-                    ders['bolum_id'],
-                    ders['ders_kodu'],
-                    ders['ders_adi'],
-                    ders['ogretim_elemani'],
-                    ders['sinif'],
-                    ders['ders_yapisi']
-                )
-
-                if result:
-                    basarili += 1
-                else:
-                    hatali += 1
+        # Tek transaction; hatal1 sat1r sadece kendi savepoint'ini geri al1r
+        with self.db.transaction():
+            for ders in dersler:
+                try:
+                    with self.db.savepoint():
+                        result = self.create_ders(
+                            ders['bolum_id'],
+                            ders['ders_kodu'],
+                            ders['ders_adi'],
+                            ders['ogretim_elemani'],
+                            ders['sinif'],
+                            ders['ders_yapisi']
+                        )
+
+                    if result:
+                        basarili += 1
+                    else:
+                        hatali += 1
 
-            except Exception as e:
-                logger.error(f"Toplu ders ekleme hatas1: {e}")
-                hatali += 1
+                except Exception as e:
+                    logger.error(f"Toplu ders ekleme hatas1: {e}")
+                    hatali += 1
 
         return basarili, hatali
 
@@ -127,16 +134,8 @@ class DersModel:
 
             query += " ORDER BY sinif, ders_kodu"
 
-            cursor = self.db.execute_query(query, (bolum_id,))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return list(read_through(self._cache, self.db, ('bolum', bolum_id, only_active),
+                                     lambda: tuple(self.db.execute_query(query, (bolum_id,)))))
 
         except Exception as e:
             logger.error(f"Dersler getirilirken hata: {e}")
@@ -161,15 +160,8 @@ class DersModel:
                 WHERE d.ders_id = %s
             """
 
-            cursor = self.db.execute_query(query, (ders_id,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return read_through(self._cache, self.db, ('id', ders_id),
+                                lambda: self.db.execute_query(query, (ders_id,), fetch_one=True))
 
         except Exception as e:
             logger.error(f"Ders getirilirken hata (ID: {ders_id}): {e}")
@@ -194,15 +186,8 @@ class DersModel:
                 WHERE d.ders_kodu = %s
             """
 
-            cursor = self.db.execute_query(query, (ders_kodu,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return read_through(self._cache, self.db, ('kod', ders_kodu),
+                                lambda: self.db.execute_query(query, (ders_kodu,), fetch_one=True))
 
         except Exception as e:
             logger.error(f"Ders getirilirken hata (Kod: {ders_kodu}): {e}")
@@ -238,16 +223,7 @@ class DersModel:
 
             query += " ORDER BY d.ders_kodu"
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, tuple(params))
 
         except Exception as e:
             logger.error(f"Ders aran1rken hata: {e}")
@@ -274,19 +250,15 @@ class DersModel:
             query = """
                 SELECT o.ogrenci_no, o.ad_soyad, o.sinif
                 FROM ogrenciler o
-                JOIN ogrenci_ders od ON o.ogrenci_no = od.ogrenci_no
-                WHERE od.ders_id = %s
+                JOIN ders_kayitlari dk ON o.ogrenci_no = dk.ogrenci_no
+                WHERE dk.ders_id = %s
                 ORDER BY o.ad_soyad
             """
 
-            cursor = self.db.execute_query(query, (ders_id,))
-
-            ogrenciler = []
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                for row in cursor.fetchall():
-                    ogrenciler.append(dict(zip(columns, row)))
+            ogrenciler = self.db.execute_query(query, (ders_id,))
 
+            # Record sabit kolonlu; ek alanlar iin dict'e evir
+            ders = dict(ders)
             ders['ogrenciler'] = ogrenciler
             ders['ogrenci_sayisi'] = len(ogrenciler)
 
@@ -334,17 +306,14 @@ class DersModel:
                 WHERE ders_id = %s
             """
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor and cursor.rowcount > 0:
-                self.db.commit()
+            if self.db.execute_update(query, tuple(params)) > 0:
+                self.db.after_commit(self.invalidate_cache)
                 logger.info(f"Ders gncellendi (ID: {ders_id})")
                 return True
 
             return False
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Ders gncellenirken hata: {e}")
             return False
 
@@ -380,17 +349,14 @@ class DersModel:
                 ORDER BY ders_kodu
             """
 
-            cursor = self.db.execute_query(query, (bolum_id, sinif))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return list(read_through(self._cache, self.db, ('sinif', bolum_id, sinif),
+                                     lambda: tuple(self.db.execute_query(query, (bolum_id, sinif)))))
 
         except Exception as e:
             logger.error(f"S1n1f dersleri getirilirken hata: {e}")
             return []
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Ders dei_ikliklerinden sonra cache'i bo_alt"""
+        invalidate_caches('ders')
@@ -7,12 +7,20 @@ import psycopg2
 from typing import List, Dict, Optional
 import logging
 
+from config import CacheConfig
+from .cache import make_cache, read_through, invalidate_caches
+from .oturma_model import OturmaModel
+
 logger = logging.getLogger(__name__)
 
 
 class DerslikModel:
     """Derslik veritaban1 i_lemleri"""
 
+    # (kullan1c1, sorgu, parametreler) -> derslik kay1tlar1; yazma i_lemleri bo_alt1r
+    _cache = make_cache('derslik', maxsize=CacheConfig.REFERENCE_MAXSIZE,
+                        ttl=CacheConfig.REFERENCE_TTL)
+
     def __init__(self, db_connection):
         """
         Args:
@@ -47,28 +55,25 @@ class DerslikModel:
                 RETURNING derslik_id
             """
 
-            cursor = self.db.execute_query(
+            row = self.db.execute_query(
                 query,
                 (bolum_id, derslik_kodu, derslik_adi, kapasite, satir_sayisi,
-                 sutun_sayisi, sira_yapisi)
+                 sutun_sayisi, sira_yapisi),
+                fetch_one=True
             )
 
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    derslik_id = row[0]
-                    self.db.commit()
-                    logger.info(f"Yeni derslik olu_turuldu: {derslik_adi} (ID: {derslik_id})")
-                    return derslik_id
+            if row:
+                derslik_id = row['derslik_id']
+                self.db.after_commit(self.invalidate_cache)
+                logger.info(f"Yeni derslik olu_turuldu: {derslik_adi} (ID: {derslik_id})")
+                return derslik_id
 
             return None
 
         except psycopg2.IntegrityError as e:
-            self.db.rollback()
             logger.error(f"Derslik olu_turulurken hata (duplicate): {e}")
             return None
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Derslik olu_turulurken hata: {e}")
             return None
 
@@ -96,20 +101,39 @@ class DerslikModel:
 
             query += " ORDER BY derslik_kodu"
 
-            cursor = self.db.execute_query(query, (bolum_id,))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
+            return list(read_through(self._cache, self.db, ('bolum', bolum_id, only_active),
+                                     lambda: tuple(self.db.execute_query(query, (bolum_id,)))))
 
+        except Exception as e:
+            logger.error(f"Derslikler getirilirken hata: {e}")
             return []
 
+    def get_derslikler_by_ids(self, derslik_ids: List[int]) -> Optional[List[Dict]]:
+        """
+        ID listesindeki derslikleri cache'e bakmadan getir (pasifler dahil)
+
+        Change feed bildirimiyle gelen sat1rlar1 tazelemek iin.
+
+        Args:
+            derslik_ids: Derslik ID listesi
+
+        Returns:
+            Derslik listesi (RLS'in gstermedii sat1rlar yer almaz),
+            hata olursa None (bo_ listeyle kar1_mas1n)
+        """
+        try:
+            query = """
+                SELECT derslik_id, bolum_id, derslik_kodu, derslik_adi,
+                       kapasite, satir_sayisi, sutun_sayisi, sira_yapisi, aktif
+                FROM derslikler
+                WHERE derslik_id = ANY(%s)
+            """
+
+            return self.db.execute_query(query, (list(derslik_ids),))
+
         except Exception as e:
             logger.error(f"Derslikler getirilirken hata: {e}")
-            return []
+            return None
 
     def get_all_derslikler(self, only_active=True) -> List[Dict]:
         """
@@ -135,16 +159,8 @@ class DerslikModel:
 
             query += " ORDER BY b.bolum_adi, d.derslik_kodu"
 
-            cursor = self.db.execute_query(query)
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return list(read_through(self._cache, self.db, ('all', only_active),
+                                     lambda: tuple(self.db.execute_query(query))))
 
         except Exception as e:
             logger.error(f"Derslikler getirilirken hata: {e}")
@@ -170,15 +186,8 @@ class DerslikModel:
                 WHERE d.derslik_id = %s
             """
 
-            cursor = self.db.execute_query(query, (derslik_id,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return read_through(self._cache, self.db, ('id', derslik_id),
+                                lambda: self.db.execute_query(query, (derslik_id,), fetch_one=True))
 
         except Exception as e:
             logger.error(f"Derslik getirilirken hata (ID: {derslik_id}): {e}")
@@ -214,16 +223,7 @@ class DerslikModel:
 
             query += " ORDER BY d.derslik_kodu"
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, tuple(params))
 
         except Exception as e:
             logger.error(f"Derslik aran1rken hata: {e}")
@@ -264,17 +264,17 @@ class DerslikModel:
                 WHERE derslik_id = %s
             """
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor and cursor.rowcount > 0:
-                self.db.commit()
+            if self.db.execute_update(query, tuple(params)) > 0:
+                self.db.after_commit(self.invalidate_cache)
+                if 'derslik_kodu' in kwargs or 'derslik_adi' in kwargs:
+                    # renci takvimleri derslik kodu/ad1n1 ta_1r
+                    self.db.after_commit(OturmaModel.invalidate_takvim_cache)
                 logger.info(f"Derslik gncellendi (ID: {derslik_id})")
                 return True
 
             return False
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Derslik gncellenirken hata: {e}")
             return False
 
@@ -306,28 +306,22 @@ class DerslikModel:
         """
         try:
             query = """
-                SELECT COUNT(*)
-                FROM sinav_programi
-                WHERE derslik_id = %s
-                  AND tarih = %s
-                  AND (
-                      (baslangic_saati <= %s AND bitis_saati > %s) OR
-                      (baslangic_saati < %s AND bitis_saati >= %s) OR
-                      (baslangic_saati >= %s AND bitis_saati <= %s)
-                  )
+                SELECT COUNT(*) AS adet
+                FROM sinav_derslikleri sd
+                JOIN sinavlar s ON sd.sinav_id = s.sinav_id
+                WHERE sd.derslik_id = %s
+                  AND s.tarih = %s
+                  AND s.baslangic_saati < %s
+                  AND s.bitis_saati > %s
             """
 
-            cursor = self.db.execute_query(
+            row = self.db.execute_query(
                 query,
-                (derslik_id, tarih, baslangic_saati, baslangic_saati,
-                 bitis_saati, bitis_saati, baslangic_saati, bitis_saati)
+                (derslik_id, tarih, bitis_saati, baslangic_saati),
+                fetch_one=True
             )
 
-            if cursor:
-                count = cursor.fetchone()[0]
-                return count == 0
-
-            return False
+            return row['adet'] == 0
 
         except Exception as e:
             logger.error(f"Derslik msaitlik kontrol hatas1: {e}")
@@ -355,17 +349,14 @@ class DerslikModel:
                 ORDER BY kapasite ASC
             """
 
-            cursor = self.db.execute_query(query, (bolum_id, required_capacity))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return list(read_through(self._cache, self.db, ('uygun', bolum_id, required_capacity),
+                                     lambda: tuple(self.db.execute_query(query, (bolum_id, required_capacity)))))
 
         except Exception as e:
             logger.error(f"Uygun derslikler getirilirken hata: {e}")
             return []
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Derslik dei_ikliklerinden sonra cache'i bo_alt"""
+        invalidate_caches('derslik')
@@ -0,0 +1,282 @@
+"""
+Email Queue
+Background sender for email_queue rows over pooled SMTP connections
+
+Messages are queued with enqueue() and sent by EmailConfig.SMTP_POOL_SIZE
+daemon threads, each holding at most one SMTP connection of the
+EmailService pool. A worker claims up to batch_size due rows with
+FOR UPDATE SKIP LOCKED in (status, priority DESC, scheduled_for) order, so
+any number of clients can drain the same queue without sending a message
+twice. Claiming counts the attempt and pushes scheduled_for `lease` seconds
+ahead, then commits; a client that dies mid-batch leaves its rows to be
+claimed again once the lease runs out.
+
+A rejected message is retried retry_base * 2^(attempt-1) seconds later
+(capped at retry_max) until max_attempts, then marked 'failed'. A 5xx
+reply fails it at once. When the SMTP server cannot be reached or refuses
+the session (including bad credentials) the rest of the batch is released without using up an attempt and the worker backs
+off, as models/write_behind.py does for the database.
+"""
+
+import logging
+import smtplib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import EmailConfig
+from utils.email_service import SMTPSetupError
+
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 300.0
+
+_CLAIM = """
+    WITH batch AS (
+        SELECT email_id FROM email_queue
+        WHERE status = 'pending'
+        AND scheduled_for <= CURRENT_TIMESTAMP
+        AND attempts < max_attempts
+        ORDER BY priority DESC, scheduled_for
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE email_queue q
+    SET attempts = q.attempts + 1,
+        scheduled_for = CURRENT_TIMESTAMP + make_interval(secs => %s)
+    FROM batch
+    WHERE q.email_id = batch.email_id
+    RETURNING q.email_id, q.to_email, q.subject, q.body_text, q.body_html,
+              q.priority, q.attempts, q.max_attempts
+"""
+
+_SENT = """
+    UPDATE email_queue
+    SET status = 'sent', sent_at = CURRENT_TIMESTAMP, last_error = NULL
+    WHERE email_id = ANY(%s)
+"""
+
+_FAILED = """
+    UPDATE email_queue q
+    SET last_error = f.error,
+        status = CASE WHEN f.permanent OR q.attempts >= q.max_attempts
+                      THEN 'failed' ELSE 'pending' END::email_status_enum,
+        scheduled_for = CURRENT_TIMESTAMP + make_interval(secs => f.delay)
+    FROM unnest(%s::int[], %s::text[], %s::boolean[], %s::float8[])
+         AS f(email_id, error, permanent, delay)
+    WHERE q.email_id = f.email_id
+"""
+
+# Claimed but not attempted (SMTP unreachable): the attempt is given back
+_RELEASE = """
+    UPDATE email_queue
+    SET attempts = attempts - 1,
+        scheduled_for = CURRENT_TIMESTAMP + make_interval(secs => %s)
+    WHERE email_id = ANY(%s)
+"""
+
+# Rows whose last attempt was claimed by a client that never reported back
+_EXPIRE = """
+    UPDATE email_queue
+    SET status = 'failed', last_error = COALESCE(last_error, 'lease expired')
+    WHERE status = 'pending'
+    AND attempts >= max_attempts
+    AND scheduled_for <= CURRENT_TIMESTAMP
+"""
+
+_ENQUEUE = """
+    INSERT INTO email_queue (to_email, subject, body_text, body_html, email_type,
+                             priority, scheduled_for)
+    VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))
+    RETURNING email_id
+"""
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies and refused recipients will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def _is_rejection(error: Exception) -> bool:
+    """
+    The server answered about this message (vs. the connection failing)
+
+    SMTPSetupError wraps connect/greeting/STARTTLS/login failures, which
+    smtplib also raises as SMTPResponseException (e.g. 535 bad credentials);
+    those say nothing about the message and must not use up its attempts.
+    """
+    if isinstance(error, SMTPSetupError):
+        return False
+    return isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException))
+
+
+class EmailQueueWorker:
+    """Daemon threads draining email_queue through an EmailService pool"""
+
+    def __init__(self, service=None, workers: int = 2, batch_size: int = 50,
+                 poll_interval: float = 10, lease: int = 300,
+                 retry_base: float = 60, retry_max: float = 3600):
+        self._service = service
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self.claimed = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.released = 0
+
+    @property
+    def service(self):
+        if self._service is None:
+            from utils.email_service import EmailService
+            self._service = EmailService()
+        return self._service
+
+    def enqueue(self, to_email: str, subject: str, body_html: str = None,
+                body_text: str = None, email_type: str = None, priority: int = 5,
+                scheduled_for=None) -> Optional[int]:
+        """Queue one message (priority 1-10, higher first); returns email_id"""
+        rows = db.execute_query(
+            _ENQUEUE, (to_email, subject, body_text, body_html, email_type, priority, scheduled_for)
+        )
+        self.wake()
+        return rows[0]['email_id'] if rows else None
+
+    def wake(self):
+        """Have an idle worker poll now instead of at the next interval"""
+        self._wake.set()
+
+    def _claim(self) -> List[Dict[str, Any]]:
+        rows = db.execute_query(_CLAIM, (self.batch_size, self.lease))
+        rows.sort(key=lambda row: -row['priority'])
+        with self._lock:
+            self.claimed += len(rows)
+        return rows
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+
+    def run_once(self) -> Tuple[int, int]:
+        """
+        Claim and send one batch on the calling thread; (claimed, sent)
+
+        Raises OSError when the SMTP server cannot be reached; the unsent
+        rest of the batch has been released by then.
+        """
+        rows = self._claim()
+        if not rows:
+            db.execute_update(_EXPIRE)
+            return 0, 0
+
+        service = self.service
+        sent: List[int] = []
+        failed: List[Tuple[int, str, bool, float]] = []
+        given_up = 0
+        try:
+            for index, row in enumerate(rows):
+                msg = service.build_message(row['to_email'], row['subject'],
+                                            row['body_html'], row['body_text'])
+                try:
+                    service.pool.send(msg)
+                    sent.append(row['email_id'])
+                except OSError as e:
+                    if not _is_rejection(e):
+                        # Connection-level: nothing was attempted for these
+                        pending = [r['email_id'] for r in rows[index:]]
+                        db.execute_update(_RELEASE, (self.retry_base, pending))
+                        with self._lock:
+                            self.released += len(pending)
+                        raise
+                    permanent = _is_permanent(e)
+                    failed.append((row['email_id'], str(e)[:500], permanent,
+                                   self._retry_delay(row['attempts'])))
+                    if permanent or row['attempts'] >= row['max_attempts']:
+                        given_up += 1
+                        logger.warning(f"Email {row['email_id']} to {row['to_email']} failed: {e}")
+        finally:
+            if sent:
+                db.execute_update(_SENT, (sent,))
+            if failed:
+                db.execute_update(_FAILED, tuple(map(list, zip(*failed))))
+            with self._lock:
+                self.sent += len(sent)
+                self.failed += given_up
+                self.retried += len(failed) - given_up
+
+        return len(rows), len(sent)
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                claimed, _ = self.run_once()
+                attempt = 0
+            except Exception as e:
+                attempt += 1
+                if attempt == 1:
+                    logger.warning(f"Email queue: send failed, retrying: {e}")
+                self._stop.wait(min(MAX_BACKOFF, 2 ** attempt))
+                continue
+            if claimed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self):
+        """Start the worker threads (after db.initialize)"""
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            if self._threads:
+                return
+            self._stop.clear()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'email-queue-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Email queue worker started ({self.workers} threads)")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop after the current batch and close the SMTP connections"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self._service is not None:
+            self._service.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                'claimed': self.claimed,
+                'sent': self.sent,
+                'retried': self.retried,
+                'failed': self.failed,
+                'released': self.released,
+            }
+        if self._service is not None:
+            stats['smtp'] = self._service.pool.stats()
+        return stats
+
+
+# Global worker; main.py starts it when EmailConfig.QUEUE_WORKER is set
+email_queue_worker = EmailQueueWorker(
+    workers=EmailConfig.SMTP_POOL_SIZE,
+    batch_size=EmailConfig.QUEUE_BATCH_SIZE,
+    poll_interval=EmailConfig.QUEUE_POLL_INTERVAL,
+    lease=EmailConfig.QUEUE_LEASE,
+    retry_base=EmailConfig.RETRY_BASE,
+    retry_max=EmailConfig.RETRY_MAX
+)
@@ -0,0 +1,227 @@
+"""
+Query Instrumentation
+Per-statement latency statistics grouped by normalized SQL fingerprint
+
+For every statement DatabaseManager records the connection wait, the
+execution time, the parameter count and the rows returned/affected.
+Times go into fixed-bucket histograms, so recording is a dict lookup, a
+bisect and a few additions under a lock; statements slower than the
+threshold are also written to the "models.instrumentation.slow" logger
+(fingerprint only - parameters may contain personal data).
+
+The parameters of a fingerprint's slowest run are kept for replay only
+when the statement is replayable(): a plain read that calls no functions
+and touches no account, session, audit or mail table. Other statements
+keep no parameters at all, so password hashes, e-mail addresses, IPs and
+user agents never stay in memory, and EXPLAIN ANALYZE never re-runs a
+write, a row lock or a side-effecting function.
+
+    db.query_stats()               # per-fingerprint summary, slowest first
+    db.explain_slowest(3)          # EXPLAIN (ANALYZE, BUFFERS) of the worst ones
+"""
+
+import logging
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+slow_logger = logging.getLogger(__name__ + '.slow')
+
+# Histogram bucket upper bounds (ms); the last bucket is open-ended
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+              1000, 2500, 5000, 10000, 30000)
+
+# Fingerprint used once max_fingerprints distinct statements are tracked
+OVERFLOW_FINGERPRINT = '<other>'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%s|\$\d+")
+_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+# replayable(): plain reads only
+_READ = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITE_OR_LOCK = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|COPY|CALL|DO|INTO|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b",
+    re.IGNORECASE
+)
+_SENSITIVE = re.compile(
+    r"\b(users|active_sessions|login_attempts|password_reset_tokens|audit_logs|email_queue)\b",
+    re.IGNORECASE
+)
+_CALL = re.compile(r"\b([A-Za-z_][\w.]*)\s*\(")
+# Words before "(" that are SQL syntax or side-effect free built-ins
+_SAFE_CALLS = frozenset("""
+    select from join where and or not on in as any all exists using values filter
+    over when then else case is between lateral materialized with by
+    coalesce nullif greatest least cast extract date_trunc date_part
+    count sum avg min max array_agg string_agg json_agg jsonb_agg bool_and bool_or
+    row_number rank dense_rank lower upper trim length substring concat round abs
+    array_length unnest
+""".split())
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> str:
+    """
+    Normalized statement text: literals and placeholders become ?, IN
+    lists collapse to IN (?...), whitespace is squeezed
+
+        "SELECT * FROM dersler WHERE ders_id IN (3, 4, 5)"
+        -> "SELECT * FROM dersler WHERE ders_id IN (?...)"
+    """
+    text = _STRING.sub('?', query)
+    text = _PARAM.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _LIST.sub('IN (?...)', text)
+    return _SPACE.sub(' ', text).strip()
+
+
+@lru_cache(maxsize=2048)
+def replayable(query: str) -> bool:
+    """
+    Whether EXPLAIN ANALYZE may re-run the statement with its parameters:
+    SELECT/WITH without writes, row locks, function calls (other than
+    syntax and pure built-ins) or sensitive tables
+    """
+    if not _READ.match(query) or _WRITE_OR_LOCK.search(query) or _SENSITIVE.search(query):
+        return False
+    return all(name.lower() in _SAFE_CALLS for name in _CALL.findall(query))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (ms)"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms: float):
+        self.counts[bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction (never above max)"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(BUCKETS_MS[index], self.max) if index < len(BUCKETS_MS) else self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class StatementStats:
+    """Aggregates of one fingerprint"""
+
+    __slots__ = ('fingerprint', 'param_count', 'rows', 'slow', 'execution', 'wait',
+                 'sample', 'plan')
+
+    def __init__(self, fingerprint: str, param_count: int):
+        self.fingerprint = fingerprint
+        self.param_count = param_count
+        self.rows = 0
+        self.slow = 0
+        self.execution = Histogram()
+        self.wait = Histogram()
+        self.sample: Optional[Tuple[str, Any]] = None   # (query, params) of the slowest run, if replayable
+        self.plan: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        execution = self.execution
+        return {
+            'fingerprint': self.fingerprint,
+            'calls': execution.count,
+            'params': self.param_count,
+            'rows': self.rows,
+            'avg_rows': round(self.rows / execution.count, 1) if execution.count else 0.0,
+            'total_ms': round(execution.total, 3),
+            'avg_ms': round(execution.mean, 3),
+            'p50_ms': round(execution.percentile(0.50), 3),
+            'p95_ms': round(execution.percentile(0.95), 3),
+            'p99_ms': round(execution.percentile(0.99), 3),
+            'max_ms': round(execution.max, 3),
+            'avg_wait_ms': round(self.wait.mean, 3),
+            'max_wait_ms': round(self.wait.max, 3),
+            'slow': self.slow,
+            'plan': self.plan
+        }
+
+
+class QueryStats:
+    """Thread-safe registry of StatementStats keyed by fingerprint"""
+
+    def __init__(self, slow_ms: float = 500, max_fingerprints: int = 1000, enabled: bool = True):
+        self.slow_ms = slow_ms
+        self.max_fingerprints = max_fingerprints
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats: Dict[str, StatementStats] = {}
+
+    def record(self, query: str, params: Any, rows: int, wait_ms: float, exec_ms: float):
+        """Add one executed statement"""
+        if not self.enabled:
+            return
+
+        key = fingerprint(query)
+        param_count = len(params) if params else 0
+        rows = max(rows, 0)
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    key = OVERFLOW_FINGERPRINT
+                    stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = StatementStats(key, param_count)
+
+            if exec_ms > stats.execution.max:
+                stats.sample = (query, params) if replayable(query) else None
+            stats.execution.add(exec_ms)
+            stats.wait.add(wait_ms)
+            stats.rows += rows
+            slow = exec_ms >= self.slow_ms
+            if slow:
+                stats.slow += 1
+
+        if slow:
+            slow_logger.warning(
+                f"Slow query {exec_ms:.1f} ms (wait {wait_ms:.1f} ms, "
+                f"{param_count} params, {rows} rows): {key}"
+            )
+
+    def snapshot(self, order_by: str = 'total_ms', limit: int = None) -> List[Dict[str, Any]]:
+        """Summaries sorted by the given column, largest first"""
+        with self._lock:
+            rows = [stats.as_dict() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def slowest(self, limit: int, order_by: str = 'max_ms') -> List[StatementStats]:
+        """StatementStats with a replayable sample, slowest first"""
+        with self._lock:
+            candidates = [s for s in self._stats.values() if s.sample is not None]
+        key = (lambda s: s.execution.max) if order_by == 'max_ms' else (lambda s: s.execution.total)
+        candidates.sort(key=key, reverse=True)
+        return candidates[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
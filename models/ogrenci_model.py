@@ -4,7 +4,7 @@
 """
 
 import psycopg2
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterator, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,20 +45,17 @@ class OgrenciModel:
                     aktif = TRUE
             """
 
-            cursor = self.db.execute_query(
+            if self.db.execute_update(
                 query,
-                (ogrenci_no, bolum_id, ad_soyad, sinif)
-            )
-
-            if cursor:
-                self.db.commit()
+                (ogrenci_no, bolum_id, ad_soyad, sinif),
+                prepared=True
+            ):
                 logger.info(f"renci olu_turuldu/gncellendi: {ogrenci_no}")
                 return True
 
             return False
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"renci olu_turulurken hata: {e}")
             return False
 
@@ -75,24 +72,27 @@ class OgrenciModel:
         basarili = 0
         hatali = 0
 
-        for ogrenci in ogrenciler:
-            try:
-                result = self.create_ogrenci(
-                    ogrenci['ogrenci_no'],
-                    ogrenci['bolum_id'],
-                    ogrenci['ad_soyad'],
-                    ogrenci.get('sinif', 1)
-                )
-
-                if result:
-                    basarili += 1
-                else:
+        # Tek transaction; hatal1 sat1r sadece kendi savepoint'ini geri al1r
+        with self.db.transaction():
+            for ogrenci in ogrenciler:
+                try:
+                    with self.db.savepoint():
+                        result = self.create_ogrenci(
+                            ogrenci['ogrenci_no'],
+                            ogrenci['bolum_id'],
+                            ogrenci['ad_soyad'],
+                            ogrenci.get('sinif', 1)
+                        )
+
+                    if result:
+                        basarili += 1
+                    else:
+                        hatali += 1
+
+                except Exception as e:
+                    logger.error(f"Toplu renci ekleme hatas1: {e}")
                     hatali += 1
 
-            except Exception as e:
-                logger.error(f"Toplu renci ekleme hatas1: {e}")
-                hatali += 1
-
         return basarili, hatali
 
     def add_ders_kayit(self, ogrenci_no: str, ders_id: int) -> bool:
@@ -113,16 +113,10 @@ class OgrenciModel:
                 ON CONFLICT (ogrenci_no, ders_id) DO NOTHING
             """
 
-            cursor = self.db.execute_query(query, (ogrenci_no, ders_id))
-
-            if cursor:
-                self.db.commit()
-                return True
-
-            return False
+            self.db.execute_update(query, (ogrenci_no, ders_id), prepared=True)
+            return True
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Ders kayd1 eklenirken hata: {e}")
             return False
 
@@ -146,16 +140,10 @@ class OgrenciModel:
                 ON CONFLICT (ogrenci_no, ders_id) DO NOTHING
             """
 
-            cursor = self.db.execute_query(query, (ogrenci_no, ders_kodu))
-
-            if cursor:
-                self.db.commit()
-                return True
-
-            return False
+            self.db.execute_update(query, (ogrenci_no, ders_kodu), prepared=True)
+            return True
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Ders kayd1 eklenirken hata: {e}")
             return False
 
@@ -171,31 +159,31 @@ class OgrenciModel:
             renci listesi
         """
         try:
-            query = """
-                SELECT ogrenci_no, bolum_id, ad_soyad, sinif, aktif
-                FROM ogrenciler
-                WHERE bolum_id = %s
-            """
+            return list(self.iter_ogrenciler_by_bolum(bolum_id, only_active))
 
-            if only_active:
-                query += " AND aktif = TRUE"
+        except Exception as e:
+            logger.error(f"renciler getirilirken hata: {e}")
+            return []
 
-            query += " ORDER BY sinif, ad_soyad"
+    def iter_ogrenciler_by_bolum(self, bolum_id: int, only_active=True) -> Iterator[Dict]:
+        """
+        Blme ait rencileri server-side cursor ile s1rayla ret
 
-            cursor = self.db.execute_query(query, (bolum_id,))
+        Rapor/export gibi tm blm dola_an yollar iin; bellek kullan1m1
+        renci say1s1ndan ba1ms1z kal1r.
+        """
+        query = """
+            SELECT ogrenci_no, bolum_id, ad_soyad, sinif, aktif
+            FROM ogrenciler
+            WHERE bolum_id = %s
+        """
 
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
+        if only_active:
+            query += " AND aktif = TRUE"
 
-            return []
+        query += " ORDER BY sinif, ad_soyad"
 
-        except Exception as e:
-            logger.error(f"renciler getirilirken hata: {e}")
-            return []
+        return self.db.stream(query, (bolum_id,))
 
     def get_ogrenci_by_no(self, ogrenci_no: str) -> Optional[Dict]:
         """
@@ -216,15 +204,7 @@ class OgrenciModel:
                 WHERE o.ogrenci_no = %s
             """
 
-            cursor = self.db.execute_query(query, (ogrenci_no,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return self.db.execute_query(query, (ogrenci_no,), fetch_one=True)
 
         except Exception as e:
             logger.error(f"renci getirilirken hata (No: {ogrenci_no}): {e}")
@@ -257,14 +237,10 @@ class OgrenciModel:
                 ORDER BY d.ders_kodu
             """
 
-            cursor = self.db.execute_query(query, (ogrenci_no,))
-
-            dersler = []
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                for row in cursor.fetchall():
-                    dersler.append(dict(zip(columns, row)))
+            dersler = self.db.execute_query(query, (ogrenci_no,))
 
+            # Record sabit kolonlu; ek alanlar iin dict'e evir
+            ogrenci = dict(ogrenci)
             ogrenci['dersler'] = dersler
             ogrenci['ders_sayisi'] = len(dersler)
 
@@ -303,16 +279,7 @@ class OgrenciModel:
 
             query += " ORDER BY o.ogrenci_no"
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, tuple(params))
 
         except Exception as e:
             logger.error(f"renci aran1rken hata: {e}")
@@ -352,17 +319,13 @@ class OgrenciModel:
                 WHERE ogrenci_no = %s
             """
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor and cursor.rowcount > 0:
-                self.db.commit()
+            if self.db.execute_update(query, tuple(params)) > 0:
                 logger.info(f"renci gncellendi (No: {ogrenci_no})")
                 return True
 
             return False
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"renci gncellenirken hata: {e}")
             return False
 
@@ -397,16 +360,7 @@ class OgrenciModel:
                 ORDER BY o.ad_soyad
             """
 
-            cursor = self.db.execute_query(query, (ders_id,))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, (ders_id,))
 
         except Exception as e:
             logger.error(f"Ders rencileri getirilirken hata: {e}")
@@ -424,18 +378,13 @@ class OgrenciModel:
         """
         try:
             query = """
-                SELECT COUNT(*)
+                SELECT COUNT(*) AS adet
                 FROM ders_kayitlari dk
                 JOIN ogrenciler o ON dk.ogrenci_no = o.ogrenci_no
                 WHERE dk.ders_id = %s AND o.aktif = TRUE
             """
 
-            cursor = self.db.execute_query(query, (ders_id,))
-
-            if cursor:
-                return cursor.fetchone()[0]
-
-            return 0
+            return self.db.execute_query(query, (ders_id,), fetch_one=True)['adet']
 
         except Exception as e:
             logger.error(f"renci say1s1 getirilirken hata: {e}")
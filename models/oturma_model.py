@@ -4,15 +4,36 @@ Oturma d
 """
 
 import psycopg2
-from typing import List, Dict, Optional, Tuple
+from itertools import groupby
+from operator import itemgetter
+from typing import List, Dict, Iterator, Optional, Tuple
 import logging
 
+from config import CacheConfig
+from .cache import LocalCache, read_through, warm
+from .database import replica_read
+
 logger = logging.getLogger(__name__)
 
 
 class OturmaModel:
     """Oturma plan1 veritaban1 i_lemleri"""
 
+    # (session_user, program_id, ogrenci_no) -> rencinin s1nav/oturma takvimi
+    _takvim_cache = LocalCache(maxsize=CacheConfig.SEAT_LOOKUP_MAXSIZE,
+                               ttl=CacheConfig.SEAT_LOOKUP_TTL)
+
+    TAKVIM_QUERY = """
+        SELECT op.ogrenci_no, s.sinav_id, d.ders_kodu, d.ders_adi,
+               s.tarih, s.baslangic_saati, s.bitis_saati,
+               op.derslik_id, dr.derslik_kodu, dr.derslik_adi,
+               op.satir_no, op.sutun_no
+        FROM oturma_planlari op
+        JOIN sinavlar s ON op.sinav_id = s.sinav_id
+        JOIN dersler d ON s.ders_id = d.ders_id
+        JOIN derslikler dr ON op.derslik_id = dr.derslik_id
+    """
+
     def __init__(self, db_connection):
         self.db = db_connection
 
@@ -26,52 +47,51 @@ class OturmaModel:
                 VALUES (%s, %s, %s, %s, %s)
             """
 
-            cursor = self.db.execute_query(
+            eklendi = self.db.execute_update(
                 query,
-                (sinav_id, derslik_id, ogrenci_no, satir_no, sutun_no)
-            )
-
-            if cursor:
-                self.db.commit()
-                return True
-
-            return False
+                (sinav_id, derslik_id, ogrenci_no, satir_no, sutun_no),
+                prepared=True
+            ) > 0
+            if eklendi:
+                self.db.after_commit(self.invalidate_takvim_cache)
+            return eklendi
 
         except psycopg2.IntegrityError as e:
-            self.db.rollback()
             logger.error(f"Oturma plan1 olu_turma hatas1 (duplicate): {e}")
             return False
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Oturma plan1 olu_turma hatas1: {e}")
             return False
 
     def create_oturma_batch(self, oturmalar: List[Dict]) -> Tuple[int, int]:
-        """Toplu oturma plan1 olu_tur"""
+        """Toplu oturma plan1 olu_tur (tek transaction, sat1r ba_1na savepoint)"""
         basarili = 0
         hatali = 0
 
-        for oturma in oturmalar:
-            try:
-                result = self.create_oturma(
-                    oturma['sinav_id'],
-                    oturma['derslik_id'],
-                    oturma['ogrenci_no'],
-                    oturma['satir_no'],
-                    oturma['sutun_no']
-                )
-
-                if result:
-                    basarili += 1
-                else:
+        with self.db.transaction():
+            for oturma in oturmalar:
+                try:
+                    with self.db.savepoint():
+                        result = self.create_oturma(
+                            oturma['sinav_id'],
+                            oturma['derslik_id'],
+                            oturma['ogrenci_no'],
+                            oturma['satir_no'],
+                            oturma['sutun_no']
+                        )
+
+                    if result:
+                        basarili += 1
+                    else:
+                        hatali += 1
+
+                except Exception as e:
+                    logger.error(f"Toplu oturma ekleme hatas1: {e}")
                     hatali += 1
 
-            except Exception as e:
-                logger.error(f"Toplu oturma ekleme hatas1: {e}")
-                hatali += 1
-
         return basarili, hatali
 
+    @replica_read
     def get_oturma_by_sinav(self, sinav_id: int) -> List[Dict]:
         """S1nava ait oturma plan1n1 getir"""
         try:
@@ -87,21 +107,13 @@ class OturmaModel:
                 ORDER BY dr.derslik_kodu, op.satir_no, op.sutun_no
             """
 
-            cursor = self.db.execute_query(query, (sinav_id,))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, (sinav_id,))
 
         except Exception as e:
             logger.error(f"Oturma plan1 getirilirken hata: {e}")
             return []
 
+    @replica_read
     def get_oturma_by_sinav_derslik(self, sinav_id: int, derslik_id: int) -> List[Dict]:
         """S1nav ve derslie gre oturma plan1n1 getir"""
         try:
@@ -114,21 +126,13 @@ class OturmaModel:
                 ORDER BY op.satir_no, op.sutun_no
             """
 
-            cursor = self.db.execute_query(query, (sinav_id, derslik_id))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, (sinav_id, derslik_id))
 
         except Exception as e:
             logger.error(f"Derslik oturma plan1 getirilirken hata: {e}")
             return []
 
+    @replica_read
     def get_ogrenci_oturma(self, sinav_id: int, ogrenci_no: str) -> Optional[Dict]:
         """rencinin oturma yerini getir"""
         try:
@@ -140,15 +144,7 @@ class OturmaModel:
                 WHERE op.sinav_id = %s AND op.ogrenci_no = %s
             """
 
-            cursor = self.db.execute_query(query, (sinav_id, ogrenci_no))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return self.db.execute_query(query, (sinav_id, ogrenci_no), fetch_one=True)
 
         except Exception as e:
             logger.error(f"renci oturma yeri getirilirken hata: {e}")
@@ -156,29 +152,39 @@ class OturmaModel:
 
     def delete_oturma_by_sinav(self, sinav_id: int) -> bool:
         """S1nava ait tm oturma plan1n1 sil"""
-        try:
-            query = "DELETE FROM oturma_planlari WHERE sinav_id = %s"
+        return self.purge_oturma([sinav_id]) is not None
 
-            cursor = self.db.execute_query(query, (sinav_id,))
+    def purge_oturma(self, sinav_ids: List[int]) -> Optional[int]:
+        """
+        S1navlar1n oturma planlar1n1 toplu sil
 
-            if cursor:
-                self.db.commit()
-                logger.info(f"Oturma plan1 silindi (S1nav ID: {sinav_id})")
-                return True
+        Sat1r ba_1na saya trigger'1 al1_maz; yerle_im sayalar1 tek
+        UPDATE ile s1f1rlan1r (purge_oturma SQL fonksiyonu).
 
-            return False
+        Args:
+            sinav_ids: S1nav ID listesi
+
+        Returns:
+            Silinen oturma say1s1, hata durumunda None
+        """
+        try:
+            result = self.db.execute_procedure('purge_oturma', [list(sinav_ids)])
+            self.db.after_commit(self.invalidate_takvim_cache)
+
+            silinen = result[0][0] if result else 0
+            logger.info(f"Oturma plan1 silindi ({len(sinav_ids)} s1nav, {silinen} oturma)")
+            return silinen
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Oturma plan1 silinirken hata: {e}")
-            return False
+            return None
 
     def check_koltuk_dolu(self, sinav_id: int, derslik_id: int,
                           satir_no: int, sutun_no: int) -> bool:
         """Koltuk dolu mu kontrol et"""
         try:
             query = """
-                SELECT COUNT(*)
+                SELECT COUNT(*) AS adet
                 FROM oturma_planlari
                 WHERE sinav_id = %s
                   AND derslik_id = %s
@@ -186,16 +192,13 @@ class OturmaModel:
                   AND sutun_no = %s
             """
 
-            cursor = self.db.execute_query(
+            row = self.db.execute_query(
                 query,
-                (sinav_id, derslik_id, satir_no, sutun_no)
+                (sinav_id, derslik_id, satir_no, sutun_no),
+                fetch_one=True
             )
 
-            if cursor:
-                count = cursor.fetchone()[0]
-                return count > 0
-
-            return False
+            return row['adet'] > 0
 
         except Exception as e:
             logger.error(f"Koltuk kontrol hatas1: {e}")
@@ -220,15 +223,11 @@ class OturmaModel:
                 WHERE s.sinav_id = %s
             """
 
-            cursor = self.db.execute_query(query_sinav, (sinav_id,))
-            if not cursor:
-                return False
-
-            row = cursor.fetchone()
+            row = self.db.execute_query(query_sinav, (sinav_id,), fetch_one=True)
             if not row:
                 return False
 
-            ders_id, ogrenci_sayisi = row
+            ders_id = row['ders_id']
 
             # S1nava atanan derslikleri al
             query_derslikler = """
@@ -240,20 +239,10 @@ class OturmaModel:
                 ORDER BY dr.kapasite
             """
 
-            cursor = self.db.execute_query(query_derslikler, (sinav_id,))
-            if not cursor:
+            derslikler = self.db.execute_query(query_derslikler, (sinav_id,))
+            if not derslikler:
                 return False
 
-            derslikler = []
-            for row in cursor.fetchall():
-                derslikler.append({
-                    'derslik_id': row[0],
-                    'satir_sayisi': row[1],
-                    'sutun_sayisi': row[2],
-                    'sira_yapisi': row[3],
-                    'kapasite': row[4]
-                })
-
             # Dersi alan rencileri al
             query_ogrenciler = """
                 SELECT dk.ogrenci_no
@@ -263,11 +252,8 @@ class OturmaModel:
                 ORDER BY dk.ogrenci_no
             """
 
-            cursor = self.db.execute_query(query_ogrenciler, (ders_id,))
-            if not cursor:
-                return False
-
-            ogrenciler = [row[0] for row in cursor.fetchall()]
+            ogrenciler = [row['ogrenci_no'] for row in
+                          self.db.execute_query(query_ogrenciler, (ders_id,))]
 
             # Oturma plan1 olu_tur
             ogrenci_index = 0
@@ -312,3 +298,109 @@ class OturmaModel:
         except Exception as e:
             logger.error(f"Otomatik oturma plan1 olu_turma hatas1: {e}")
             return False
+
+    @replica_read
+    def get_ogrenci_takvimi(self, program_id: int, ogrenci_no: str) -> List[Dict]:
+        """
+        rencinin program boyunca tm s1nav ve oturma yerlerini getir
+
+        Tek indeksli sorgu (idx_oturma_ogrenci_sinav) + process-ii LRU;
+        cache isabetinde veritaban1na gidilmez.
+
+        Args:
+            program_id: Program ID
+            ogrenci_no: renci numaras1
+
+        Returns:
+            Tarih/saat s1ral1 liste (tarih, saat, derslik, sat1r/stun)
+        """
+        try:
+            return list(read_through(
+                self._takvim_cache, self.db, (program_id, ogrenci_no),
+                lambda: self._load_ogrenci_takvimi(program_id, ogrenci_no)
+            ))
+        except Exception as e:
+            logger.error(f"renci takvimi getirilirken hata: {e}")
+            return []
+
+    def _load_ogrenci_takvimi(self, program_id: int, ogrenci_no: str) -> Tuple[Dict, ...]:
+        """Tek rencinin takvimini veritaban1ndan oku"""
+        query = self.TAKVIM_QUERY + """
+            WHERE op.ogrenci_no = %s AND s.program_id = %s
+            ORDER BY s.tarih, s.baslangic_saati
+        """
+        return tuple(self.db.execute_query(query, (ogrenci_no, program_id), prepared=True) or ())
+
+    @replica_read
+    def get_program_takvimleri(self, program_id: int, warm_cache: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Programdaki tm rencilerin takvimlerini tek sorguda getir
+
+        Args:
+            program_id: Program ID
+            warm_cache: Sonular1 renci bazl1 LRU'ya da yaz
+
+        Returns:
+            {ogrenci_no: [oturma, ...]}
+        """
+        try:
+            return {
+                ogrenci_no: list(satirlar)
+                for ogrenci_no, satirlar in self.iter_program_takvimleri(program_id, warm_cache)
+            }
+
+        except Exception as e:
+            logger.error(f"Program takvimleri getirilirken hata: {e}")
+            return {}
+
+    def iter_program_takvimleri(self, program_id: int,
+                                warm_cache: bool = False) -> Iterator[Tuple[str, Tuple[Dict, ...]]]:
+        """
+        Programdaki renci takvimlerini s1rayla ret (export iin)
+
+        Server-side cursor ile okunur; bellekte ayn1 anda sadece bir batch
+        ve bir rencinin sat1rlar1 tutulur.
+
+        Yields:
+            (ogrenci_no, (oturma, ...))
+        """
+        query = self.TAKVIM_QUERY + """
+            WHERE s.program_id = %s
+            ORDER BY op.ogrenci_no, s.tarih, s.baslangic_saati
+        """
+
+        for ogrenci_no, satirlar in groupby(self.db.stream(query, (program_id,)),
+                                            key=itemgetter('ogrenci_no')):
+            satirlar = tuple(satirlar)
+            if warm_cache:
+                warm(self._takvim_cache, self.db, (program_id, ogrenci_no), satirlar)
+            yield ogrenci_no, satirlar
+
+    def iter_oturma_by_program(self, program_id: int) -> Iterator[Dict]:
+        """Programdaki tm oturma planlar1n1 s1nav/derslik/s1ra dzeninde ret (export iin)"""
+        query = """
+            SELECT s.sinav_id, s.tarih, s.baslangic_saati,
+                   d.ders_kodu, d.ders_adi,
+                   dr.derslik_kodu, dr.derslik_adi,
+                   op.satir_no, op.sutun_no,
+                   op.ogrenci_no, o.ad_soyad
+            FROM oturma_planlari op
+            JOIN sinavlar s ON op.sinav_id = s.sinav_id
+            JOIN dersler d ON s.ders_id = d.ders_id
+            JOIN derslikler dr ON op.derslik_id = dr.derslik_id
+            JOIN ogrenciler o ON op.ogrenci_no = o.ogrenci_no
+            WHERE s.program_id = %s
+            ORDER BY s.tarih, s.baslangic_saati, d.ders_kodu,
+                     dr.derslik_kodu, op.satir_no, op.sutun_no
+        """
+        return self.db.stream(query, (program_id,))
+
+    @classmethod
+    def invalidate_takvim_cache(cls):
+        """
+        Oturma/s1nav/derslik dei_ikliklerinden sonra takvim cache'ini bo_alt
+
+        Yazan metotlar db.after_commit() ile a1r1r; dier istemcilerin
+        dei_iklikleri CacheConfig.SEAT_LOOKUP_TTL iinde grlr.
+        """
+        cls._takvim_cache.invalidate()
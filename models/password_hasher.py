@@ -0,0 +1,175 @@
+"""
+Password Hasher
+Bounded worker pool for bcrypt hashing and verification
+
+A bcrypt check at 12 rounds takes a few hundred milliseconds of CPU. Run
+on the GUI thread it freezes the window; run on an unbounded number of
+threads (a burst of logins, a bulk user import) it takes every core and
+starves the GUI anyway. Every bcrypt call goes through one small pool
+instead: at most AppConfig.BCRYPT_WORKERS hashes run at a time and at
+most BCRYPT_MAX_PENDING wait for a worker; further callers block until a
+slot frees up. bcrypt releases the GIL while hashing, so the GUI thread
+keeps running while workers are busy.
+
+The pool runs bcrypt only, never code that submits to it again, so a
+saturated pool cannot deadlock. Views run the surrounding database work
+on their own thread (views/components/background_task) and get the
+result back as a signal.
+"""
+
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import bcrypt
+
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+def _checkpw(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except Exception as e:  # malformed or placeholder hash
+        logger.error(f"Password verification error: {e}")
+        return False
+
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+class PasswordHasher:
+    """bcrypt on a fixed number of worker threads with a bounded queue"""
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 16):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.busy_seconds = 0.0
+
+    def configure(self, rounds: int = None, workers: int = None, max_pending: int = None):
+        """Change settings; only before the first hash starts the workers"""
+        with self._lock:
+            if self._executor is not None:
+                raise RuntimeError("password hasher already started")
+            if rounds is not None:
+                self.rounds = rounds
+            if workers is not None:
+                self.workers = max(1, workers)
+            if max_pending is not None:
+                self.max_pending = max(0, max_pending)
+            self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix='bcrypt')
+            return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        # Blocks the caller (not the workers) while the queue is full
+        slots = self._slots
+        slots.acquire()
+        try:
+            future = self._get_executor().submit(self._timed, fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def _timed(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.completed += 1
+                self.busy_seconds += elapsed
+
+    def submit_verify(self, password: str, hashed: str) -> Future:
+        """Future resolving to whether password matches hashed"""
+        return self._submit(_checkpw, password, hashed)
+
+    def submit_hash(self, password: str, rounds: int = None) -> Future:
+        """Future resolving to a new bcrypt hash of password"""
+        return self._submit(_hashpw, password, rounds or self.rounds)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """Blocking verify; call from a worker or script thread, not the GUI thread"""
+        return self.submit_verify(password, hashed).result()
+
+    def hash(self, password: str, rounds: int = None) -> str:
+        """Blocking hash; call from a worker or script thread, not the GUI thread"""
+        return self.submit_hash(password, rounds).result()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            completed, busy = self.completed, self.busy_seconds
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'completed': completed,
+            'avg_ms': round(busy / completed * 1000, 1) if completed else 0.0,
+        }
+
+
+def measure_rounds(rounds: int, samples: int = 3) -> float:
+    """Median milliseconds of one bcrypt verification at rounds on this machine"""
+    hashed = _hashpw('calibration', rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        _checkpw('calibration', hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, min_rounds: int = 10, max_rounds: int = 16,
+              samples: int = 3) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    Highest cost factor whose verification stays within target_ms
+
+    Each extra round doubles the cost, so measuring stops at the first
+    cost factor over the target. Returns (rounds, [(rounds, ms), ...]);
+    rounds is min_rounds when even that is over the target.
+    """
+    min_rounds = max(MIN_ROUNDS, min_rounds)
+    max_rounds = min(MAX_ROUNDS, max_rounds)
+    chosen = min_rounds
+    measured = []
+    for rounds in range(min_rounds, max_rounds + 1):
+        ms = measure_rounds(rounds, samples)
+        measured.append((rounds, ms))
+        if ms > target_ms:
+            break
+        chosen = rounds
+    return chosen, measured
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    rounds=AppConfig.BCRYPT_ROUNDS,
+    workers=AppConfig.BCRYPT_WORKERS,
+    max_pending=AppConfig.BCRYPT_MAX_PENDING
+)
@@ -0,0 +1,134 @@
+"""
+Query Pipeline
+Queue independent statements and run them in one round trip
+
+psycopg2 has no libpq pipeline mode, so queued statements are composed
+into a single statement: each one becomes a CTE and the final SELECT
+returns one column per statement (rows as JSON, or a row count). Postgres
+executes every CTE exactly once, in one network round trip.
+
+Rules that follow from running as one statement:
+- statements must be independent: all of them see the same snapshot, so
+  one cannot read another's writes
+- two statements must not modify the same row
+- a queued statement must not start with its own WITH clause
+- row values come back JSON-decoded (dates/times/decimals as strings/numbers)
+"""
+
+import re
+import time
+from typing import Any, List, Optional, Tuple
+
+from psycopg2 import extensions
+
+from .rows import record_class
+
+_RETURNING = re.compile(r'\bRETURNING\b', re.IGNORECASE)
+
+_PENDING = object()
+
+
+class PipelineResult:
+    """Result slot of a queued statement, filled when the pipeline flushes"""
+
+    __slots__ = ('_value',)
+
+    def __init__(self):
+        self._value = _PENDING
+
+    @property
+    def value(self) -> Any:
+        if self._value is _PENDING:
+            raise RuntimeError("pipeline has not been flushed yet")
+        return self._value
+
+
+class Pipeline:
+    """
+    Statements queued with query()/execute() and flushed together
+
+        with db.pipeline() as pipe:
+            sayi = pipe.execute(update_query, (sinav_id,))
+            pipe.execute(insert_query, (sinav_id, derslik_id))
+        sayi.value  # affected rows
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._items: List[Tuple[str, Optional[tuple], str, PipelineResult]] = []
+
+    def query(self, query: str, params: Tuple = None, fetch_one: bool = False) -> PipelineResult:
+        """Queue a row-returning statement (result: list of Records, or one/None)"""
+        return self._add(query, params, 'one' if fetch_one else 'all')
+
+    def execute(self, query: str, params: Tuple = None) -> PipelineResult:
+        """Queue INSERT/UPDATE/DELETE (result: affected rows)"""
+        return self._add(query, params, 'rowcount')
+
+    def _add(self, query: str, params: Optional[tuple], mode: str) -> PipelineResult:
+        result = PipelineResult()
+        self._items.append((query, params, mode, result))
+        return result
+
+    def __len__(self):
+        return len(self._items)
+
+    def flush(self) -> List[Any]:
+        """Send queued statements; returns their results in queue order"""
+        items, self._items = self._items, []
+        if not items:
+            return []
+
+        if len(items) == 1:
+            # Nothing to combine; run as-is and keep native types
+            query, params, mode, result = items[0]
+            if mode == 'rowcount':
+                result._value = self._db.execute_update(query, params)
+            else:
+                result._value = self._db.execute_query(query, params, fetch_one=(mode == 'one'))
+            return [result._value]
+
+        with self._db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                sql = self._compose(cursor, items)
+                started = time.perf_counter()
+                cursor.execute(sql)
+                values = cursor.fetchone()
+                elapsed = time.perf_counter() - started
+                rows = sum(value if isinstance(value, int) else len(value) for value in values)
+                self._db._observe(conn, sql, None, rows, elapsed)
+                if any(mode == 'rowcount' for _, _, mode, _ in items):
+                    self._db._mark_write()
+
+        for (_, _, mode, result), value in zip(items, values):
+            if mode == 'rowcount':
+                result._value = value
+            else:
+                rows = [_to_record(obj) for obj in value]
+                result._value = (rows[0] if rows else None) if mode == 'one' else rows
+
+        return [result._value for *_, result in items]
+
+    @staticmethod
+    def _compose(cursor, items) -> str:
+        ctes = []
+        columns = []
+        for index, (query, params, mode, _) in enumerate(items):
+            sql = cursor.mogrify(query, params).decode(extensions.encodings[cursor.connection.encoding])
+            sql = sql.strip().rstrip(';')
+            name = f"_p{index}"
+
+            if mode == 'rowcount':
+                if not _RETURNING.search(sql):
+                    sql += " RETURNING 1"
+                columns.append(f"(SELECT count(*) FROM {name})")
+            else:
+                columns.append(f"(SELECT COALESCE(json_agg({name}), '[]'::json) FROM {name})")
+
+            ctes.append(f"{name} AS (\n{sql}\n)")
+
+        return "WITH " + ",\n".join(ctes) + "\nSELECT " + ", ".join(columns)
+
+
+def _to_record(obj: dict):
+    return record_class(tuple(obj))(tuple(obj.values()))
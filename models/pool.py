@@ -0,0 +1,234 @@
+"""
+Blocking Connection Pool
+psycopg2 pool with checkout timeout, overflow, recycling and wait metrics
+"""
+
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import psycopg2
+from psycopg2 import extensions, pool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(pool.PoolError):
+    """No connection became available within the checkout timeout"""
+
+
+class PooledConnection(extensions.connection):
+    """psycopg2 connection that remembers its age, last checkout and prepared statements"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # SQL text -> (statement name, parameter count); server-side statements
+        # die with the session, so a recycled connection starts empty
+        self.prepared: "OrderedDict[str, tuple]" = OrderedDict()
+        self.prepared_seq = 0
+        # Seconds the last checkout waited; charged to its first statement
+        self.last_wait = 0.0
+        # user_id whose RLS context (set_app_context) is active in this session
+        self.app_user = None
+
+
+class BlockingConnectionPool:
+    """
+    Thread-safe pool that waits for a free connection instead of failing
+
+    - pool_size connections are kept; up to max_overflow extra ones are
+      opened under bursts and closed again when returned
+    - getconn() blocks up to timeout seconds, then raises PoolTimeoutError
+    - connections older than recycle seconds are replaced on checkout/return
+    - checkout validation is a local status check; a SELECT 1 ping is only
+      sent when the connection sat idle longer than ping_after seconds
+    """
+
+    def __init__(self, pool_size: int = 10, max_overflow: int = 0,
+                 timeout: float = 30, recycle: float = 3600,
+                 ping_after: float = 30, minconn: int = 1, **connect_kwargs):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        self._idle: List[PooledConnection] = []
+        self._in_use = set()
+        self._opened = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Metrics
+        self._checkouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._overflow_events = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._invalidated = 0
+
+        for _ in range(min(minconn, pool_size)):
+            self._idle.append(self._connect())
+            self._opened += 1
+
+    def _connect(self) -> PooledConnection:
+        return psycopg2.connect(connection_factory=PooledConnection, **self._connect_kwargs)
+
+    def getconn(self, timeout: float = None) -> PooledConnection:
+        """Check out a connection, waiting up to timeout seconds"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        conn = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise pool.PoolError("connection pool is closed")
+
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+
+                if self._opened < self.pool_size + self.max_overflow:
+                    if self._opened >= self.pool_size:
+                        self._overflow_events += 1
+                    self._opened += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"no connection available within {timeout}s "
+                        f"(in use: {len(self._in_use)}, limit: {self.pool_size + self.max_overflow})"
+                    )
+
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            conn = self._checkout(conn)
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        conn.last_wait = waited
+        with self._cond:
+            self._in_use.add(conn)
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+        return conn
+
+    def _checkout(self, conn: Optional[PooledConnection]) -> PooledConnection:
+        """Open a fresh connection or make sure a pooled one is usable"""
+        if conn is None:
+            return self._connect()
+
+        now = time.monotonic()
+
+        if now - conn.created_at > self.recycle:
+            with self._cond:
+                self._recycled += 1
+            self._discard(conn)
+            return self._connect()
+
+        if not self._is_usable(conn, ping=now - conn.last_used > self.ping_after):
+            with self._cond:
+                self._invalidated += 1
+            self._discard(conn)
+            return self._connect()
+
+        return conn
+
+    @staticmethod
+    def _is_usable(conn: PooledConnection, ping: bool) -> bool:
+        if conn.closed or conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+
+        if ping:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+
+        return True
+
+    @staticmethod
+    def _discard(conn: PooledConnection):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def putconn(self, conn: PooledConnection, close: bool = False):
+        """Return a connection; broken, expired and overflow ones are closed"""
+        if not close and not conn.closed:
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        with self._cond:
+            self._in_use.discard(conn)
+
+            expired = time.monotonic() - conn.created_at > self.recycle
+            if (close or conn.closed or expired or self._closed
+                    or self._opened > self.pool_size):
+                if expired:
+                    self._recycled += 1
+                self._discard(conn)
+                self._opened -= 1
+            else:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+
+            self._cond.notify()
+
+    def closeall(self):
+        """Close idle connections; checked-out ones are closed when returned"""
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                self._discard(conn)
+            self._opened -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters: wait times, usage and overflow events"""
+        with self._cond:
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'opened': self._opened,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'total_wait_ms': round(self._total_wait * 1000, 3),
+                'avg_wait_ms': round(self._total_wait * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+                'overflow_events': self._overflow_events,
+                'timeouts': self._timeouts,
+                'recycled': self._recycled,
+                'invalidated': self._invalidated
+            }
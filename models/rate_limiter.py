@@ -0,0 +1,216 @@
+"""
+Rate Limiter
+Token buckets that turn away login bursts before any database or bcrypt work
+
+A bucket holds up to `burst` tokens and refills at `rate` tokens per
+second; every attempt takes one, and an attempt finding the bucket empty
+is rejected with the seconds until the next token. LoginController keeps
+one bucket per email (guessing one account's password) and one per IP
+address (spraying many accounts from one client).
+
+LocalBucket keeps the buckets in process memory. With CacheConfig.BACKEND
+'redis' the buckets live in Redis, so the limit holds across every client
+of the same database; a Redis error lets the attempt through (the
+database lockout still applies) and is logged once per outage, as in
+models/cache.py.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+
+from cachetools import TTLCache
+
+from config import AppConfig, CacheConfig
+
+try:
+    import redis
+except ImportError:  # Redis backend is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_REDIS_ERRORS = redis.RedisError if redis is not None else ()
+
+# KEYS[1] bucket; ARGV rate, burst. Uses the Redis clock so every client
+# refills the same bucket at the same pace. Returns {allowed, retry_after_ms}
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_ms = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, retry_ms}
+"""
+
+
+class LocalBucket:
+    """In-process token buckets keyed by any hashable value"""
+
+    backend = 'local'
+
+    def __init__(self, rate: float, burst: int, maxsize: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        # An entry untouched for burst/rate seconds is full again, so expiry
+        # is the same as a fresh bucket and bounds memory under a spray
+        self._buckets = TTLCache(maxsize=maxsize, ttl=burst / rate)
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def take(self, key: Hashable) -> float:
+        """Take a token; 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - ts) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                self.allowed += 1
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+
+    def reset(self, key: Hashable):
+        """Refill key's bucket (after a successful login)"""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'backend': self.backend, 'allowed': self.allowed,
+                    'rejected': self.rejected, 'keys': len(self._buckets)}
+
+
+class RedisBucket:
+    """LocalBucket interface on Redis hashes under "<prefix>:<name>:<key>" """
+
+    backend = 'redis'
+
+    def __init__(self, name: str, rate: float, burst: int, client=None,
+                 prefix: str = 'sinav_takvimi:rate'):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("Redis rate limiter backend requires the redis package")
+            client = redis.Redis(
+                host=CacheConfig.REDIS_HOST,
+                port=CacheConfig.REDIS_PORT,
+                db=CacheConfig.REDIS_DB,
+                password=CacheConfig.REDIS_PASSWORD,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        self.rate = rate
+        self.burst = burst
+        self._client = client
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._prefix = f"{prefix}:{name}:"
+        self._lock = threading.Lock()
+        self._failing = False
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def _error(self, error: Exception):
+        with self._lock:
+            self.errors += 1
+            first = not self._failing
+            self._failing = True
+        if first:
+            logger.warning(f"Redis rate limiter unavailable, not limiting: {error}")
+
+    def take(self, key: Hashable) -> float:
+        try:
+            allowed, retry_ms = self._take(keys=[self._prefix + str(key)], args=[self.rate, self.burst])
+        except _REDIS_ERRORS as e:
+            self._error(e)
+            return 0.0
+        if self._failing:
+            self._failing = False
+            logger.info("Redis rate limiter reachable again")
+
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+        return 0.0 if allowed else int(retry_ms) / 1000
+
+    def reset(self, key: Hashable):
+        try:
+            self._client.delete(self._prefix + str(key))
+        except _REDIS_ERRORS as e:
+            self._error(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'backend': self.backend, 'allowed': self.allowed,
+                    'rejected': self.rejected, 'errors': self.errors}
+
+
+def make_bucket(name: str, rate: float, burst: int):
+    """Bucket set backed as configured in CacheConfig.BACKEND"""
+    if CacheConfig.BACKEND == 'redis' and redis is not None:
+        return RedisBucket(name, rate, burst)
+    return LocalBucket(rate, burst)
+
+
+class LoginRateLimiter:
+    """Per-email and per-IP buckets checked before a login touches the database"""
+
+    def __init__(self, enabled: bool = True,
+                 email_per_minute: float = 5, email_burst: int = 5,
+                 ip_per_minute: float = 30, ip_burst: int = 30):
+        self.enabled = enabled
+        self.email = make_bucket('email', email_per_minute / 60, email_burst)
+        self.ip = make_bucket('ip', ip_per_minute / 60, ip_burst)
+
+    def check(self, email: str, ip_address: Optional[str] = None) -> int:
+        """
+        Take one token from each bucket; 0 when allowed, else seconds to wait
+
+        The IP bucket is checked first so a spraying client does not drain
+        the email buckets of the accounts it targets.
+        """
+        if not self.enabled:
+            return 0
+        if ip_address:
+            wait = self.ip.take(ip_address)
+            if wait:
+                return math.ceil(wait)
+        return math.ceil(self.email.take(email))
+
+    def success(self, email: str):
+        """A correct password refills the account's bucket"""
+        if self.enabled:
+            self.email.reset(email)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'enabled': self.enabled, 'email': self.email.stats(), 'ip': self.ip.stats()}
+
+
+# Global login rate limiter instance
+login_limiter = LoginRateLimiter(
+    enabled=AppConfig.LOGIN_RATE_LIMIT,
+    email_per_minute=AppConfig.LOGIN_RATE_EMAIL_PER_MINUTE,
+    email_burst=AppConfig.LOGIN_RATE_EMAIL_BURST,
+    ip_per_minute=AppConfig.LOGIN_RATE_IP_PER_MINUTE,
+    ip_burst=AppConfig.LOGIN_RATE_IP_BURST
+)
@@ -0,0 +1,173 @@
+"""
+Read Replicas
+Replica pools for read-only model calls, with read-your-writes stickiness
+and lag-based fallback to the primary
+
+Reads are routed only where the caller opted in (db.replica_reads() or the
+@replica_read model decorator) and never inside db.transaction(). A replica
+is skipped, and the read goes to the primary, when:
+- a write was made through this process within sticky_seconds (the
+  desktop app is a single user session, so stickiness is process-wide)
+- its measured replay lag is above max_lag (re-checked every check_interval)
+- it is unreachable or its pool has no free connection
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import pool
+
+from .pool import BlockingConnectionPool, PooledConnection
+
+logger = logging.getLogger(__name__)
+
+# Seconds behind the primary; 0 when the replica has replayed everything it
+# received (an idle primary would otherwise look like a growing lag) and on
+# a server that is not in recovery at all
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class Replica:
+    """One replica pool and its last health check"""
+
+    __slots__ = ('name', 'pool', 'lag', 'checked_at', 'available', 'reads')
+
+    def __init__(self, name: str, replica_pool: BlockingConnectionPool):
+        self.name = name
+        self.pool = replica_pool
+        self.lag = 0.0
+        self.checked_at = float('-inf')
+        self.available = True
+        self.reads = 0
+
+
+class ReplicaSet:
+    """Round-robin replica selection with stickiness and lag checks"""
+
+    def __init__(self, replicas: List[Dict[str, Any]], max_lag: float, sticky_seconds: float,
+                 check_interval: float, **pool_kwargs):
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_write = float('-inf')
+        self._fallbacks = 0
+        self._sticky_reads = 0
+
+        self._replicas = []
+        for replica in replicas:
+            replica_pool = BlockingConnectionPool(
+                minconn=0,      # a replica that is down must not stop start-up
+                host=replica['host'],
+                port=replica['port'],
+                # Replicas refuse writes anyway; this also protects plain
+                # (non-replicated) read copies used for testing
+                options='-c default_transaction_read_only=on',
+                connect_timeout=replica.get('connect_timeout', 3),
+                **pool_kwargs
+            )
+            self._replicas.append(Replica(f"{replica['host']}:{replica['port']}", replica_pool))
+
+        self._next = itertools.cycle(self._replicas)
+
+    def __len__(self):
+        return len(self._replicas)
+
+    def mark_write(self):
+        """A write went to the primary: read from it for the next sticky_seconds"""
+        self._last_write = time.monotonic()
+
+    def checkout(self) -> Optional[Tuple[Replica, PooledConnection]]:
+        """Connection of a usable replica, or None to use the primary"""
+        now = time.monotonic()
+        if now - self._last_write < self.sticky_seconds:
+            with self._lock:
+                self._sticky_reads += 1
+            return None
+
+        for _ in range(len(self._replicas)):
+            with self._lock:
+                replica = next(self._next)
+
+            due = now - replica.checked_at >= self.check_interval
+            if not replica.available and not due:
+                continue
+
+            try:
+                # No waiting: a busy replica pool sends the read to the primary
+                conn = replica.pool.getconn(timeout=0)
+            except (psycopg2.Error, pool.PoolError) as e:
+                self._mark_unavailable(replica, now, f"checkout failed: {e}")
+                continue
+
+            if due:
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute(LAG_QUERY)
+                        replica.lag = float(cursor.fetchone()[0])
+                    conn.rollback()
+                except psycopg2.Error as e:
+                    replica.pool.putconn(conn, close=True)
+                    self._mark_unavailable(replica, now, f"lag check failed: {e}")
+                    continue
+
+                replica.checked_at = now
+                if replica.lag > self.max_lag:
+                    replica.pool.putconn(conn)
+                    self._mark_unavailable(replica, now, f"lag {replica.lag:.1f}s > {self.max_lag}s")
+                    continue
+                if not replica.available:
+                    logger.info(f"Replica {replica.name} back in rotation (lag {replica.lag:.1f}s)")
+                replica.available = True
+
+            with self._lock:
+                replica.reads += 1
+            return replica, conn
+
+        with self._lock:
+            self._fallbacks += 1
+        return None
+
+    def release(self, replica: Replica, conn: PooledConnection, broken: bool):
+        """Return a replica connection; a broken one takes the replica out until the next check"""
+        replica.pool.putconn(conn, close=broken)
+        if broken:
+            self._mark_unavailable(replica, time.monotonic(), "connection broken")
+
+    def _mark_unavailable(self, replica: Replica, now: float, reason: str):
+        if replica.available:
+            logger.warning(f"Replica {replica.name} skipped, reading from primary: {reason}")
+        replica.available = False
+        replica.checked_at = now
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-replica reads, lag and pool counters plus fallback counts"""
+        with self._lock:
+            return {
+                'fallbacks': self._fallbacks,
+                'sticky_reads': self._sticky_reads,
+                'replicas': [
+                    {
+                        'name': replica.name,
+                        'available': replica.available,
+                        'lag_s': round(replica.lag, 3),
+                        'reads': replica.reads,
+                        **replica.pool.stats()
+                    }
+                    for replica in self._replicas
+                ]
+            }
+
+    def closeall(self):
+        for replica in self._replicas:
+            replica.pool.closeall()
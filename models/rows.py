@@ -0,0 +1,197 @@
+"""
+Row Factory
+Compact query rows: one __slots__ record class per column shape, plus a
+columnar (NumPy) mode for bulk consumers
+"""
+
+import keyword
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from psycopg2 import extensions
+
+try:
+    import numpy as np
+except ImportError:  # columnar mode is optional
+    np = None
+
+
+class Record(Mapping):
+    """
+    Dict-compatible row without a per-row dict
+
+    Supports row['col'], row.get('col'), 'col' in row, keys()/items(),
+    dict(row), **row and comparison with dicts; clean column names are
+    also attributes (row.ders_adi). Values of existing columns can be
+    reassigned, but new keys cannot be added - use dict(row) for that.
+    """
+
+    __slots__ = ()
+
+    _fields: Tuple[str, ...] = ()   # query columns, in order
+    _keys: Tuple[str, ...] = ()     # unique column names (mapping keys)
+    _attrs: Dict[str, str] = {}     # column name -> slot
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._attrs[key])
+        except KeyError:
+            if isinstance(key, int):
+                return getattr(self, self.__slots__[key])
+            raise
+
+    def __setitem__(self, key, value):
+        if key not in self._attrs:
+            raise KeyError(f"{key!r} is not a column of this row; use dict(row) to extend it")
+        setattr(self, self._attrs[key], value)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._attrs
+
+    def __repr__(self):
+        return 'Record(' + ', '.join(f"{k}={self[k]!r}" for k in self._keys) + ')'
+
+    def __reduce__(self):
+        # Generated classes are not importable; rebuild from the column shape
+        return _rebuild, (self._fields, self.values_tuple())
+
+    def values_tuple(self) -> tuple:
+        """All column values in query order"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def copy(self) -> 'Record':
+        """Shallow copy (same column shape)"""
+        return type(self)(self.values_tuple())
+
+
+def _slot_name(index: int, column: str) -> str:
+    if (column.isidentifier() and not keyword.iskeyword(column)
+            and not column.startswith('_') and not hasattr(Record, column)):
+        return column
+    return f"_c{index}"
+
+
+@lru_cache(maxsize=1024)
+def record_class(fields: Tuple[str, ...]) -> type:
+    """Record subclass for one column shape (generated once, then cached)"""
+    slots = []
+    for index, column in enumerate(fields):
+        name = _slot_name(index, column)
+        if name in slots:  # duplicate column names (e.g. two "id"s in a join)
+            name = f"_c{index}"
+        slots.append(name)
+
+    if slots:
+        targets = ', '.join(f"self.{name}" for name in slots)
+        source = f"def __init__(self, row):\n    {targets}, = row\n"
+    else:
+        source = "def __init__(self, row):\n    pass\n"
+
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+
+    attrs = {}
+    for column, name in zip(fields, slots):
+        attrs.setdefault(column, name)
+
+    return type('Record', (Record,), {
+        '__slots__': tuple(slots),
+        '__init__': namespace['__init__'],
+        '_fields': fields,
+        '_keys': tuple(attrs),
+        '_attrs': attrs,
+    })
+
+
+def _rebuild(fields: Tuple[str, ...], values: tuple) -> Record:
+    return record_class(fields)(values)
+
+
+class RecordCursor(extensions.cursor):
+    """psycopg2 cursor returning Record rows (class resolved once per result)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._record = None
+
+    def execute(self, query, vars=None):
+        self._record = None
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars):
+        self._record = None
+        return super().executemany(query, vars)
+
+    def callproc(self, procname, vars=None):
+        self._record = None
+        return super().callproc(procname, vars)
+
+    def _record_class(self) -> type:
+        if self._record is None:
+            self._record = record_class(tuple(d.name for d in self.description))
+        return self._record
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is None:
+            return None
+        return self._record_class()(row)
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        make = self._record_class()
+        return [make(row) for row in rows]
+
+    def fetchall(self):
+        rows = super().fetchall()
+        make = self._record_class()
+        return [make(row) for row in rows]
+
+    def __iter__(self):
+        it = super().__iter__()
+        try:
+            row = next(it)
+        except StopIteration:
+            return
+        make = self._record_class()
+        yield make(row)
+        for row in it:
+            yield make(row)
+
+
+def to_columns(fields: Sequence[str], batches: Iterable[List[tuple]]) -> Dict[str, Any]:
+    """
+    Build one NumPy array per column from batches of tuple rows
+
+    Numeric/boolean columns without NULLs get native dtypes; text, dates,
+    Decimals and NULL-containing columns stay object arrays.
+    """
+    if np is None:
+        raise RuntimeError("columnar mode requires numpy")
+
+    parts: List[List[Any]] = [[] for _ in fields]
+    for batch in batches:
+        if not batch:
+            continue
+        for index, values in enumerate(zip(*batch)):
+            parts[index].append(_column_array(values))
+
+    return {
+        field: (np.concatenate(chunks) if len(chunks) > 1 else chunks[0]) if chunks
+        else np.empty(0, dtype=object)
+        for field, chunks in zip(fields, parts)
+    }
+
+
+def _column_array(values: tuple):
+    array = np.asarray(values)
+    if array.ndim == 1 and array.dtype.kind in 'biuf':
+        return array
+    return np.fromiter(values, dtype=object, count=len(values))
@@ -0,0 +1,132 @@
+"""
+Session Cache
+In-process cache of validated sessions and coalesced last_activity writes
+
+Session validation runs on every guarded action, but the answer changes
+only on login, logout, expiry or account deactivation. Valid sessions are
+kept for AppConfig.SESSION_CACHE_TTL seconds (capped at the session
+timeout); unknown or expired ids are not cached and hit the
+database every time. logout (UserModel.delete_session) and account edits
+drop entries immediately. A session deleted by another client may still
+validate here until its entry expires.
+
+last_activity is only read at minute granularity (idle-session cleanup),
+so touches are collected in a set and written by a daemon thread every
+SESSION_ACTIVITY_FLUSH seconds as one UPDATE ... WHERE session_id = ANY.
+The timestamp written is the flush time, at most one interval late.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from config import AppConfig, CacheConfig
+
+from .cache import LocalCache, NullCache
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+_TOUCH = """
+    UPDATE active_sessions
+    SET last_activity = CURRENT_TIMESTAMP
+    WHERE session_id = ANY(%s)
+"""
+
+
+class SessionCache:
+    """Valid-session lookups with a TTL plus a batched activity writer"""
+
+    def __init__(self, ttl: float = 60, flush_interval: float = 30, maxsize: int = 1024):
+        self._sessions = LocalCache(maxsize=maxsize, ttl=ttl) if CacheConfig.ENABLED else NullCache()
+        self.flush_interval = flush_interval
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.touches = 0
+        self.flushes = 0
+        self.rows_written = 0
+
+    def get(self, session_id: str, loader: Callable[[], Optional[Dict[str, Any]]]):
+        """Cached session row, or loader() (cached only when a session is found)"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = loader()
+            if session is not None:
+                self._sessions.set(session_id, session)
+        return session
+
+    def invalidate(self, session_id: str = None):
+        """Drop one session (logout), or every cached session when None"""
+        self._sessions.invalidate(session_id)
+        if session_id is not None:
+            with self._lock:
+                self._pending.discard(session_id)
+
+    def touch(self, session_id: str):
+        """Record activity; written by the next flush"""
+        with self._lock:
+            self._pending.add(session_id)
+            self.touches += 1
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+    def flush(self) -> int:
+        """Write pending touches in one UPDATE; returns updated rows"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            session_ids, self._pending = list(self._pending), set()
+
+        try:
+            rows = db.execute_update(_TOUCH, (session_ids,))
+        except Exception as e:
+            # Put them back; the next flush retries
+            with self._lock:
+                self._pending.update(session_ids)
+            logger.warning(f"Session activity flush failed ({len(session_ids)} sessions): {e}")
+            return 0
+
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += rows
+        return rows
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='session-activity', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the flusher and write what is pending (call before db.close_all)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'sessions': self._sessions.stats(),
+            'touches': self.touches,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'pending': pending,
+        }
+
+
+# Global session cache instance (flushed on shutdown from main.py)
+session_cache = SessionCache(
+    ttl=min(AppConfig.SESSION_CACHE_TTL, AppConfig.SESSION_TIMEOUT),
+    flush_interval=AppConfig.SESSION_ACTIVITY_FLUSH
+)
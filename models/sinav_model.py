@@ -8,6 +8,9 @@ from typing import List, Dict, Optional, Tuple
 from datetime import datetime, date, time, timedelta
 import logging
 
+from .database import replica_read
+from .oturma_model import OturmaModel
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,24 +34,21 @@ class SinavModel:
                 RETURNING program_id
             """
 
-            cursor = self.db.execute_query(
+            row = self.db.execute_query(
                 query,
                 (bolum_id, program_adi, sinav_tipi, baslangic_tarihi, bitis_tarihi,
-                 varsayilan_sinav_suresi, bekleme_suresi)
+                 varsayilan_sinav_suresi, bekleme_suresi),
+                fetch_one=True
             )
 
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    program_id = row[0]
-                    self.db.commit()
-                    logger.info(f"Yeni s1nav program1 olu_turuldu: {program_adi} (ID: {program_id})")
-                    return program_id
+            if row:
+                program_id = row['program_id']
+                logger.info(f"Yeni s1nav program1 olu_turuldu: {program_adi} (ID: {program_id})")
+                return program_id
 
             return None
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"S1nav program1 olu_turulurken hata: {e}")
             return None
 
@@ -63,28 +63,24 @@ class SinavModel:
                 RETURNING sinav_id
             """
 
-            cursor = self.db.execute_query(
+            row = self.db.execute_query(
                 query,
-                (program_id, ders_id, tarih, baslangic_saati, bitis_saati)
+                (program_id, ders_id, tarih, baslangic_saati, bitis_saati),
+                fetch_one=True
             )
 
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    sinav_id = row[0]
-                    self.db.commit()
-                    logger.info(f"Yeni s1nav olu_turuldu (ID: {sinav_id})")
-                    return sinav_id
+            if row:
+                logger.info(f"Yeni s1nav olu_turuldu (ID: {row['sinav_id']})")
+                return row['sinav_id']
 
             return None
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"S1nav olu_turulurken hata: {e}")
             return None
 
-    def assign_derslik_to_sinav(self, sinav_id: int, derslik_id: int) -> bool:
-        """S1nava derslik ata"""
+    def assign_derslik_to_sinav(self, sinav_id: int, derslik_id: int, pipe=None) -> bool:
+        """S1nava derslik ata (pipe verilirse db.pipeline() kuyruuna eklenir)"""
         try:
             query = """
                 INSERT INTO sinav_derslikleri (sinav_id, derslik_id)
@@ -92,19 +88,18 @@ class SinavModel:
                 ON CONFLICT (sinav_id, derslik_id) DO NOTHING
             """
 
-            cursor = self.db.execute_query(query, (sinav_id, derslik_id))
-
-            if cursor:
-                self.db.commit()
+            if pipe is not None:
+                pipe.execute(query, (sinav_id, derslik_id))
                 return True
 
-            return False
+            self.db.execute_update(query, (sinav_id, derslik_id))
+            return True
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Derslik atamas1 hatas1: {e}")
             return False
 
+    @replica_read
     def get_program_by_id(self, program_id: int) -> Optional[Dict]:
         """Program bilgilerini getir"""
         try:
@@ -117,20 +112,13 @@ class SinavModel:
                 WHERE p.program_id = %s
             """
 
-            cursor = self.db.execute_query(query, (program_id,))
-
-            if cursor:
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            return self.db.execute_query(query, (program_id,), fetch_one=True)
 
         except Exception as e:
             logger.error(f"Program getirilirken hata: {e}")
             return None
 
+    @replica_read
     def get_sinavlar_by_program(self, program_id: int) -> List[Dict]:
         """Programa ait s1navlar1 getir"""
         try:
@@ -144,21 +132,13 @@ class SinavModel:
                 ORDER BY s.tarih, s.baslangic_saati
             """
 
-            cursor = self.db.execute_query(query, (program_id,))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, (program_id,))
 
         except Exception as e:
             logger.error(f"S1navlar getirilirken hata: {e}")
             return []
 
+    @replica_read
     def get_sinav_with_derslikler(self, sinav_id: int) -> Optional[Dict]:
         """S1nav ve derslik bilgilerini getir"""
         try:
@@ -172,17 +152,12 @@ class SinavModel:
                 WHERE s.sinav_id = %s
             """
 
-            cursor = self.db.execute_query(query_sinav, (sinav_id,))
-
-            if not cursor:
-                return None
-
-            row = cursor.fetchone()
+            row = self.db.execute_query(query_sinav, (sinav_id,), fetch_one=True)
             if not row:
                 return None
 
-            columns = [desc[0] for desc in cursor.description]
-            sinav = dict(zip(columns, row))
+            # Record sabit kolonlu; ek alanlar için dict'e çevir
+            sinav = dict(row)
 
             # S1nava atanan derslikleri al
             query_derslikler = """
@@ -193,15 +168,7 @@ class SinavModel:
                 WHERE sd.sinav_id = %s
             """
 
-            cursor = self.db.execute_query(query_derslikler, (sinav_id,))
-
-            derslikler = []
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                for row in cursor.fetchall():
-                    derslikler.append(dict(zip(columns, row)))
-
-            sinav['derslikler'] = derslikler
+            sinav['derslikler'] = self.db.execute_query(query_derslikler, (sinav_id,))
 
             return sinav
 
@@ -215,7 +182,7 @@ class SinavModel:
         """�rencinin ba_ka bir s1nav1 ile �ak1_ma var m1 kontrol et"""
         try:
             query = """
-                SELECT COUNT(*)
+                SELECT COUNT(*) AS adet
                 FROM sinavlar s
                 JOIN ders_kayitlari dk ON s.ders_id = dk.ders_id
                 WHERE s.program_id = %s
@@ -228,23 +195,21 @@ class SinavModel:
                   )
             """
 
-            cursor = self.db.execute_query(
+            row = self.db.execute_query(
                 query,
                 (program_id, ogrenci_no, tarih, baslangic_saati,
                  baslangic_saati, bitis_saati, bitis_saati,
-                 baslangic_saati, bitis_saati)
+                 baslangic_saati, bitis_saati),
+                fetch_one=True
             )
 
-            if cursor:
-                count = cursor.fetchone()[0]
-                return count > 0
-
-            return False
+            return row['adet'] > 0
 
         except Exception as e:
             logger.error(f"�ak1_ma kontrol� hatas1: {e}")
             return True  # Hata durumunda �ak1_ma var say
 
+    @replica_read
     def get_programs_by_bolum(self, bolum_id: int) -> List[Dict]:
         """B�l�me ait programlar1 getir"""
         try:
@@ -256,41 +221,48 @@ class SinavModel:
                 ORDER BY baslangic_tarihi DESC
             """
 
-            cursor = self.db.execute_query(query, (bolum_id,))
-
-            if cursor:
-                columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-
-            return []
+            return self.db.execute_query(query, (bolum_id,))
 
         except Exception as e:
             logger.error(f"Programlar getirilirken hata: {e}")
             return []
 
     def delete_program(self, program_id: int) -> bool:
-        """Program1 sil (cascade ile t�m s1navlar da silinir)"""
-        try:
-            query = "DELETE FROM sinav_programi WHERE program_id = %s"
+        """Program1 sil (s1navlar, derslik atamalar1 ve oturma planlar1 ile birlikte)"""
+        silinen = self.purge_program(program_id, keep_program=False)
+        return silinen is not None and silinen >= 0
 
-            cursor = self.db.execute_query(query, (program_id,))
+    def purge_program(self, program_id: int, keep_program: bool = True) -> Optional[int]:
+        """
+        Program1n oturma planlar1n1, derslik atamalar1n1 ve s1navlar1n1 toplu sil
 
-            if cursor and cursor.rowcount > 0:
-                self.db.commit()
-                logger.info(f"Program silindi (ID: {program_id})")
-                return True
+        Tek transaction, set-wise DELETE; sat1r ba_1na sayaç trigger'1 çal1_maz.
+        Yeniden olu_turmadan önce eski sürümü temizlemek için kullan1l1r.
 
-            return False
+        Args:
+            program_id: Program ID
+            keep_program: True ise sinav_programi kayd1 silinmez
+
+        Returns:
+            Silinen oturma say1s1; program bulunamazsa -1, hata durumunda None
+        """
+        try:
+            result = self.db.execute_procedure('purge_program', [program_id, keep_program])
+            silinen = result[0][0] if result else None
+            if silinen is None:
+                logger.warning(f"Temizlenecek program bulunamad1 (ID: {program_id})")
+                return -1
+
+            self.db.after_commit(OturmaModel.invalidate_takvim_cache)
+            logger.info(f"Program temizlendi (ID: {program_id}, {silinen} oturma, "
+                        f"program {'korundu' if keep_program else 'silindi'})")
+            return silinen
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Program silinirken hata: {e}")
-            return False
+            return None
 
-    def update_ogrenci_sayisi(self, sinav_id: int) -> bool:
+    def update_ogrenci_sayisi(self, sinav_id: int, pipe=None) -> bool:
         """S1nav �renci say1s1n1 g�ncelle"""
         try:
             query = """
@@ -305,15 +277,13 @@ class SinavModel:
                 WHERE sinav_id = %s
             """
 
-            cursor = self.db.execute_query(query, (sinav_id,))
-
-            if cursor:
-                self.db.commit()
+            if pipe is not None:
+                # Sonuç pipeline flush edilince PipelineResult'ta
+                pipe.execute(query, (sinav_id,))
                 return True
 
-            return False
+            return self.db.execute_update(query, (sinav_id,)) > 0
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"�renci say1s1 g�ncellenirken hata: {e}")
             return False
@@ -5,10 +5,14 @@ Real authentication with security logging
 
 from typing import Optional, Dict, Any
 from datetime import datetime
-import bcrypt
 import logging
 
+from psycopg2.extras import Json
+
 from .database import db
+from .password_hasher import password_hasher
+from .session_cache import session_cache
+from .write_behind import audit_log, login_attempt_log
 
 logger = logging.getLogger(__name__)
 
@@ -40,132 +44,104 @@ class UserModel:
         return db.execute_query(query, (email,), fetch_one=True)
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
-        try:
-            return bcrypt.checkpw(
-                plain_password.encode('utf-8'),
-                hashed_password.encode('utf-8')
-            )
-        except Exception as e:
-            logger.error(f"Password verification error: {e}")
-            return False
-
-    @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash password with bcrypt"""
-        salt = bcrypt.gensalt(rounds=12)
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    def auth_begin(email: str, ip_address: str = None,
+                   user_agent: str = None) -> Dict[str, Any]:
+        """
+        Login step 1: user, password hash and account state in one call
 
-    @staticmethod
-    def update_password(user_id: int, new_password_hash: str):
-        """Update user password"""
-        query = """
-            UPDATE users 
-            SET password_hash = %s
-            WHERE user_id = %s
+        Returns the auth_begin() row; 'durum' is 'ok', 'user_not_found',
+        'account_inactive' or 'account_locked' (with 'kalan_dakika'). Non-ok
+        attempts are logged (queued on login_attempt_log when write-behind is on).
         """
-        db.execute_update(query, (new_password_hash, user_id))
+        queued = login_attempt_log.enabled
+        user = db.execute_query(
+            "SELECT * FROM auth_begin(%s, %s, %s, %s)",
+            (email, ip_address, user_agent, not queued),
+            fetch_one=True, write=True
+        )
+        if queued and user['durum'] != 'ok':
+            UserModel._queue_login_attempt(email, user['user_id'], False, user['durum'],
+                                           ip_address, user_agent)
+        return user
 
     @staticmethod
-    def update_last_login(user_id: int):
-        """Update last login timestamp"""
-        query = """
-            UPDATE users 
-            SET son_giris = CURRENT_TIMESTAMP
-            WHERE user_id = %s
+    def auth_complete(user_id: int, email: str, success: bool, session_id: str = None,
+                      ip_address: str = None, user_agent: str = None,
+                      session_minutes: int = 480, max_attempts: int = 5,
+                      lock_minutes: int = 15) -> Dict[str, Any]:
         """
-        db.execute_update(query, (user_id,))
+        Login step 2: record the password check result in one call
 
-    @staticmethod
-    def reset_failed_attempts(user_id: int):
-        """Reset failed login attempts counter"""
-        query = """
-            UPDATE users 
-            SET failed_login_attempts = 0,
-                account_locked_until = NULL
-            WHERE user_id = %s
+        Success resets the failed counter/lock, sets son_giris and creates
+        the session; failure increments the counter and locks the account
+        at max_attempts. Returns {'failed_attempts', 'locked'}. The counters
+        are written here synchronously; only the login_attempts row is queued.
         """
-        db.execute_update(query, (user_id,))
+        queued = login_attempt_log.enabled
+        result = db.execute_query(
+            "SELECT * FROM auth_complete(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            (user_id, email, success, session_id, ip_address, user_agent,
+             session_minutes, max_attempts, lock_minutes, not queued),
+            fetch_one=True, write=True
+        )
+        if queued:
+            if success:
+                reason = None
+            elif result['locked']:
+                reason = 'account_locked_max_attempts'
+            else:
+                reason = 'invalid_password'
+            UserModel._queue_login_attempt(email, user_id, success, reason, ip_address, user_agent)
+        return result
 
     @staticmethod
-    def increment_failed_attempts(user_id: int) -> int:
-        """Increment failed login attempts and return new count"""
-        query = """
-            UPDATE users 
-            SET failed_login_attempts = failed_login_attempts + 1
-            WHERE user_id = %s
-            RETURNING failed_login_attempts
-        """
-        result = db.execute_query(query, (user_id,), fetch_one=True)
-        return result['failed_login_attempts'] if result else 0
+    def _queue_login_attempt(email: str, user_id: Optional[int], success: bool,
+                             failure_reason: Optional[str], ip_address: str, user_agent: str):
+        login_attempt_log.add((email, user_id, success, failure_reason,
+                               ip_address, user_agent, datetime.now()))
 
     @staticmethod
-    def lock_account(user_id: int, duration_minutes: int = 15):
-        """Lock user account for specified duration"""
-        query = """
-            UPDATE users 
-            SET account_locked_until = CURRENT_TIMESTAMP + INTERVAL '%s minutes'
-            WHERE user_id = %s
-        """
-        db.execute_update(query, (duration_minutes, user_id))
+    def log_rate_limited(email: str, ip_address: str = None, user_agent: str = None):
+        """Queue a 'rate_limited' attempt; dropped rather than waited for when the queue is full"""
+        login_attempt_log.add((email, None, False, 'rate_limited',
+                               ip_address, user_agent, datetime.now()), block=False)
 
     @staticmethod
-    def is_account_locked(user_id: int) -> bool:
-        """Check if account is currently locked"""
-        query = """
-            SELECT account_locked_until > CURRENT_TIMESTAMP as is_locked
-            FROM users
-            WHERE user_id = %s
-        """
-        result = db.execute_query(query, (user_id,), fetch_one=True)
-        return result['is_locked'] if result else False
+    def log_audit(action: str, user_id: Optional[int] = None, table_name: str = None,
+                  record_id: int = None, old_values: Dict[str, Any] = None,
+                  new_values: Dict[str, Any] = None, ip_address: str = None,
+                  user_agent: str = None):
+        """Queue an audit_logs row (action: audit_action_enum value, e.g. 'LOGIN')"""
+        audit_log.add((
+            user_id, action, table_name, record_id,
+            Json(old_values) if old_values is not None else None,
+            Json(new_values) if new_values is not None else None,
+            ip_address, user_agent, datetime.now()
+        ))
 
     @staticmethod
-    def get_remaining_lock_time(user_id: int) -> Optional[int]:
-        """Get remaining lock time in minutes"""
-        query = """
-            SELECT EXTRACT(EPOCH FROM (account_locked_until - CURRENT_TIMESTAMP)) / 60 as minutes
-            FROM users
-            WHERE user_id = %s AND account_locked_until > CURRENT_TIMESTAMP
-        """
-        result = db.execute_query(query, (user_id,), fetch_one=True)
-        return int(result['minutes']) + 1 if result and result['minutes'] else None
+    def verify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify password against hash (blocks until a bcrypt worker is free)"""
+        return password_hasher.verify(plain_password, hashed_password)
 
     @staticmethod
-    def log_login_attempt(email: str, success: bool, ip_address: str = None,
-                         user_agent: str = None, failure_reason: str = None):
-        """Log login attempt to database"""
-        try:
-            db.execute_procedure('log_login_attempt', [
-                email,
-                success,
-                failure_reason,
-                ip_address,
-                user_agent
-            ])
-        except Exception as e:
-            logger.error(f"Failed to log login attempt: {e}")
+    def hash_password(password: str) -> str:
+        """Hash password with bcrypt (AppConfig.BCRYPT_ROUNDS)"""
+        return password_hasher.hash(password)
 
     @staticmethod
-    def create_session(user_id: int, session_id: str, ip_address: str = None,
-                      user_agent: str = None, expires_minutes: int = 480):
-        """Create new active session"""
+    def update_password(user_id: int, new_password_hash: str):
+        """Update user password"""
         query = """
-            INSERT INTO active_sessions (
-                session_id, user_id, ip_address, user_agent, 
-                expires_at
-            ) VALUES (
-                %s, %s, %s, %s,
-                CURRENT_TIMESTAMP + INTERVAL '%s minutes'
-            )
+            UPDATE users 
+            SET password_hash = %s
+            WHERE user_id = %s
         """
-        db.execute_update(query, (session_id, user_id, ip_address,
-                                 user_agent, expires_minutes))
+        db.execute_update(query, (new_password_hash, user_id))
 
     @staticmethod
     def validate_session(session_id: str) -> Optional[Dict[str, Any]]:
-        """Validate session and return user data"""
+        """Validate session and return user data (valid sessions are cached briefly)"""
         query = """
             SELECT 
                 s.user_id,
@@ -181,23 +157,22 @@ class UserModel:
             AND s.expires_at > CURRENT_TIMESTAMP
             AND u.aktif = TRUE
         """
-        return db.execute_query(query, (session_id,), fetch_one=True)
+        return session_cache.get(
+            session_id,
+            lambda: db.execute_query(query, (session_id,), fetch_one=True)
+        )
 
     @staticmethod
     def delete_session(session_id: str):
         """Delete session (logout)"""
+        session_cache.invalidate(session_id)
         query = "DELETE FROM active_sessions WHERE session_id = %s"
         db.execute_update(query, (session_id,))
 
     @staticmethod
     def update_session_activity(session_id: str):
-        """Update last activity timestamp"""
-        query = """
-            UPDATE active_sessions
-            SET last_activity = CURRENT_TIMESTAMP
-            WHERE session_id = %s
-        """
-        db.execute_update(query, (session_id,))
+        """Update last activity timestamp (coalesced, written in batches by session_cache)"""
+        session_cache.touch(session_id)
 
     def __init__(self, db_connection):
         """Initialize with database connection"""
@@ -228,17 +203,15 @@ class UserModel:
                 WHERE user_id = %s
             """
 
-            cursor = self.db.execute_query(query, tuple(params))
-
-            if cursor and cursor.rowcount > 0:
-                self.db.commit()
+            if self.db.execute_update(query, tuple(params)) > 0:
+                # Cached sessions carry email/role/bolum and require aktif
+                session_cache.invalidate()
                 logger.info(f"User updated (ID: {user_id})")
                 return True
 
             return False
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Error updating user: {e}")
             return False
 
@@ -247,16 +220,11 @@ class UserModel:
         try:
             # Get current password hash
             query = "SELECT password_hash FROM users WHERE user_id = %s"
-            cursor = self.db.execute_query(query, (user_id,))
-
-            if not cursor:
-                return False
-
-            row = cursor.fetchone()
+            row = self.db.execute_query(query, (user_id,), fetch_one=True)
             if not row:
                 return False
 
-            current_hash = row[0]
+            current_hash = row['password_hash']
 
             # Verify current password
             if not self.verify_password(current_password, current_hash):
@@ -271,16 +239,13 @@ class UserModel:
                 SET password_hash = %s
                 WHERE user_id = %s
             """
-            cursor = self.db.execute_query(update_query, (new_hash, user_id))
-
-            if cursor and cursor.rowcount > 0:
-                self.db.commit()
+            if self.db.execute_update(update_query, (new_hash, user_id)) > 0:
+                self.log_audit('PASSWORD_CHANGE', user_id, 'users', user_id)
                 logger.info(f"Password changed for user ID: {user_id}")
                 return True
 
             return False
 
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Error changing password: {e}")
             return False
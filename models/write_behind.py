@@ -0,0 +1,290 @@
+"""
+Write-Behind Buffers
+Bounded in-memory queues for append-only log rows (login_attempts,
+audit_logs), written by a background thread in multi-row INSERTs
+
+Log rows are never read on the request path: lockout decisions use the
+users counters that auth_complete() updates synchronously. Queueing them
+takes their INSERTs off the login path; under a burst (a brute-force run,
+everyone logging in at 9:00) one INSERT carries up to batch_size rows.
+
+A batch is written when it reaches batch_size rows or flush_interval
+seconds after its first row, whichever comes first. When the queue is
+full, add() blocks for up to put_timeout seconds (backpressure on the
+producer); if the writer still has not caught up, e.g. the database is
+down, the row is dropped and counted. Connection errors are retried with
+backoff; a batch the database rejects (bad data) is logged and dropped.
+main() calls stop_all() on shutdown, which writes what is still queued.
+
+Row timestamps are taken when the row is queued (client clock), so a
+delayed write keeps the time the event happened.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from config import DatabaseConfig
+
+from .database import db
+from .pool import PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Queue polling while idle, and the retry backoff cap for connection errors
+POLL_INTERVAL = 0.5
+MAX_BACKOFF = 30.0
+
+_RETRYABLE = (psycopg2.OperationalError, psycopg2.InterfaceError, PoolTimeoutError)
+
+# Queued by flush(): the writer ends its current batch without waiting
+_FLUSH = object()
+
+# name -> buffer, for flush_all()/stop_all()/write_behind_stats()
+_registry: Dict[str, 'WriteBehindBuffer'] = {}
+
+
+class WriteBehindBuffer:
+    """Queue of rows for one table, inserted in batches by a daemon thread"""
+
+    def __init__(self, table: str, columns: Sequence[str], max_rows: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 2.0,
+                 put_timeout: float = 1.0, enabled: bool = True):
+        self.table = table
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.enabled = enabled
+        self._sql = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES %s"
+        self._queue: queue.Queue = queue.Queue(maxsize=max_rows)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._overflowing = False
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.blocked = 0
+
+    def add(self, row: Sequence[Any], block: bool = True) -> bool:
+        """
+        Queue one row (values in column order); False when it was dropped
+
+        block=False drops instead of waiting when the queue is full (rows
+        produced by an attack must not slow anyone down). Writes inline
+        when the buffer is disabled.
+        """
+        row = tuple(row)
+        if not self.enabled:
+            try:
+                self._write([row])
+                return True
+            except psycopg2.Error as e:
+                logger.error(f"{self.table} insert failed: {e}")
+                return False
+
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            if not block:
+                self._drop(1)
+                return False
+            with self._lock:
+                self.blocked += 1
+            try:
+                self._queue.put(row, timeout=self.put_timeout)
+            except queue.Full:
+                self._drop(1)
+                return False
+
+        with self._lock:
+            self.queued += 1
+            self._overflowing = False
+        return True
+
+    def _drop(self, rows: int, reason: str = "queue full"):
+        with self._lock:
+            self.dropped += rows
+            first = not self._overflowing
+            self._overflowing = True
+        if first:
+            logger.warning(f"{self.table} write-behind dropping rows ({reason})")
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'write-behind-{self.table}',
+                                            daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[tuple]:
+        """Rows until batch_size or flush_interval after the first one"""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = POLL_INTERVAL if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                row = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is not None or self._stop.is_set():
+                    break
+                continue
+            if row is _FLUSH:
+                self._queue.task_done()
+                break
+            batch.append(row)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            attempt = 0
+            try:
+                while batch:
+                    try:
+                        self._write(batch)
+                        break
+                    except _RETRYABLE as e:
+                        attempt += 1
+                        if attempt == 1:
+                            logger.warning(f"{self.table} write-behind: database unavailable, retrying: {e}")
+                        if self._stop.wait(min(MAX_BACKOFF, 2 ** (attempt - 1))):
+                            # Shutting down; stop() retries the queue once more
+                            self._requeue(batch)
+                            return
+                    except psycopg2.Error as e:
+                        logger.error(f"{self.table} write-behind: batch of {len(batch)} rejected: {e}")
+                        self._drop(len(batch), "rejected by the database")
+                        break
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _requeue(self, batch: List[tuple]):
+        for index, row in enumerate(batch):
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self._drop(len(batch) - index)
+                return
+
+    def _write(self, batch: List[tuple]):
+        with db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                started = time.perf_counter()
+                execute_values(cursor, self._sql, batch, page_size=self.batch_size)
+                db._observe(conn, self._sql, None, len(batch), time.perf_counter() - started)
+                db._mark_write()
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def flush(self, timeout: float = 5.0) -> int:
+        """
+        Write everything queued so far and wait for it; returns rows written
+
+        With the writer running, it is told to cut its batch short; once it
+        is stopped, rows are written on the calling thread.
+        """
+        written = self.written
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(_FLUSH, timeout=timeout)
+            except queue.Full:
+                pass
+            with self._queue.all_tasks_done:
+                self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+            return self.written - written
+
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._queue.task_done()
+                if row is not _FLUSH:
+                    batch.append(row)
+            if not batch:
+                return self.written - written
+            try:
+                self._write(batch)
+            except psycopg2.Error as e:
+                logger.error(f"{self.table} write-behind flush failed, {len(batch)} rows lost: {e}")
+                self._drop(len(batch), "flush failed")
+
+    def stop(self, timeout: float = 5.0) -> int:
+        """Stop the writer thread and flush the rest (call before db.close_all)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        return self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'pending': self._queue.qsize(),
+                'queued': self.queued,
+                'written': self.written,
+                'batches': self.batches,
+                'blocked': self.blocked,
+                'dropped': self.dropped,
+            }
+
+
+def make_buffer(table: str, columns: Sequence[str]) -> WriteBehindBuffer:
+    """Buffer for table configured from DatabaseConfig, registered by table name"""
+    buffer = WriteBehindBuffer(
+        table, columns,
+        max_rows=DatabaseConfig.WRITE_BEHIND_MAX_ROWS,
+        batch_size=DatabaseConfig.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=DatabaseConfig.WRITE_BEHIND_INTERVAL,
+        put_timeout=DatabaseConfig.WRITE_BEHIND_PUT_TIMEOUT,
+        enabled=DatabaseConfig.WRITE_BEHIND
+    )
+    _registry[table] = buffer
+    return buffer
+
+
+def flush_all() -> int:
+    return sum(buffer.flush() for buffer in _registry.values())
+
+
+def stop_all() -> int:
+    """Stop every writer and flush what is queued; returns rows written"""
+    return sum(buffer.stop() for buffer in _registry.values())
+
+
+def write_behind_stats() -> Dict[str, Dict[str, Any]]:
+    return {table: buffer.stats() for table, buffer in _registry.items()}
+
+
+login_attempt_log = make_buffer(
+    'login_attempts',
+    ('email', 'user_id', 'success', 'failure_reason', 'ip_address', 'user_agent', 'attempt_time')
+)
+
+audit_log = make_buffer(
+    'audit_logs',
+    ('user_id', 'action', 'table_name', 'record_id', 'old_values', 'new_values',
+     'ip_address', 'user_agent', 'created_at')
+)
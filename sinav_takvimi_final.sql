@@ -57,22 +57,29 @@ COMMENT ON TABLE password_reset_tokens IS 'Şifre sıfırlama token kayıtları
 -- ============================================================
 -- 2. LOGIN ATTEMPTS (GİRİŞ DENEMELERİ LOGLAMAK)
 -- ============================================================
+-- Aylık RANGE partition (attempt_time); aylık bölümleri log_partition_bakimi()
+-- açar ve saklama süresi dolanları tek seferde düşürür. Partition anahtarı
+-- birincil anahtarda olmalı. Index'ler her partition'da ayrı (partition-local)
 CREATE TABLE login_attempts (
-    attempt_id SERIAL PRIMARY KEY,
+    attempt_id SERIAL,
     email VARCHAR(255) NOT NULL,
     user_id INT REFERENCES users(user_id) ON DELETE SET NULL,
     success BOOLEAN NOT NULL,
     failure_reason VARCHAR(100),  -- 'invalid_password', 'user_not_found', 'account_locked'
     ip_address VARCHAR(45),
     user_agent TEXT,
-    attempt_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    attempt_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (attempt_id, attempt_time)
+) PARTITION BY RANGE (attempt_time);
+
+-- Açılmamış bir aya düşen satırlar için; bakım bunları kendi ayına taşır
+CREATE TABLE login_attempts_default PARTITION OF login_attempts DEFAULT;
 
 CREATE INDEX idx_login_email_time ON login_attempts(email, attempt_time DESC);
 CREATE INDEX idx_login_ip ON login_attempts(ip_address, attempt_time DESC);
 CREATE INDEX idx_login_success ON login_attempts(success, attempt_time DESC);
 
-COMMENT ON TABLE login_attempts IS 'Başarılı ve başarısız giriş denemelerini loglar';
+COMMENT ON TABLE login_attempts IS 'Başarılı ve başarısız giriş denemelerini loglar (aylık partition)';
 -- ============================================================
 -- 3. ACTIVE SESSIONS (AKTİF OTURUMLAR)
 -- ============================================================
@@ -101,8 +108,9 @@ CREATE TYPE audit_action_enum AS ENUM (
     'EXPORT', 'IMPORT'
 );
 
+-- login_attempts gibi aylık RANGE partition (created_at)
 CREATE TABLE audit_logs (
-    log_id BIGSERIAL PRIMARY KEY,
+    log_id BIGSERIAL,
     user_id INT REFERENCES users(user_id) ON DELETE SET NULL,
     action audit_action_enum NOT NULL,
     table_name VARCHAR(50),
@@ -111,14 +119,17 @@ CREATE TABLE audit_logs (
     new_values JSONB,  -- Değişiklik sonrası değerler
     ip_address VARCHAR(45),
     user_agent TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (log_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
 
 CREATE INDEX idx_audit_user ON audit_logs(user_id, created_at DESC);
 CREATE INDEX idx_audit_table ON audit_logs(table_name, created_at DESC);
 CREATE INDEX idx_audit_action ON audit_logs(action, created_at DESC);
 
-COMMENT ON TABLE audit_logs IS 'Tüm sistem işlemlerinin detaylı kaydı';
+COMMENT ON TABLE audit_logs IS 'Tüm sistem işlemlerinin detaylı kaydı (aylık partition)';
 -- ============================================================
 -- 5. EMAIL QUEUE (EMAİL KUYRUK SİSTEMİ)
 -- ============================================================
@@ -163,7 +174,9 @@ INSERT INTO system_settings (setting_key, setting_value, data_type, description)
 ('account_lock_duration', '15', 'int', 'Hesap kilitleme süresi (dakika)'),
 ('password_reset_expiry', '15', 'int', 'Şifre sıfırlama token süresi (dakika)'),
 ('session_timeout', '480', 'int', 'Oturum zaman aşımı (dakika)'),
-('min_password_length', '8', 'int', 'Minimum şifre uzunluğu');
+('min_password_length', '8', 'int', 'Minimum şifre uzunluğu'),
+('login_attempts_retention_months', '3', 'int', 'Giriş denemelerinin saklama süresi (ay, log_partition_bakimi)'),
+('audit_logs_retention_months', '24', 'int', 'Audit kayıtlarının saklama süresi (ay, log_partition_bakimi)');
 
 COMMENT ON TABLE system_settings IS 'Dinamik sistem ayarları - kod değişikliği gerektirmez';
 -- ============================================================
@@ -246,6 +259,153 @@ $$ LANGUAGE plpgsql;
 
 COMMENT ON FUNCTION log_login_attempt IS 'Login denemelerini otomatik loglar ve hesap kilitleme yapar';
 -- ============================================================
+-- KİMLİK DOĞRULAMA (GİRİŞ BAŞINA İKİ ÇAĞRI)
+-- ============================================================
+-- Şifre istemcide bcrypt ile doğrulanır (düz şifre sunucuya gitmez), bu yüzden
+-- giriş iki çağrıdır: auth_begin hash'i ve hesap durumunu getirir, auth_complete
+-- sonucu yazar. Sayaç yalnızca auth_complete'te (şifre hatasında) artar.
+
+-- Kullanıcı + hesap durumu (LOWER(email) -> idx_users_email_lower).
+-- durum: 'ok', 'user_not_found', 'account_inactive', 'account_locked';
+-- 'ok' dışındaki durumlarda giriş biter ve deneme burada loglanır
+-- (p_log_attempt FALSE ise istemci kendi yazar: models/write_behind.py)
+CREATE OR REPLACE FUNCTION auth_begin(
+    p_email VARCHAR,
+    p_ip_address VARCHAR DEFAULT NULL,
+    p_user_agent TEXT DEFAULT NULL,
+    p_log_attempt BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (
+    durum VARCHAR,
+    user_id INT,
+    email VARCHAR,
+    password_hash VARCHAR,
+    role role_enum,
+    bolum_id INT,
+    ad_soyad VARCHAR,
+    bolum_adi VARCHAR,
+    bolum_kodu VARCHAR,
+    kalan_dakika INT
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_user RECORD;
+    v_durum VARCHAR := 'ok';
+BEGIN
+    SELECT u.user_id, u.email, u.password_hash, u.role, u.bolum_id, u.ad_soyad,
+           u.aktif, u.account_locked_until, b.bolum_adi, b.bolum_kodu
+    INTO v_user
+    FROM users u
+    LEFT JOIN bolumler b ON u.bolum_id = b.bolum_id
+    WHERE LOWER(u.email) = LOWER(p_email);
+
+    IF NOT FOUND THEN
+        v_durum := 'user_not_found';
+    ELSIF NOT v_user.aktif THEN
+        v_durum := 'account_inactive';
+    ELSIF v_user.account_locked_until > CURRENT_TIMESTAMP THEN
+        v_durum := 'account_locked';
+    END IF;
+
+    IF v_durum <> 'ok' AND p_log_attempt THEN
+        INSERT INTO login_attempts (email, user_id, success, failure_reason, ip_address, user_agent)
+        VALUES (p_email, v_user.user_id, FALSE, v_durum, p_ip_address, p_user_agent);
+    END IF;
+
+    RETURN QUERY SELECT
+        v_durum,
+        v_user.user_id,
+        v_user.email,
+        v_user.password_hash,
+        v_user.role,
+        v_user.bolum_id,
+        v_user.ad_soyad,
+        v_user.bolum_adi,
+        v_user.bolum_kodu,
+        CASE WHEN v_durum = 'account_locked'
+             THEN CEIL(EXTRACT(EPOCH FROM v_user.account_locked_until - CURRENT_TIMESTAMP) / 60)::INT
+        END;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Şifre kontrolünün sonucu: başarılıysa sayaç/kilit sıfırlanır, son_giris ve
+-- oturum yazılır; başarısızsa sayaç artar ve p_max_attempts'ta hesap kilitlenir.
+-- Her iki durumda deneme loglanır (p_log_attempt FALSE değilse). Kilit
+-- kararı login_attempts'a değil users sayacına bakar
+CREATE OR REPLACE FUNCTION auth_complete(
+    p_user_id INT,
+    p_email VARCHAR,
+    p_success BOOLEAN,
+    p_session_id VARCHAR DEFAULT NULL,
+    p_ip_address VARCHAR DEFAULT NULL,
+    p_user_agent TEXT DEFAULT NULL,
+    p_session_minutes INT DEFAULT 480,
+    p_max_attempts INT DEFAULT 5,
+    p_lock_minutes INT DEFAULT 15,
+    p_log_attempt BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (
+    failed_attempts INT,
+    locked BOOLEAN
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_failed INT := 0;
+    v_locked_until TIMESTAMP;
+    v_locked BOOLEAN := FALSE;
+BEGIN
+    IF p_success THEN
+        UPDATE users
+        SET failed_login_attempts = 0,
+            account_locked_until = NULL,
+            son_giris = CURRENT_TIMESTAMP
+        WHERE user_id = p_user_id;
+
+        INSERT INTO active_sessions (session_id, user_id, ip_address, user_agent, expires_at)
+        VALUES (p_session_id, p_user_id, p_ip_address, p_user_agent,
+                CURRENT_TIMESTAMP + make_interval(mins => p_session_minutes));
+    ELSE
+        -- Satır kilidi: aynı hesaba eşzamanlı denemeler sayacı atlatamaz
+        SELECT failed_login_attempts, account_locked_until
+        INTO v_failed, v_locked_until
+        FROM users
+        WHERE user_id = p_user_id
+        FOR UPDATE;
+
+        -- Süresi dolmuş kilitten sonra sayım baştan başlar
+        IF v_locked_until IS NOT NULL AND v_locked_until <= CURRENT_TIMESTAMP THEN
+            v_failed := 0;
+        END IF;
+        v_failed := LEAST(COALESCE(v_failed, 0) + 1, 10);  -- chk_failed_attempts
+        v_locked := v_failed >= p_max_attempts;
+
+        UPDATE users
+        SET failed_login_attempts = v_failed,
+            account_locked_until = CASE
+                WHEN v_locked THEN CURRENT_TIMESTAMP + make_interval(mins => p_lock_minutes)
+                ELSE NULL
+            END
+        WHERE user_id = p_user_id;
+    END IF;
+
+    IF p_log_attempt THEN
+        INSERT INTO login_attempts (email, user_id, success, failure_reason, ip_address, user_agent)
+        VALUES (
+            p_email, p_user_id, p_success,
+            CASE
+                WHEN p_success THEN NULL
+                WHEN v_locked THEN 'account_locked_max_attempts'
+                ELSE 'invalid_password'
+            END,
+            p_ip_address, p_user_agent
+        );
+    END IF;
+
+    RETURN QUERY SELECT v_failed, v_locked;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION auth_begin IS 'Giriş 1/2: kullanıcı, şifre hash''i ve kilit durumu tek çağrıda';
+COMMENT ON FUNCTION auth_complete IS 'Giriş 2/2: sayaç, kilit, son_giris, oturum ve deneme kaydı tek çağrıda';
+-- ============================================================
 -- ESKİ TOKEN'LARI TEMİZLE (CRON JOB İLE ÇAĞRILACAK)
 -- ============================================================
 CREATE OR REPLACE FUNCTION cleanup_expired_tokens() 
@@ -256,9 +416,9 @@ BEGIN
     WHERE expires_at < CURRENT_TIMESTAMP 
        OR (used = TRUE AND used_at < CURRENT_TIMESTAMP - INTERVAL '7 days');
     
-    -- Eski login attempt kayıtlarını sil (90 günden eski)
-    DELETE FROM login_attempts 
-    WHERE attempt_time < CURRENT_TIMESTAMP - INTERVAL '90 days';
+    -- Eski login attempt / audit kayıtları: satır satır DELETE yerine
+    -- saklama süresi dolan aylık partition'lar düşürülür
+    PERFORM log_partition_bakimi();
     
     -- Expire olmuş session'ları sil
     DELETE FROM active_sessions 
@@ -292,7 +452,9 @@ CREATE TABLE users (
         (role = 'Bölüm Koordinatörü' AND bolum_id IS NOT NULL)
     )
 );
-CREATE INDEX idx_users_email ON users(email);
+-- Giriş ve kullanıcı aramaları LOWER(email) ile yapılır; email UNIQUE kısıtının
+-- index'i bu sorgularda kullanılamaz. UNIQUE: büyük/küçük harf farklı kopya olmaz
+CREATE UNIQUE INDEX idx_users_email_lower ON users (LOWER(email));
 CREATE INDEX idx_users_aktif_role ON users(aktif, role) WHERE aktif = TRUE;
 
 CREATE TABLE derslikler (
@@ -403,7 +565,9 @@ CREATE TABLE oturma_planlari (
     UNIQUE(sinav_id, ogrenci_no)
 );
 CREATE INDEX idx_oturma_sinav_derslik ON oturma_planlari(sinav_id, derslik_id);
-CREATE INDEX idx_oturma_ogrenci ON oturma_planlari(ogrenci_no);
+-- Öğrenci takvimi sorgusu (ogrenci_no -> tüm sınavları) tek index scan ile cevaplanır
+CREATE INDEX idx_oturma_ogrenci_sinav ON oturma_planlari(ogrenci_no, sinav_id)
+    INCLUDE (derslik_id, satir_no, sutun_no);
 
 -- ============================================================
 -- BÖLÜM 3: EXCEL IMPORT LOG
@@ -461,8 +625,9 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Sadece atama değişince kontrol et (yerlesim_sayisi güncellemeleri tetiklemez)
 CREATE TRIGGER trg_derslik_cakisma 
-BEFORE INSERT OR UPDATE ON sinav_derslikleri
+BEFORE INSERT OR UPDATE OF sinav_id, derslik_id ON sinav_derslikleri
 FOR EACH ROW EXECUTE FUNCTION trg_derslik_cakisma_kontrol();
 
 -- 3. Öğrenci Sınav Çakışma Kontrolü (Optimized)
@@ -522,6 +687,11 @@ FOR EACH ROW EXECUTE FUNCTION trg_derslik_kapasite_kontrol();
 CREATE OR REPLACE FUNCTION trg_update_yerlesim_sayaci() 
 RETURNS TRIGGER AS $$
 BEGIN
+    -- Toplu silmede sayaçlar tek UPDATE ile sıfırlanır (purge_oturma / purge_program)
+    IF current_setting('app.bulk_purge', TRUE) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
     IF (TG_OP = 'INSERT') THEN
         -- FOR UPDATE ile row-level lock (race condition önleme)
         UPDATE sinav_derslikleri
@@ -542,17 +712,352 @@ CREATE TRIGGER trg_yerlesim_sayaci_guncelle
 AFTER INSERT OR DELETE ON oturma_planlari
 FOR EACH ROW EXECUTE FUNCTION trg_update_yerlesim_sayaci();
 
+-- 6. Toplu Silme (SATIR BAŞINA SAYAÇ GÜNCELLEMESİ YOK)
+-- Sınavların oturma planlarını set-wise siler, sayaçları tek UPDATE ile sıfırlar
+CREATE OR REPLACE FUNCTION purge_oturma(p_sinav_ids INT[])
+RETURNS INT AS $$
+DECLARE
+    v_silinen INT;
+BEGIN
+    PERFORM set_config('app.bulk_purge', 'on', TRUE);
+
+    DELETE FROM oturma_planlari
+    WHERE sinav_id = ANY(p_sinav_ids);
+    GET DIAGNOSTICS v_silinen = ROW_COUNT;
+
+    UPDATE sinav_derslikleri
+    SET yerlesim_sayisi = 0
+    WHERE sinav_id = ANY(p_sinav_ids)
+      AND yerlesim_sayisi <> 0;
+
+    PERFORM set_config('app.bulk_purge', 'off', TRUE);
+    RETURN v_silinen;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Programın oturma planlarını, derslik atamalarını ve sınavlarını tek transaction'da siler
+-- p_keep_program = TRUE ise program kaydı kalır (yeniden oluşturma için)
+-- Silinen oturma sayısını, program kaydı yoksa (veya RLS göstermiyorsa) NULL döner
+CREATE OR REPLACE FUNCTION purge_program(p_program_id INT, p_keep_program BOOLEAN DEFAULT TRUE)
+RETURNS INT AS $$
+DECLARE
+    v_sinav_ids INT[];
+    v_silinen INT;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM sinav_programi WHERE program_id = p_program_id) THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT COALESCE(array_agg(sinav_id), '{}')
+    INTO v_sinav_ids
+    FROM sinavlar
+    WHERE program_id = p_program_id;
+
+    PERFORM set_config('app.bulk_purge', 'on', TRUE);
+
+    DELETE FROM oturma_planlari
+    WHERE sinav_id = ANY(v_sinav_ids);
+    GET DIAGNOSTICS v_silinen = ROW_COUNT;
+
+    DELETE FROM sinav_derslikleri
+    WHERE sinav_id = ANY(v_sinav_ids);
+
+    DELETE FROM sinavlar
+    WHERE program_id = p_program_id;
+
+    IF NOT p_keep_program THEN
+        DELETE FROM sinav_programi
+        WHERE program_id = p_program_id;
+        IF NOT FOUND THEN
+            v_silinen := NULL;
+        END IF;
+    END IF;
+
+    PERFORM set_config('app.bulk_purge', 'off', TRUE);
+    RETURN v_silinen;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION purge_program IS 'Programı set-wise temizler - yeniden oluşturmada eski sürümü hızlı siler';
+
+-- 7. Değişiklik Bildirimi (LISTEN/NOTIFY - İFADE BAŞINA TEK BİLDİRİM)
+-- Açık istemciler cache'lerini ve ekranlarını tabloyu baştan okumadan günceller
+-- (models/change_feed.py). Payload: {"t": tablo, "op": "I"/"U"/"D",
+-- "ids": [id...], "b": [bolum_id...]}; toplu işlemde (500'den fazla satır)
+-- ids null gönderilir ve istemci tabloyu yeniden yükler. Bildirimler commit'te
+-- gider, geri alınan transaction bildirim üretmez.
+CREATE OR REPLACE FUNCTION trg_notify_degisiklik()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_id_kolon TEXT := TG_ARGV[0];
+    v_ids INT[];
+    v_bolumler INT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format('SELECT array_agg(%I), array_agg(DISTINCT bolum_id) FROM yeni_satirlar', v_id_kolon)
+        INTO v_ids, v_bolumler;
+    ELSIF TG_OP = 'DELETE' THEN
+        EXECUTE format('SELECT array_agg(%I), array_agg(DISTINCT bolum_id) FROM eski_satirlar', v_id_kolon)
+        INTO v_ids, v_bolumler;
+    ELSE
+        -- Bölümü değişen satır hem eski hem yeni bölüme bildirilir
+        EXECUTE format(
+            'SELECT array_agg(DISTINCT %1$I), array_agg(DISTINCT bolum_id)
+             FROM (SELECT %1$I, bolum_id FROM yeni_satirlar
+                   UNION ALL
+                   SELECT %1$I, bolum_id FROM eski_satirlar) r', v_id_kolon)
+        INTO v_ids, v_bolumler;
+    END IF;
+
+    -- Satır etkilemeyen ifade
+    IF v_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    IF cardinality(v_ids) > 500 THEN
+        v_ids := NULL;
+    END IF;
+
+    PERFORM pg_notify('veri_degisikligi', json_build_object(
+        't', TG_TABLE_NAME,
+        'op', left(TG_OP, 1),
+        'ids', v_ids,
+        'b', v_bolumler
+    )::TEXT);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition table'lı trigger tek olay alabildiği için tablo başına üç trigger
+DO $$
+DECLARE
+    v_tablo TEXT;
+    v_id_kolon TEXT;
+BEGIN
+    FOR v_tablo, v_id_kolon IN
+        VALUES ('bolumler', 'bolum_id'), ('derslikler', 'derslik_id'), ('dersler', 'ders_id')
+    LOOP
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_notify_ins AFTER INSERT ON %1$I
+             REFERENCING NEW TABLE AS yeni_satirlar
+             FOR EACH STATEMENT EXECUTE FUNCTION trg_notify_degisiklik(%2$L)', v_tablo, v_id_kolon);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_notify_upd AFTER UPDATE ON %1$I
+             REFERENCING OLD TABLE AS eski_satirlar NEW TABLE AS yeni_satirlar
+             FOR EACH STATEMENT EXECUTE FUNCTION trg_notify_degisiklik(%2$L)', v_tablo, v_id_kolon);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_notify_del AFTER DELETE ON %1$I
+             REFERENCING OLD TABLE AS eski_satirlar
+             FOR EACH STATEMENT EXECUTE FUNCTION trg_notify_degisiklik(%2$L)', v_tablo, v_id_kolon);
+    END LOOP;
+END $$;
+
+-- 8. Audit Kaydı (TRANSITION TABLE - İFADE BAŞINA TEK AUDIT SATIRI)
+-- dersler, ogrenciler, sinavlar ve oturma_planlari değişiklikleri audit_logs'a
+-- ifade başına bir satır olarak yazılır; satır başına trigger toplu import ve
+-- oturma yüklemesinin yazma maliyetini ikiye katlardı. old_values/new_values:
+--   {"satir": n, "kayitlar": {"<id>": {...}}}   n <= 200 (UPDATE'te sadece
+--                                               değişen kolonlar)
+--   {"satir": n, "ilk": "<id>", "son": "<id>"}   daha büyük ifadeler (UPDATE'te
+--                                               ayrıca "kolonlar": [...])
+-- Kullanıcı app.current_user_id'den (set_app_context) alınır; tek satırlık
+-- ifadede record_id doldurulur. Hiçbir kolonu değiştirmeyen UPDATE yazılmaz.
+CREATE OR REPLACE FUNCTION trg_audit_ifade()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_id_kolon TEXT := TG_ARGV[0];
+    v_detay_limit CONSTANT INT := 200;
+    v_satir BIGINT;
+    v_ilk TEXT;
+    v_son TEXT;
+    v_kolonlar JSONB;
+    v_eski JSONB;
+    v_yeni JSONB;
+    v_karsilastir TEXT;
+    v_ozet JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT count(*) INTO v_satir FROM eski_satirlar;
+    ELSE
+        SELECT count(*) INTO v_satir FROM yeni_satirlar;
+    END IF;
+
+    IF v_satir = 0 THEN
+        RETURN NULL;
+    ELSIF v_satir = 1 THEN
+        -- Tek satır (form kaydı, satır satır import): dinamik SQL'siz yol
+        IF TG_OP <> 'INSERT' THEN
+            SELECT to_jsonb(e) INTO v_eski FROM eski_satirlar e;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            SELECT to_jsonb(y) INTO v_yeni FROM yeni_satirlar y;
+        END IF;
+        v_ilk := COALESCE(v_yeni, v_eski) ->> v_id_kolon;
+        IF TG_OP = 'UPDATE' THEN
+            SELECT jsonb_object_agg(k.key, v_eski -> k.key), jsonb_object_agg(k.key, k.value)
+            INTO v_eski, v_yeni
+            FROM jsonb_each(v_yeni) k
+            WHERE k.value IS DISTINCT FROM v_eski -> k.key;
+            IF v_yeni IS NULL THEN
+                RETURN NULL;
+            END IF;
+        END IF;
+        v_eski := CASE WHEN v_eski IS NOT NULL
+                       THEN jsonb_build_object('satir', 1, 'kayitlar', jsonb_build_object(v_ilk, v_eski)) END;
+        v_yeni := CASE WHEN v_yeni IS NOT NULL
+                       THEN jsonb_build_object('satir', 1, 'kayitlar', jsonb_build_object(v_ilk, v_yeni)) END;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Tek geçişte değişen satır sayısı, id aralığı ve değişen kolonlar
+        -- (id'si değişen satırlar eşleşmez)
+        SELECT string_agg(format('CASE WHEN bool_or(e.%1$I IS DISTINCT FROM y.%1$I) THEN %1$L END',
+                                 attname), ', ' ORDER BY attnum)
+        INTO v_karsilastir
+        FROM pg_attribute
+        WHERE attrelid = TG_RELID AND attnum > 0 AND NOT attisdropped;
+
+        EXECUTE format(
+            'SELECT count(*), min(y.%1$I)::TEXT, max(y.%1$I)::TEXT,
+                    to_jsonb(array_remove(ARRAY[%2$s], NULL))
+             FROM eski_satirlar e JOIN yeni_satirlar y ON y.%1$I = e.%1$I
+             WHERE ROW(e.*) IS DISTINCT FROM ROW(y.*)', v_id_kolon, v_karsilastir)
+        INTO v_satir, v_ilk, v_son, v_kolonlar;
+
+        IF v_satir = 0 THEN
+            RETURN NULL;
+        ELSIF v_satir <= v_detay_limit THEN
+            EXECUTE format(
+                'SELECT jsonb_object_agg(d.id, d.eski), jsonb_object_agg(d.id, d.yeni)
+                 FROM (
+                     SELECT y.%1$I AS id,
+                            (SELECT jsonb_object_agg(k.key, to_jsonb(e) -> k.key) FROM jsonb_each(to_jsonb(y)) k
+                             WHERE k.value IS DISTINCT FROM to_jsonb(e) -> k.key) AS eski,
+                            (SELECT jsonb_object_agg(k.key, k.value) FROM jsonb_each(to_jsonb(y)) k
+                             WHERE k.value IS DISTINCT FROM to_jsonb(e) -> k.key) AS yeni
+                     FROM eski_satirlar e JOIN yeni_satirlar y ON y.%1$I = e.%1$I
+                     WHERE ROW(e.*) IS DISTINCT FROM ROW(y.*)
+                 ) d', v_id_kolon)
+            INTO v_eski, v_yeni;
+        END IF;
+    ELSE
+        EXECUTE format(
+            'SELECT min(r.%1$I)::TEXT, max(r.%1$I)::TEXT,
+                    CASE WHEN %3$s <= %4$s THEN jsonb_object_agg(r.%1$I, to_jsonb(r)) END
+             FROM %2$I r', v_id_kolon,
+            CASE TG_OP WHEN 'INSERT' THEN 'yeni_satirlar' ELSE 'eski_satirlar' END,
+            v_satir, v_detay_limit)
+        INTO v_ilk, v_son, v_yeni;
+        IF TG_OP = 'DELETE' THEN
+            v_eski := v_yeni;
+            v_yeni := NULL;
+        END IF;
+    END IF;
+
+    IF v_satir > v_detay_limit THEN
+        v_ozet := jsonb_build_object('satir', v_satir, 'ilk', v_ilk, 'son', v_son);
+        IF v_kolonlar IS NOT NULL THEN
+            v_ozet := v_ozet || jsonb_build_object('kolonlar', v_kolonlar);
+        END IF;
+        v_eski := CASE WHEN TG_OP <> 'INSERT' THEN v_ozet END;
+        v_yeni := CASE WHEN TG_OP <> 'DELETE' THEN v_ozet END;
+    ELSIF v_satir > 1 THEN
+        v_eski := CASE WHEN v_eski IS NOT NULL
+                       THEN jsonb_build_object('satir', v_satir, 'kayitlar', v_eski) END;
+        v_yeni := CASE WHEN v_yeni IS NOT NULL
+                       THEN jsonb_build_object('satir', v_satir, 'kayitlar', v_yeni) END;
+    END IF;
+
+    INSERT INTO audit_logs (user_id, action, table_name, record_id, old_values, new_values)
+    VALUES (
+        NULLIF(NULLIF(current_setting('app.current_user_id', TRUE), ''), '0')::INT,
+        TG_OP::audit_action_enum,
+        TG_TABLE_NAME,
+        CASE WHEN v_satir = 1 AND v_ilk ~ '^\d{1,9}$' THEN v_ilk::INT END,
+        v_eski,
+        v_yeni
+    );
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_tablo TEXT;
+    v_id_kolon TEXT;
+BEGIN
+    FOR v_tablo, v_id_kolon IN
+        VALUES ('dersler', 'ders_id'), ('ogrenciler', 'ogrenci_no'),
+               ('sinavlar', 'sinav_id'), ('oturma_planlari', 'oturma_id')
+    LOOP
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_audit_ins AFTER INSERT ON %1$I
+             REFERENCING NEW TABLE AS yeni_satirlar
+             FOR EACH STATEMENT EXECUTE FUNCTION trg_audit_ifade(%2$L)', v_tablo, v_id_kolon);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_audit_upd AFTER UPDATE ON %1$I
+             REFERENCING OLD TABLE AS eski_satirlar NEW TABLE AS yeni_satirlar
+             FOR EACH STATEMENT EXECUTE FUNCTION trg_audit_ifade(%2$L)', v_tablo, v_id_kolon);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_audit_del AFTER DELETE ON %1$I
+             REFERENCING OLD TABLE AS eski_satirlar
+             FOR EACH STATEMENT EXECUTE FUNCTION trg_audit_ifade(%2$L)', v_tablo, v_id_kolon);
+    END LOOP;
+END $$;
+
 -- ============================================================
 -- BÖLÜM 5: ROW LEVEL SECURITY (RLS)
 -- ============================================================
 
+-- Oturum bağlamı: set_app_context() kullanıcıyı doğrulayıp sadece
+-- app.current_user_id'yi yazar (DatabaseManager her checkout'ta bağlantının
+-- bağlamını kontrol eder, sadece değişince çağırır). Rol ve bölüm istemcinin
+-- kendi SET edebileceği ayarlarda tutulmaz; policy yardımcıları bunları
+-- SECURITY DEFINER olarak users tablosundan, sorgu başına bir kez okur.
+CREATE OR REPLACE FUNCTION set_app_context(p_user_id INT)
+RETURNS void AS $$
+DECLARE
+    v_user_id INT;
+BEGIN
+    -- Pasif veya bilinmeyen kullanıcı: boş bağlam, hiçbir satır görünmez
+    SELECT user_id INTO v_user_id
+    FROM users
+    WHERE user_id = p_user_id AND aktif = TRUE;
+
+    PERFORM set_config('app.current_user_id', COALESCE(v_user_id, 0)::TEXT, false);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+COMMENT ON FUNCTION set_app_context IS 'RLS oturum bağlamı (app.current_user_id) - bağlantı başına bir kez';
+
 CREATE OR REPLACE FUNCTION set_current_user_id(p_user_id INT)
 RETURNS void AS $$
 BEGIN
-    PERFORM set_config('app.current_user_id', p_user_id::TEXT, false);
+    PERFORM set_app_context(p_user_id);
 END;
 $$ LANGUAGE plpgsql;
 
+-- Policy yardımcıları: argüman almaz, satır değeri görmez (LEAKPROOF).
+-- Rol/bölüm app.current_user_id'nin users kaydından okunur (pasif kullanıcı:
+-- yetki yok). Policy'lerde (SELECT ...) içinde çağrılır; sorgu başına bir
+-- kez hesaplanan InitPlan olur (tek birincil anahtar araması), satır başına
+-- sadece sabit karşılaştırması kalır.
+CREATE OR REPLACE FUNCTION app_is_admin()
+RETURNS BOOLEAN AS $$
+    SELECT COALESCE((
+        SELECT role = 'Admin' FROM users
+        WHERE user_id = NULLIF(current_setting('app.current_user_id', TRUE), '')::INT
+        AND aktif = TRUE
+    ), FALSE)
+$$ LANGUAGE sql STABLE LEAKPROOF PARALLEL SAFE SECURITY DEFINER SET search_path = public, pg_temp;
+
+CREATE OR REPLACE FUNCTION app_bolum_id()
+RETURNS INT AS $$
+    SELECT bolum_id FROM users
+    WHERE user_id = NULLIF(current_setting('app.current_user_id', TRUE), '')::INT
+    AND aktif = TRUE
+$$ LANGUAGE sql STABLE LEAKPROOF PARALLEL SAFE SECURITY DEFINER SET search_path = public, pg_temp;
+
 ALTER TABLE derslikler ENABLE ROW LEVEL SECURITY;
 ALTER TABLE dersler ENABLE ROW LEVEL SECURITY;
 ALTER TABLE ogrenciler ENABLE ROW LEVEL SECURITY;
@@ -561,59 +1066,38 @@ ALTER TABLE sinav_programi ENABLE ROW LEVEL SECURITY;
 ALTER TABLE oturma_planlari ENABLE ROW LEVEL SECURITY;
 
 CREATE POLICY pol_derslikler_erisim ON derslikler FOR ALL USING (
-    EXISTS (
-        SELECT 1 FROM users u
-        WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
-        AND u.aktif = TRUE
-        AND (u.role = 'Admin' OR u.bolum_id = derslikler.bolum_id)
-    )
+    (SELECT app_is_admin()) OR bolum_id = (SELECT app_bolum_id())
 );
 
 CREATE POLICY pol_dersler_erisim ON dersler FOR ALL USING (
-    EXISTS (
-        SELECT 1 FROM users u
-        WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
-        AND u.aktif = TRUE
-        AND (u.role = 'Admin' OR u.bolum_id = dersler.bolum_id)
-    )
+    (SELECT app_is_admin()) OR bolum_id = (SELECT app_bolum_id())
 );
 
 CREATE POLICY pol_ogrenciler_erisim ON ogrenciler FOR ALL USING (
-    EXISTS (
-        SELECT 1 FROM users u
-        WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
-        AND u.aktif = TRUE
-        AND (u.role = 'Admin' OR u.bolum_id = ogrenciler.bolum_id)
-    )
+    (SELECT app_is_admin()) OR bolum_id = (SELECT app_bolum_id())
 );
 
 CREATE POLICY pol_program_erisim ON sinav_programi FOR ALL USING (
-    EXISTS (
-        SELECT 1 FROM users u
-        WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
-        AND u.aktif = TRUE
-        AND (u.role = 'Admin' OR u.bolum_id = sinav_programi.bolum_id)
-    )
+    (SELECT app_is_admin()) OR bolum_id = (SELECT app_bolum_id())
 );
 
+-- Bağımsız (uncorrelated) IN alt sorgusu: bölümün programları bir kez
+-- hash'lenir, satır başına EXISTS çalışmaz
 CREATE POLICY pol_sinavlar_erisim ON sinavlar FOR ALL USING (
-    EXISTS (
-        SELECT 1 FROM users u
-        JOIN sinav_programi sp ON sp.program_id = sinavlar.program_id
-        WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
-        AND u.aktif = TRUE
-        AND (u.role = 'Admin' OR u.bolum_id = sp.bolum_id)
+    (SELECT app_is_admin())
+    OR program_id IN (
+        SELECT sp.program_id FROM sinav_programi sp
+        WHERE sp.bolum_id = (SELECT app_bolum_id())
     )
 );
 
 CREATE POLICY pol_oturma_erisim ON oturma_planlari FOR ALL USING (
-    EXISTS (
-        SELECT 1 FROM users u
-        JOIN sinavlar s ON s.sinav_id = oturma_planlari.sinav_id
+    (SELECT app_is_admin())
+    OR sinav_id IN (
+        SELECT s.sinav_id
+        FROM sinavlar s
         JOIN sinav_programi sp ON sp.program_id = s.program_id
-        WHERE u.user_id = COALESCE(current_setting('app.current_user_id', TRUE)::INT, 0)
-        AND u.aktif = TRUE
-        AND (u.role = 'Admin' OR u.bolum_id = sp.bolum_id)
+        WHERE sp.bolum_id = (SELECT app_bolum_id())
     )
 );
 
@@ -702,6 +1186,103 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- login_attempts / audit_logs aylık partition bakımı (günlük
+-- cleanup_expired_tokens() / pg_cron ile, DDL yetkili rolle; masaüstü
+-- istemciler çağırmaz): bu ay ve sonraki p_ileri_ay ay için partition açar (default
+-- partition'a düşmüş satırları taşıyarak), system_settings'teki
+-- *_retention_months süresinden eski ayları DETACH eder; p_drop ise siler.
+-- Saklama ay bazındadır: bir ay, tamamı süreyi aşınca düşer
+CREATE OR REPLACE FUNCTION log_partition_bakimi(
+    p_ileri_ay INT DEFAULT 3,
+    p_drop BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (tablo TEXT, partition_adi TEXT, islem TEXT) AS $$
+DECLARE
+    v_tablo RECORD;
+    v_saklama INT;
+    v_ay DATE;
+    v_ad TEXT;
+    v_tasinan BIGINT;
+    v_part RECORD;
+BEGIN
+    -- Aynı anda açılan istemciler aynı partition'ı oluşturmaya çalışmasın
+    PERFORM pg_advisory_xact_lock(hashtext('log_partition_bakimi'));
+
+    FOR v_tablo IN
+        SELECT * FROM (VALUES
+            ('login_attempts', 'attempt_time', 'login_attempts_retention_months', 3),
+            ('audit_logs', 'created_at', 'audit_logs_retention_months', 24)
+        ) AS t(ad, kolon, ayar, varsayilan)
+    LOOP
+        SELECT COALESCE(MAX(setting_value::INT), v_tablo.varsayilan) INTO v_saklama
+        FROM system_settings WHERE setting_key = v_tablo.ayar;
+
+        -- Bu ay ve ileriki aylar
+        FOR i IN 0..p_ileri_ay LOOP
+            v_ay := (date_trunc('month', CURRENT_DATE) + make_interval(months => i))::DATE;
+            v_ad := format('%s_p%s', v_tablo.ad, to_char(v_ay, 'YYYY_MM'));
+            CONTINUE WHEN to_regclass(v_ad) IS NOT NULL;
+
+            -- Default partition'daki bu aya ait satırlar yeni partition'a taşınır;
+            -- aksi halde ATTACH çakışma hatası verir
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                           v_ad, v_tablo.ad);
+            EXECUTE format(
+                'WITH tasinan AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *)
+                 INSERT INTO %I SELECT * FROM tasinan',
+                v_tablo.ad || '_default', v_tablo.kolon, v_ay, v_tablo.kolon,
+                (v_ay + INTERVAL '1 month')::DATE, v_ad);
+            GET DIAGNOSTICS v_tasinan = ROW_COUNT;
+            EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           v_tablo.ad, v_ad, v_ay, (v_ay + INTERVAL '1 month')::DATE);
+
+            tablo := v_tablo.ad;
+            partition_adi := v_ad;
+            islem := CASE WHEN v_tasinan > 0 THEN format('created (%s rows moved)', v_tasinan)
+                          ELSE 'created' END;
+            RETURN NEXT;
+        END LOOP;
+
+        -- Saklama süresi dolan aylar (partition adındaki YYYY_MM ile)
+        FOR v_part IN
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = v_tablo.ad::regclass
+              AND c.relname ~ '_p\d{4}_\d{2}$'
+              AND to_date(right(c.relname, 7), 'YYYY_MM') + INTERVAL '1 month'
+                  <= date_trunc('month', CURRENT_DATE) - make_interval(months => v_saklama)
+        LOOP
+            EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', v_tablo.ad, v_part.relname);
+            IF p_drop THEN
+                EXECUTE format('DROP TABLE %I', v_part.relname);
+            END IF;
+
+            tablo := v_tablo.ad;
+            partition_adi := v_part.relname;
+            islem := CASE WHEN p_drop THEN 'dropped' ELSE 'detached' END;
+            RETURN NEXT;
+        END LOOP;
+
+        -- Bakım uzun süre çalışmadıysa default partition'da kalmış eski satırlar
+        EXECUTE format('DELETE FROM %I WHERE %I < %L',
+                       v_tablo.ad || '_default', v_tablo.kolon,
+                       date_trunc('month', CURRENT_DATE) - make_interval(months => v_saklama));
+        GET DIAGNOSTICS v_tasinan = ROW_COUNT;
+        IF v_tasinan > 0 THEN
+            tablo := v_tablo.ad;
+            partition_adi := v_tablo.ad || '_default';
+            islem := format('%s expired rows deleted', v_tasinan);
+            RETURN NEXT;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION log_partition_bakimi IS 'login_attempts/audit_logs: gelecek ayların partition''larını açar, süresi dolanları düşürür';
+
+-- İlk partition'lar
+SELECT * FROM log_partition_bakimi();
+
 -- ============================================================
 -- BÖLÜM 8: ÖRNEK VERİLER
 -- ============================================================
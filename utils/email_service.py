@@ -1,35 +1,204 @@
 """
 utils/email_service.py
 Production-Ready SMTP Email Service
+
+Mesaj gövdeleri utils/email_templates.py şablonlarından üretilir.
+Mesajlar SMTPConnectionPool üzerinden açık tutulan bağlantılarla gönderilir;
+her mesajda yeniden bağlanma, STARTTLS ve login yapılmaz. Toplu gönderimler
+email_queue tablosuna yazılır ve models/email_queue.py tarafından gönderilir.
 """
 
 import smtplib
-import os
+import threading
+import time
+from collections import deque
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr
-from datetime import datetime
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
+from config import EmailConfig
+from utils.email_templates import email_templates
 from utils.logger import logger
 
 
+class SMTPSetupError(smtplib.SMTPException):
+    """
+    Bağlantı kurulamadı (bağlanma, karşılama, STARTTLS veya login)
+
+    Asıl hata __cause__'dadır. smtplib'in SMTPAuthenticationError,
+    SMTPConnectError gibi hataları SMTPResponseException olduğu için
+    mesaj reddiyle karışmasın diye bu sınıfa sarılır: hiçbir mesaj
+    denenmemiştir.
+    """
+
+
+class _PooledSMTP:
+    """Havuzdaki bir bağlantı ve kullanım bilgisi"""
+
+    __slots__ = ('server', 'sent', 'last_used')
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Uzun ömürlü SMTP bağlantıları
+
+    En fazla `size` bağlantı aynı anda kullanılır; boştaki bağlantılar bir
+    sonraki gönderimde tekrar kullanılır. Sunucunun kapattığı bağlantı ilk
+    gönderimde fark edilir ve mesaj bir kez yeni bağlantıyla denenir.
+    Mesaja özgü retler (alıcı reddi, 5xx/4xx yanıt) bağlantıyı bozmaz.
+    """
+
+    def __init__(self, host: str, port: int, user: str = "", password: str = "",
+                 starttls: bool = True, auth: bool = True, size: int = 2,
+                 max_messages: int = 100, idle_timeout: float = 60, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.auth = auth
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.sent = 0
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            EmailConfig.SMTP_HOST, EmailConfig.SMTP_PORT,
+            EmailConfig.SMTP_USER, EmailConfig.SMTP_PASSWORD,
+            starttls=EmailConfig.SMTP_STARTTLS,
+            auth=EmailConfig.SMTP_AUTH,
+            size=EmailConfig.SMTP_POOL_SIZE,
+            max_messages=EmailConfig.SMTP_MAX_MESSAGES,
+            idle_timeout=EmailConfig.SMTP_IDLE_TIMEOUT,
+            timeout=EmailConfig.SMTP_TIMEOUT
+        )
+
+    def _connect(self) -> _PooledSMTP:
+        try:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        except OSError as e:
+            raise SMTPSetupError(f"{self.host}:{self.port} bağlantısı kurulamadı: {e}") from e
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.auth:
+                server.login(self.user, self.password)
+        except BaseException as e:
+            server.close()
+            if isinstance(e, OSError):
+                raise SMTPSetupError(f"{self.host}:{self.port} oturumu açılamadı: {e}") from e
+            raise
+        with self._lock:
+            self.opened += 1
+        return _PooledSMTP(server)
+
+    def _close(self, conn: _PooledSMTP):
+        try:
+            conn.server.quit()
+        except Exception:
+            conn.server.close()
+
+    def _checkout(self) -> _PooledSMTP:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if now - conn.last_used < self.idle_timeout:
+                return conn
+            # Sunucu büyük olasılıkla kapatmıştır
+            self._close(conn)
+
+    def _checkin(self, conn: _PooledSMTP):
+        conn.last_used = time.monotonic()
+        if conn.sent >= self.max_messages:
+            self._close(conn)
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def send(self, msg: Message):
+        """
+        Mesajı havuzdaki bir bağlantıyla gönder
+
+        Raises:
+            smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException:
+                mesaj reddedildi (smtp_code 5xx kalıcı, 4xx geçici); sadece
+                send_message'ın kendisinden gelir
+            SMTPSetupError: bağlantı kurulamadı (login hatası dahil)
+            OSError: bağlantı koptu
+        """
+        with self._slots:
+            conn = self._checkout()
+            try:
+                try:
+                    conn.server.send_message(msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._close(conn)
+                    conn = None
+                    conn = self._connect()
+                    conn.server.send_message(msg)
+            except SMTPSetupError:
+                raise
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                self._checkin(conn)
+                raise
+            except BaseException:
+                if conn is not None:
+                    self._close(conn)
+                raise
+            conn.sent += 1
+            with self._lock:
+                self.sent += 1
+            self._checkin(conn)
+
+    def check(self):
+        """Yeni bir bağlantı aç ve kapat (ayar testi); hata fırlatır"""
+        self._close(self._connect())
+
+    def close_all(self):
+        """Boştaki bağlantıları kapat"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self):
+        with self._lock:
+            return {'opened': self.opened, 'sent': self.sent, 'idle': len(self._idle)}
+
+
 class EmailService:
     """SMTP Email gönderme servisi"""
 
-    def __init__(self):
-        # .env'den al
-        self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
-        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        self.smtp_user = os.getenv("SMTP_USER", "")
-        self.smtp_password = os.getenv("SMTP_PASSWORD", "")
-        self.from_email = os.getenv("FROM_EMAIL", self.smtp_user)
-        self.from_name = os.getenv("FROM_NAME", "Kocaeli Üniversitesi")
+    def __init__(self, pool: SMTPConnectionPool = None):
+        # .env'den al (config.EmailConfig)
+        self.smtp_host = EmailConfig.SMTP_HOST
+        self.smtp_port = EmailConfig.SMTP_PORT
+        self.smtp_user = EmailConfig.SMTP_USER
+        self.smtp_password = EmailConfig.SMTP_PASSWORD
+        self.from_email = EmailConfig.FROM_EMAIL
+        self.from_name = EmailConfig.FROM_NAME
 
         # Email aktif mi?
-        self.enabled = bool(self.smtp_user and self.smtp_password)
+        self.enabled = EmailConfig.ENABLED
+        self.pool = pool or SMTPConnectionPool.from_config()
 
         if not self.enabled:
             logger.warning("⚠️  Email servisi devre dışı (SMTP ayarları eksik)")
@@ -52,120 +221,12 @@ class EmailService:
             return False
 
         subject = "Şifre Sıfırlama Talebi - Kocaeli Üniversitesi"
-
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        </head>
-        <body style="margin: 0; padding: 0; font-family: 'Segoe UI', Arial, sans-serif; background-color: #f8fafc;">
-            <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f8fafc; padding: 40px 20px;">
-                <tr>
-                    <td align="center">
-                        <table width="600" cellpadding="0" cellspacing="0" style="background-color: white; border-radius: 16px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-                            <!-- Header -->
-                            <tr>
-                                <td style="padding: 40px 40px 30px; text-align: center; background: linear-gradient(135deg, #00A651 0%, #008F47 100%); border-radius: 16px 16px 0 0;">
-                                    <h1 style="margin: 0; color: white; font-size: 28px; font-weight: bold;">
-                                        🎓 Kocaeli Üniversitesi
-                                    </h1>
-                                    <p style="margin: 10px 0 0; color: rgba(255,255,255,0.9); font-size: 14px;">
-                                        Sınav Takvimi Yönetim Sistemi
-                                    </p>
-                                </td>
-                            </tr>
-
-                            <!-- Body -->
-                            <tr>
-                                <td style="padding: 40px;">
-                                    <h2 style="margin: 0 0 20px; color: #0f172a; font-size: 22px;">
-                                        Merhaba {recipient_name},
-                                    </h2>
-
-                                    <p style="margin: 0 0 20px; color: #475569; font-size: 15px; line-height: 1.6;">
-                                        Hesabınız için şifre sıfırlama talebinde bulundunuz. 
-                                        Şifrenizi sıfırlamak için aşağıdaki butona tıklayın:
-                                    </p>
-
-                                    <!-- Button -->
-                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin: 30px 0;">
-                                        <tr>
-                                            <td align="center">
-                                                <a href="{reset_link}" 
-                                                   style="display: inline-block; padding: 16px 40px; background: linear-gradient(135deg, #00A651 0%, #00C75F 100%); color: white; text-decoration: none; border-radius: 10px; font-weight: bold; font-size: 16px; box-shadow: 0 4px 12px rgba(0,166,81,0.3);">
-                                                    Şifremi Sıfırla
-                                                </a>
-                                            </td>
-                                        </tr>
-                                    </table>
-
-                                    <p style="margin: 20px 0; color: #64748b; font-size: 14px; line-height: 1.6;">
-                                        Buton çalışmıyorsa aşağıdaki linki tarayıcınıza kopyalayın:
-                                    </p>
-
-                                    <p style="margin: 0 0 20px; padding: 12px; background: #f1f5f9; border-radius: 8px; color: #475569; font-size: 13px; word-break: break-all;">
-                                        {reset_link}
-                                    </p>
-
-                                    <!-- Warning Box -->
-                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin: 30px 0; background: #fef2f2; border-left: 4px solid #dc2626; border-radius: 8px;">
-                                        <tr>
-                                            <td style="padding: 16px;">
-                                                <p style="margin: 0; color: #991b1b; font-size: 14px; font-weight: bold;">
-                                                    ⚠️ Önemli Güvenlik Uyarısı
-                                                </p>
-                                                <p style="margin: 8px 0 0; color: #dc2626; font-size: 13px; line-height: 1.5;">
-                                                    Bu link <strong>{expires_minutes} dakika</strong> içinde geçerliliğini yitirecektir.<br>
-                                                    Bu talebi siz yapmadıysanız, bu emaili görmezden gelin.
-                                                </p>
-                                            </td>
-                                        </tr>
-                                    </table>
-
-                                    <p style="margin: 20px 0 0; color: #94a3b8; font-size: 13px;">
-                                        Saygılarımızla,<br>
-                                        <strong style="color: #475569;">Kocaeli Üniversitesi IT Destek</strong>
-                                    </p>
-                                </td>
-                            </tr>
-
-                            <!-- Footer -->
-                            <tr>
-                                <td style="padding: 30px 40px; background: #f8fafc; border-radius: 0 0 16px 16px; text-align: center;">
-                                    <p style="margin: 0; color: #94a3b8; font-size: 12px;">
-                                        © {datetime.now().year} Kocaeli Üniversitesi<br>
-                                        Tüm hakları saklıdır.
-                                    </p>
-                                    <p style="margin: 10px 0 0; color: #cbd5e0; font-size: 11px;">
-                                        Bu otomatik bir emaildir, lütfen yanıtlamayın.
-                                    </p>
-                                </td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
-
-        text_body = f"""
-        Merhaba {recipient_name},
-
-        Hesabınız için şifre sıfırlama talebinde bulundunuz.
-
-        Şifrenizi sıfırlamak için aşağıdaki linke tıklayın:
-        {reset_link}
-
-        Bu link {expires_minutes} dakika içinde geçerliliğini yitirecektir.
-
-        Bu talebi siz yapmadıysanız, bu emaili görmezden gelin.
-
-        Saygılarımızla,
-        Kocaeli Üniversitesi IT Destek
-        """
+        text_body, html_body = email_templates.render(
+            'sifre_sifirlama',
+            recipient_name=recipient_name,
+            reset_link=reset_link,
+            expires_minutes=expires_minutes
+        )
 
         return self._send_email(to_email, subject, html_body, text_body)
 
@@ -177,43 +238,14 @@ class EmailService:
             return False
 
         subject = "Hoş Geldiniz - Sınav Takvimi Sistemi"
+        text_body, html_body = email_templates.render(
+            'hos_geldin',
+            recipient_name=recipient_name,
+            role=role,
+            to_email=to_email
+        )
 
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-        </head>
-        <body style="font-family: Arial, sans-serif; background: #f8fafc; padding: 40px;">
-            <div style="max-width: 600px; margin: 0 auto; background: white; border-radius: 16px; padding: 40px;">
-                <h1 style="color: #00A651; text-align: center;">🎓 Hoş Geldiniz!</h1>
-
-                <p style="font-size: 16px; color: #475569;">
-                    Merhaba {recipient_name},
-                </p>
-
-                <p style="font-size: 15px; color: #475569; line-height: 1.6;">
-                    Kocaeli Üniversitesi Sınav Takvimi Yönetim Sistemi'ne hoş geldiniz!
-                </p>
-
-                <div style="background: #f1f5f9; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                    <p style="margin: 0; color: #0f172a;"><strong>Rolünüz:</strong> {role}</p>
-                    <p style="margin: 10px 0 0; color: #0f172a;"><strong>Email:</strong> {to_email}</p>
-                </div>
-
-                <p style="font-size: 14px; color: #64748b;">
-                    Sisteme giriş yaparak tüm özelliklere erişebilirsiniz.
-                </p>
-
-                <p style="margin-top: 30px; font-size: 13px; color: #94a3b8; text-align: center;">
-                    © {datetime.now().year} Kocaeli Üniversitesi
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-
-        return self._send_email(to_email, subject, html_body)
+        return self._send_email(to_email, subject, html_body, text_body)
 
     def _send_email(self, to_email, subject, html_body, text_body=None):
         """
@@ -233,30 +265,17 @@ class EmailService:
             return False
 
         try:
-            # Email oluştur
-            msg = MIMEMultipart('alternative')
-            msg['From'] = formataddr((self.from_name, self.from_email))
-            msg['To'] = to_email
-            msg['Subject'] = subject
-
-            # Plain text part (fallback)
-            if text_body:
-                msg.attach(MIMEText(text_body, 'plain', 'utf-8'))
-
-            # HTML part
-            msg.attach(MIMEText(html_body, 'html', 'utf-8'))
-
-            # SMTP bağlantısı
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            # Havuzdaki açık bağlantıyla gönder
+            self.pool.send(self.build_message(to_email, subject, html_body, text_body))
 
             logger.info(f"✓ Email gönderildi: {to_email}")
             return True
 
-        except smtplib.SMTPAuthenticationError:
-            logger.error("SMTP authentication hatası - Kullanıcı adı/şifre yanlış")
+        except SMTPSetupError as e:
+            if isinstance(e.__cause__, smtplib.SMTPAuthenticationError):
+                logger.error("SMTP authentication hatası - Kullanıcı adı/şifre yanlış")
+            else:
+                logger.error(f"SMTP hatası: {e}")
             return False
         except smtplib.SMTPException as e:
             logger.error(f"SMTP hatası: {e}")
@@ -265,15 +284,39 @@ class EmailService:
             logger.error(f"Email gönderme hatası: {e}")
             return False
 
+    def build_message(self, to_email, subject, html_body=None, text_body=None):
+        """
+        MIME mesajı oluştur (plain text + HTML alternatifleri)
+
+        Returns:
+            MIMEMultipart: Gönderime hazır mesaj
+        """
+        msg = MIMEMultipart('alternative')
+        msg['From'] = formataddr((self.from_name, self.from_email))
+        msg['To'] = to_email
+        msg['Subject'] = subject
+
+        # Plain text part (fallback)
+        if text_body:
+            msg.attach(MIMEText(text_body, 'plain', 'utf-8'))
+
+        # HTML part
+        if html_body:
+            msg.attach(MIMEText(html_body, 'html', 'utf-8'))
+
+        return msg
+
+    def close(self):
+        """Açık SMTP bağlantılarını kapat"""
+        self.pool.close_all()
+
     def test_connection(self):
         """SMTP bağlantısını test et"""
         if not self.enabled:
             return False, "SMTP ayarları eksik"
 
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=10) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
+            self.pool.check()
 
             logger.info("✓ SMTP bağlantısı başarılı")
             return True, "Bağlantı başarılı"
@@ -0,0 +1,119 @@
+"""
+utils/email_templates.py
+E-posta şablon kayıt defteri (Jinja2)
+
+Şablonlar resources/email_templates altındadır; her mesaj türü için aynı
+bağlamla doldurulan <ad>.html ve <ad>.txt çifti bulunur:
+
+    text, html = email_templates.render('sifre_sifirlama', recipient_name=ad, ...)
+
+Bir şablon ilk kullanımda derlenir ve Environment içinde tutulur; derlenmiş
+bytecode ayrıca EmailConfig.TEMPLATE_CACHE_DIR'e yazılır, böylece sonraki
+açılışlar şablonları yeniden derlemez. auto_reload kapalıdır (şablon
+dosyaları çalışma sırasında değişmez). Alıcıya göre değişmeyen parçalar
+(_ust_bilgi.html, _alt_bilgi.html) şablonlarda sabit('<ad>') ile çağrılır;
+bunlar yılda bir kez render edilip saklanır (yil() her render'da hesaplanır,
+yılbaşını geçen bir kuyruk işçisi eski yılı basmaz). Toplu gönderimde alıcılar arasında
+tekrar eden parçalar (bir sınavın satırı) fragment() ile bir kez render
+edilip çağıran tarafta saklanabilir. HTML şablonlarında autoescape açıktır.
+"""
+
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from jinja2 import (Environment, FileSystemBytecodeCache, FileSystemLoader,
+                    StrictUndefined, TemplateNotFound, select_autoescape)
+from markupsafe import Markup
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config import AppConfig, EmailConfig
+
+# static(): satır başı boşlukları
+_INDENT = re.compile(r'\n[ \t]+')
+
+
+def _yil() -> int:
+    """Şablonlardaki yil(): render anındaki yıl"""
+    return datetime.now().year
+
+
+class EmailTemplates:
+    """Derlenmiş e-posta şablonları ve sabit parça cache'i"""
+
+    def __init__(self, template_dir: Path, cache_dir: Optional[Path] = None,
+                 extra_globals: Optional[Dict] = None):
+        bytecode_cache = None
+        if cache_dir is not None:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+
+        self.env = Environment(
+            loader=FileSystemLoader(str(template_dir)),
+            bytecode_cache=bytecode_cache,
+            autoescape=select_autoescape(['html']),
+            auto_reload=False,
+            undefined=StrictUndefined,
+            keep_trailing_newline=True
+        )
+        self.env.globals.update({
+            'organizasyon': AppConfig.ORGANIZATION,
+            'uygulama': AppConfig.APP_NAME,
+            'yil': _yil,
+        })
+        self.env.globals.update(extra_globals or {})
+        self.env.globals['sabit'] = self.static
+
+        self._static: Dict[Tuple[str, int], Markup] = {}
+        self._lock = threading.Lock()
+
+    def template(self, name: str):
+        """Derlenmiş şablon (ilk çağrıda yüklenir)"""
+        return self.env.get_template(name)
+
+    def static(self, name: str) -> Markup:
+        """
+        Sadece global değişkenleri kullanan parça; bir kez render edilir
+
+        Satır başı girintileri atılır (her mesajın boyutuna eklenmesin).
+        Yıl anahtara dahildir: yil() kullanan parça yılbaşında yenilenir.
+        """
+        key = (name, _yil())
+        fragment = self._static.get(key)
+        if fragment is None:
+            rendered = _INDENT.sub('\n', self.template(name).render())
+            with self._lock:
+                fragment = self._static.setdefault(key, Markup(rendered))
+        return fragment
+
+    def fragment(self, name: str, **context) -> Tuple[Optional[str], Markup]:
+        """
+        <name>.txt ve <name>.html parçası; başka bir şablona hazır değer
+        olarak verilir (HTML tekrar escape edilmez)
+
+        Returns:
+            (text, html) - render() ile aynı sıra
+        """
+        text, html = self.render(name, **context)
+        return text, Markup(html)
+
+    def render(self, name: str, **context) -> Tuple[Optional[str], str]:
+        """
+        <name>.txt ve <name>.html şablonlarını aynı bağlamla doldur
+
+        Returns:
+            (text, html) - .txt şablonu yoksa text None
+        """
+        html = self.template(f"{name}.html").render(context)
+        try:
+            text = self.template(f"{name}.txt").render(context)
+        except TemplateNotFound:
+            text = None
+        return text, html
+
+
+# Global şablon kayıt defteri
+email_templates = EmailTemplates(EmailConfig.TEMPLATE_DIR, EmailConfig.TEMPLATE_CACHE_DIR)
@@ -5,5 +5,7 @@ Reusable UI Components
 from .loading_spinner import LoadingSpinner
 from .modern_input import ModernInput
 from .modern_button import ModernButton
+from .change_feed_bridge import ChangeFeedBridge
+from .background_task import BackgroundTask
 
-__all__ = ['LoadingSpinner', 'ModernInput', 'ModernButton']
\ No newline at end of file
+__all__ = ['LoadingSpinner', 'ModernInput', 'ModernButton', 'ChangeFeedBridge', 'BackgroundTask']
\ No newline at end of file
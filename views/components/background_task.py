@@ -0,0 +1,54 @@
+"""
+Background Task
+Runs a blocking call off the GUI thread and reports back with a signal
+"""
+
+import logging
+
+from PySide6.QtCore import QObject, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTask(QObject):
+    """
+    Runs fn(*args) on the Qt global thread pool
+
+        task = BackgroundTask(self.login_controller.login, email, password, parent=self)
+        task.finished.connect(self.on_login_result)
+        task.failed.connect(self.on_login_error)
+        task.start()
+
+    finished/failed are emitted from the pool thread; the slots of a view
+    living on the GUI thread are queued there. The task keeps itself alive
+    through its parent until it has reported, then deletes itself. bcrypt
+    inside fn still goes through models.password_hasher, which bounds how
+    many hashes run at once.
+    """
+
+    finished = Signal(object)
+    failed = Signal(object)
+
+    def __init__(self, fn, *args, parent=None):
+        super().__init__(parent)
+        self._fn = fn
+        self._args = args
+
+    def start(self):
+        QThreadPool.globalInstance().start(self._run)
+
+    def _run(self):
+        try:
+            result = self._fn(*self._args)
+        except Exception as e:
+            logger.error(f"Background task {getattr(self._fn, '__name__', self._fn)} failed: {e}")
+            self._emit(self.failed, e)
+        else:
+            self._emit(self.finished, result)
+
+    def _emit(self, signal, value):
+        try:
+            signal.emit(value)
+            self.deleteLater()
+        except RuntimeError:  # parent view closed meanwhile
+            pass
@@ -0,0 +1,38 @@
+"""
+Change Feed Bridge
+Delivers change feed notifications to a view on the GUI thread
+"""
+
+from PySide6.QtCore import QObject, Signal
+
+from models.change_feed import change_feed
+
+
+class ChangeFeedBridge(QObject):
+    """
+    Re-emits models.change_feed changes of one table as a Qt signal
+
+    The feed calls back on its listener thread; emitting a signal of an
+    object living on the GUI thread queues the slot there. Unsubscribes
+    when the parent view is destroyed.
+    """
+
+    changed = Signal(object)
+
+    def __init__(self, table: str, parent=None):
+        super().__init__(parent)
+        self.table = table
+        forward = self._forward
+        change_feed.subscribe(table, forward)
+        self.destroyed.connect(lambda *_: change_feed.unsubscribe(table, forward))
+
+    @staticmethod
+    def is_live() -> bool:
+        """False when the feed is off; views then reload after their own edits"""
+        return change_feed.running
+
+    def _forward(self, change):
+        try:
+            self.changed.emit(change)
+        except RuntimeError:  # C++ object already deleted
+            change_feed.unsubscribe(self.table, self._forward)
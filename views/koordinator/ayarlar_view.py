@@ -12,6 +12,7 @@ from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
 from models.database import db
 from models.user_model import UserModel
+from views.components.background_task import BackgroundTask
 import logging
 
 logger = logging.getLogger(__name__)
@@ -143,10 +144,10 @@ class AyarlarView(QWidget):
         password_layout.addLayout(confirm_pw_layout)
 
         # Şifre değiştir butonu
-        btn_change_pw = QPushButton("🔑 Şifreyi Değiştir")
-        btn_change_pw.setMinimumHeight(44)
-        btn_change_pw.setCursor(Qt.PointingHandCursor)
-        btn_change_pw.setStyleSheet("""
+        self.btn_change_pw = QPushButton("🔑 Şifreyi Değiştir")
+        self.btn_change_pw.setMinimumHeight(44)
+        self.btn_change_pw.setCursor(Qt.PointingHandCursor)
+        self.btn_change_pw.setStyleSheet("""
             QPushButton {
                 background: #3b82f6;
                 color: white;
@@ -159,8 +160,8 @@ class AyarlarView(QWidget):
                 background: #2563eb;
             }
         """)
-        btn_change_pw.clicked.connect(self.change_password)
-        password_layout.addWidget(btn_change_pw)
+        self.btn_change_pw.clicked.connect(self.change_password)
+        password_layout.addWidget(self.btn_change_pw)
 
         password_group.setLayout(password_layout)
         layout.addWidget(password_group)
@@ -365,25 +366,39 @@ class AyarlarView(QWidget):
                 QMessageBox.warning(self, "Uyarı", "Şifre en az 6 karakter olmalıdır!")
                 return
 
-            # Şifreyi değiştir
-            success = self.user_model.change_password(
+            # Şifreyi arka planda değiştir (bcrypt doğrulama + yeni hash)
+            self.btn_change_pw.setEnabled(False)
+            task = BackgroundTask(
+                self.user_model.change_password,
                 self.user_data['user_id'],
                 current_pw,
-                new_pw
+                new_pw,
+                parent=self
             )
-
-            if success:
-                QMessageBox.information(self, "Başarılı", "Şifre başarıyla değiştirildi!")
-                self.txt_current_pw.clear()
-                self.txt_new_pw.clear()
-                self.txt_confirm_pw.clear()
-            else:
-                QMessageBox.critical(self, "Hata", "Mevcut şifre yanlış!")
+            task.finished.connect(self.on_password_changed)
+            task.failed.connect(self.on_password_change_error)
+            task.start()
 
         except Exception as e:
             logger.error(f"Şifre değiştirme hatası: {e}")
             QMessageBox.critical(self, "Hata", f"Şifre değiştirilemedi:\n{str(e)}")
 
+    def on_password_changed(self, success):
+        """Şifre değiştirme sonucu (GUI thread'inde)"""
+        self.btn_change_pw.setEnabled(True)
+        if success:
+            QMessageBox.information(self, "Başarılı", "Şifre başarıyla değiştirildi!")
+            self.txt_current_pw.clear()
+            self.txt_new_pw.clear()
+            self.txt_confirm_pw.clear()
+        else:
+            QMessageBox.critical(self, "Hata", "Mevcut şifre yanlış!")
+
+    def on_password_change_error(self, error):
+        self.btn_change_pw.setEnabled(True)
+        logger.error(f"Şifre değiştirme hatası: {error}")
+        QMessageBox.critical(self, "Hata", f"Şifre değiştirilemedi:\n{str(error)}")
+
     def backup_database(self):
         """Veritabanı yedeği al"""
         from PySide6.QtWidgets import QFileDialog
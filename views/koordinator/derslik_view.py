@@ -12,6 +12,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont, QColor
 from controllers.derslik_controller import DerslikController
+from models.change_feed import RESYNC
+from views.components.change_feed_bridge import ChangeFeedBridge
 import logging
 
 logger = logging.getLogger(__name__)
@@ -152,7 +154,13 @@ class DerslikView(QWidget):
         self.user_data = user_data
         self.controller = DerslikController()
         self.derslikler = []
+        self._shown_ids = []
         self.init_ui()
+
+        # Diğer istemcilerin (ve bu ekranın) değişiklikleri satır satır gelir;
+        # yükleme sırasında gelen bildirim kaçmasın diye önce abone ol
+        self.change_bridge = ChangeFeedBridge('derslikler', self)
+        self.change_bridge.changed.connect(self.on_derslikler_changed)
         self.load_derslikler()
 
     def init_ui(self):
@@ -282,11 +290,19 @@ class DerslikView(QWidget):
 
         layout.addWidget(self.table)
 
+    def _bolum_id(self):
+        """Ekranın bölümü (yükleme, ekleme ve bildirimler için ortak); yoksa None"""
+        return self.user_data.get('bolum_id')
+
     def load_derslikler(self):
         """Derslikleri yükle"""
         try:
-            bolum_id = self.user_data.get('bolum_id', 1)  # Test için 1
-            self.derslikler = self.controller.get_derslikler_by_bolum(bolum_id)
+            bolum_id = self._bolum_id()
+            if bolum_id is None:
+                logger.warning("Kullanıcının bölümü yok, derslik listesi boş")
+                self.derslikler = []
+            else:
+                self.derslikler = self.controller.get_derslikler_by_bolum(bolum_id)
             self.populate_table(self.derslikler)
             logger.info(f"{len(self.derslikler)} derslik yüklendi")
         except Exception as e:
@@ -296,91 +312,145 @@ class DerslikView(QWidget):
     def populate_table(self, derslikler):
         """Tabloyu doldur"""
         self.table.setRowCount(len(derslikler))
+        self._shown_ids = [derslik['derslik_id'] for derslik in derslikler]
 
         for i, derslik in enumerate(derslikler):
-            # Kod
-            self.table.setItem(i, 0, QTableWidgetItem(derslik['derslik_kodu']))
-
-            # Ad
-            self.table.setItem(i, 1, QTableWidgetItem(derslik['derslik_adi']))
-
-            # Kapasite
-            self.table.setItem(i, 2, QTableWidgetItem(str(derslik['kapasite'])))
-
-            # Satır
-            self.table.setItem(i, 3, QTableWidgetItem(str(derslik['satir_sayisi'])))
-
-            # Sütun
-            self.table.setItem(i, 4, QTableWidgetItem(str(derslik['sutun_sayisi'])))
-
-            # Sıra yapısı
-            self.table.setItem(i, 5, QTableWidgetItem(f"{derslik['sira_yapisi']}'li"))
-
-            # Durum
-            durum = "✅ Aktif" if derslik.get('aktif', True) else "❌ Pasif"
-            self.table.setItem(i, 6, QTableWidgetItem(durum))
-
-            # İşlemler
-            btn_widget = QWidget()
-            btn_layout = QHBoxLayout(btn_widget)
-            btn_layout.setContentsMargins(4, 4, 4, 4)
-            btn_layout.setSpacing(8)
-
-            btn_duzenle = QPushButton("✏️")
-            btn_duzenle.setFixedSize(32, 32)
-            btn_duzenle.setCursor(Qt.PointingHandCursor)
-            btn_duzenle.setStyleSheet("""
-                QPushButton {
-                    background: #3b82f6;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                }
-                QPushButton:hover {
-                    background: #2563eb;
-                }
-            """)
-            btn_duzenle.clicked.connect(lambda checked, d=derslik: self.edit_derslik(d))
-
-            btn_sil = QPushButton("🗑️")
-            btn_sil.setFixedSize(32, 32)
-            btn_sil.setCursor(Qt.PointingHandCursor)
-            btn_sil.setStyleSheet("""
-                QPushButton {
-                    background: #ef4444;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                }
-                QPushButton:hover {
-                    background: #dc2626;
-                }
-            """)
-            btn_sil.clicked.connect(lambda checked, d=derslik: self.delete_derslik(d))
-
-            btn_layout.addWidget(btn_duzenle)
-            btn_layout.addWidget(btn_sil)
-            btn_layout.addStretch()
-
-            self.table.setCellWidget(i, 7, btn_widget)
+            self._fill_row(i, derslik)
+
+    def _fill_row(self, i, derslik):
+        """Tek satırı doldur"""
+        # Kod
+        self.table.setItem(i, 0, QTableWidgetItem(derslik['derslik_kodu']))
+
+        # Ad
+        self.table.setItem(i, 1, QTableWidgetItem(derslik['derslik_adi']))
+
+        # Kapasite
+        self.table.setItem(i, 2, QTableWidgetItem(str(derslik['kapasite'])))
+
+        # Satır
+        self.table.setItem(i, 3, QTableWidgetItem(str(derslik['satir_sayisi'])))
+
+        # Sütun
+        self.table.setItem(i, 4, QTableWidgetItem(str(derslik['sutun_sayisi'])))
+
+        # Sıra yapısı
+        self.table.setItem(i, 5, QTableWidgetItem(f"{derslik['sira_yapisi']}'li"))
+
+        # Durum
+        durum = "✅ Aktif" if derslik.get('aktif', True) else "❌ Pasif"
+        self.table.setItem(i, 6, QTableWidgetItem(durum))
+
+        # İşlemler
+        btn_widget = QWidget()
+        btn_layout = QHBoxLayout(btn_widget)
+        btn_layout.setContentsMargins(4, 4, 4, 4)
+        btn_layout.setSpacing(8)
+
+        btn_duzenle = QPushButton("✏️")
+        btn_duzenle.setFixedSize(32, 32)
+        btn_duzenle.setCursor(Qt.PointingHandCursor)
+        btn_duzenle.setStyleSheet("""
+            QPushButton {
+                background: #3b82f6;
+                color: white;
+                border: none;
+                border-radius: 6px;
+            }
+            QPushButton:hover {
+                background: #2563eb;
+            }
+        """)
+        btn_duzenle.clicked.connect(lambda checked, d=derslik: self.edit_derslik(d))
+
+        btn_sil = QPushButton("🗑️")
+        btn_sil.setFixedSize(32, 32)
+        btn_sil.setCursor(Qt.PointingHandCursor)
+        btn_sil.setStyleSheet("""
+            QPushButton {
+                background: #ef4444;
+                color: white;
+                border: none;
+                border-radius: 6px;
+            }
+            QPushButton:hover {
+                background: #dc2626;
+            }
+        """)
+        btn_sil.clicked.connect(lambda checked, d=derslik: self.delete_derslik(d))
+
+        btn_layout.addWidget(btn_duzenle)
+        btn_layout.addWidget(btn_sil)
+        btn_layout.addStretch()
+
+        self.table.setCellWidget(i, 7, btn_widget)
 
     def filter_derslikler(self):
         """Derslikleri filtrele"""
+        self.populate_table(self._filtered())
+
+    def _filtered(self):
+        """Arama kutusuna uyan derslikler"""
         search_text = self.txt_search.text().lower()
         if not search_text:
-            self.populate_table(self.derslikler)
-            return
+            return self.derslikler
 
-        filtered = [
+        return [
             d for d in self.derslikler
             if search_text in d['derslik_kodu'].lower() or
                search_text in d['derslik_adi'].lower()
         ]
-        self.populate_table(filtered)
+
+    def on_derslikler_changed(self, change):
+        """Change feed bildirimi: sadece değişen satırları tazele"""
+        bolum_id = self._bolum_id()
+        if bolum_id is not None and not change.affects(bolum_id):
+            return
+
+        if bolum_id is None or change.ids is None or change.op == RESYNC:
+            self.load_derslikler()
+            return
+
+        # Silinen, pasifleşen veya başka bölüme taşınan satırlar listeden çıkar
+        guncel = {}
+        if change.op != 'D':
+            satirlar = self.controller.get_derslikler_by_ids(change.ids)
+            if satirlar is None:
+                # Okunamadı: satırları silmek yerine listenin tamamını yükle
+                self.load_derslikler()
+                return
+            guncel = {
+                d['derslik_id']: d
+                for d in satirlar
+                if d['bolum_id'] == bolum_id and d['aktif']
+            }
+
+        derslikler = [d for d in self.derslikler if d['derslik_id'] not in change.ids]
+        derslikler.extend(guncel.values())
+        derslikler.sort(key=lambda d: d['derslik_kodu'])
+        self.derslikler = derslikler
+
+        shown = self._filtered()
+        if [d['derslik_id'] for d in shown] != self._shown_ids:
+            self.populate_table(shown)
+            return
+
+        for i, derslik in enumerate(shown):
+            if derslik['derslik_id'] in guncel:
+                self._fill_row(i, derslik)
+
+    def _refresh_after_edit(self):
+        """Change feed açıksa kendi değişikliğimiz de bildirimle gelir"""
+        if not self.change_bridge.is_live():
+            self.load_derslikler()
 
     def add_derslik(self):
         """Yeni derslik ekle"""
-        bolum_id = self.user_data.get('bolum_id', 1)  # Test için 1
+        bolum_id = self._bolum_id()
+        if bolum_id is None:
+            QMessageBox.warning(self, "Uyarı", "Derslik eklemek için bir bölüme bağlı olmalısınız!")
+            return
+
         dialog = DerslikEkleDialog(self, bolum_id=bolum_id)
 
         if dialog.exec() == QDialog.Accepted:
@@ -402,7 +472,7 @@ class DerslikView(QWidget):
 
             if success:
                 QMessageBox.information(self, "Başarılı", message)
-                self.load_derslikler()
+                self._refresh_after_edit()
             else:
                 QMessageBox.critical(self, "Hata", message)
 
@@ -420,7 +490,7 @@ class DerslikView(QWidget):
 
             if success:
                 QMessageBox.information(self, "Başarılı", message)
-                self.load_derslikler()
+                self._refresh_after_edit()
             else:
                 QMessageBox.critical(self, "Hata", message)
 
@@ -438,6 +508,6 @@ class DerslikView(QWidget):
 
             if success:
                 QMessageBox.information(self, "Başarılı", message)
-                self.load_derslikler()
+                self._refresh_after_edit()
             else:
                 QMessageBox.critical(self, "Hata", message)
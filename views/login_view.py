@@ -5,6 +5,8 @@ PySide6 ile ultra-modern, animasyonlu login ekranı
 
 import sys
 import os
+import socket
+from functools import lru_cache
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
     QPushButton, QFrame, QStackedWidget, QCheckBox, QGraphicsOpacityEffect,
@@ -17,6 +19,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from styles.theme import KocaeliTheme
 from controllers.login_controller import LoginController
+from config import DatabaseConfig
+from views.components.background_task import BackgroundTask
+
+
+@lru_cache(maxsize=1)
+def client_address():
+    """
+    Bu makinenin veritabanına çıkan ağ adresi - login IP limiti ve giriş
+    logu için istemci kimliği (uygulama tek makinede tek kullanıcı)
+
+    UDP soketinde connect() paket göndermez, sadece işletim sisteminin
+    seçtiği yerel adresi okur. Unix socket / çözülemeyen host: makine adı.
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect((DatabaseConfig.HOST, DatabaseConfig.PORT))
+            return sock.getsockname()[0]
+    except OSError:
+        return socket.gethostname()[:45] or None
+
 
 class AnimatedBackground(QWidget):
     """Animated gradient background with floating particles"""
@@ -540,28 +562,36 @@ class LoginView(QWidget):
         
         # Gerçek controller çağrısı yapılacak
         if self.login_controller:
-            # Asenkron login işlemi
-            QTimer.singleShot(500, lambda: self.authenticate(email, password))
+            # Asenkron login işlemi (bcrypt + veritabanı GUI thread'i dışında)
+            self.authenticate(email, password)
         else:
             # Development mode - Demo credentials
             QTimer.singleShot(1000, lambda: self.demo_login(email, password))
     
     def authenticate(self, email, password):
-        """Gerçek veritabanı authentication"""
-        try:
-            # Controller ile login kontrolü
-            result = self.login_controller.login(email, password)
-            
-            if result['success']:
-                self.show_message(f"Hoş geldiniz, {result['user']['ad_soyad']}!", "success")
-                QTimer.singleShot(800, lambda: self.login_success.emit(result['user']))
-            else:
-                self.show_message(result['message'], "error")
-                self.set_loading_state(False)
-                
-        except Exception as e:
-            self.show_message(f"Bağlantı hatası: {str(e)}", "error")
+        """Gerçek veritabanı authentication - arka planda, sonuç sinyal ile gelir"""
+        # Adres çözümü (DNS) de GUI thread'i dışında
+        task = BackgroundTask(
+            lambda: self.login_controller.login(email, password, client_address()),
+            parent=self
+        )
+        task.finished.connect(self.on_login_result)
+        task.failed.connect(self.on_login_error)
+        task.start()
+
+    def on_login_result(self, result):
+        """Controller sonucu (GUI thread'inde)"""
+        if result['success']:
+            self.show_message(f"Hoş geldiniz, {result['user']['ad_soyad']}!", "success")
+            user = dict(result['user'], session_id=result['session_id'])
+            QTimer.singleShot(800, lambda: self.login_success.emit(user))
+        else:
+            self.show_message(result['message'], "error")
             self.set_loading_state(False)
+
+    def on_login_error(self, error):
+        self.show_message(f"Bağlantı hatası: {str(error)}", "error")
+        self.set_loading_state(False)
     
     def demo_login(self, email, password):
         """Demo mode - Geliştirme için"""